@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén único de capturas de citas hechas (JSON Lines)
+- Un registro por línea en capturas.jsonl; se agrega al final por lotes
+  (una escritura por pantalla capturada, no un archivo por persona)
+- Al abrirlo se lee una vez y se reconstruye el índice en memoria por CURP
+  y por nombre canónico; la última línea de cada persona es la vigente
+- Upsert: la misma persona (mismo CURP o, sin CURP, mismo nombre) se
+  actualiza en lugar de duplicarse; dos personas con el mismo nombre y
+  distinto CURP se conservan las dos. Si alguien se capturó primero sin
+  CURP y después con él, el registro sin CURP se reemplaza
+- Cada registro lleva la fecha de la primera y de la última captura
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_DIR = SCRIPT_DIR.parent
+ALMACEN_DEFAULT = PROJECT_DIR / "capturas.jsonl"
+
+sys.path.insert(0, str(PROJECT_DIR.parent / "extraccion_curp" / "bot"))
+from identidad import clave_canonica
+from cargador_json import iterar_carpeta
+
+# Se reescribe el archivo sin líneas viejas cuando estas superan a las vigentes
+FACTOR_COMPACTAR = 2
+
+
+def clave_registro(persona: Dict) -> str:
+    """Identidad del registro: el CURP si lo hay; si no, el nombre canónico"""
+    curp = (persona.get('curp') or '').strip().upper()
+    return curp or _clave_sin_curp(clave_canonica(persona.get('nombre', '')))
+
+
+def _clave_sin_curp(nombre_canonico: str) -> str:
+    return f"NOMBRE:{nombre_canonico}"
+
+
+class AlmacenCitas:
+    """Capturas indexadas por CURP y nombre, persistidas en JSON Lines"""
+
+    def __init__(self, ruta: Path = ALMACEN_DEFAULT, carpeta_anterior: Optional[Path] = None):
+        """
+        Args:
+            ruta: Archivo .jsonl del almacén
+            carpeta_anterior: Carpeta con un JSON por persona (formato anterior);
+                si el almacén aún no existe, se importa una sola vez
+        """
+        self.ruta = Path(ruta)
+        self._registros: Dict[str, Dict] = {}           # clave -> registro vigente
+        self._por_nombre: Dict[str, List[str]] = {}     # nombre canónico -> claves
+        self._pendientes: List[Dict] = []
+        self.lineas = 0
+        self.lineas_invalidas = 0
+        self._falta_salto = False       # La última línea quedó sin '\n' (escritura cortada)
+
+        if self.ruta.exists():
+            self._cargar()
+        elif carpeta_anterior is not None and Path(carpeta_anterior).exists():
+            self.importar_carpeta(Path(carpeta_anterior))
+            self.guardar()
+
+    def _cargar(self):
+        """Una lectura secuencial del archivo; la última versión de cada clave gana"""
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                self._falta_salto = not linea.endswith("\n")
+                if not linea.strip():
+                    continue
+                self.lineas += 1
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    # Línea cortada (p. ej. corte de luz a media escritura)
+                    self.lineas_invalidas += 1
+                    continue
+                self._indexar(registro)
+
+    def _indexar(self, registro: Dict):
+        clave = clave_registro(registro)
+        nombre = clave_canonica(registro.get('nombre', ''))
+        sin_curp = _clave_sin_curp(nombre)
+        if clave != sin_curp and sin_curp in self._registros:
+            # Ya tiene CURP: la captura anterior sin CURP era la misma persona
+            del self._registros[sin_curp]
+            self._por_nombre[nombre].remove(sin_curp)
+            if not self._por_nombre[nombre]:
+                del self._por_nombre[nombre]
+        anterior = self._registros.get(clave)
+        if anterior is not None:
+            nombre_anterior = clave_canonica(anterior.get('nombre', ''))
+            if nombre_anterior != nombre:
+                self._por_nombre[nombre_anterior].remove(clave)
+                if not self._por_nombre[nombre_anterior]:
+                    del self._por_nombre[nombre_anterior]
+                self._por_nombre.setdefault(nombre, []).append(clave)
+        else:
+            self._por_nombre.setdefault(nombre, []).append(clave)
+        self._registros[clave] = registro
+
+    # === ESCRITURA ===
+
+    def upsert(self, persona: Dict, capturado: Optional[str] = None) -> str:
+        """
+        Agrega o actualiza una persona (queda pendiente hasta guardar())
+
+        Returns:
+            'nueva', 'actualizada' o 'sin_cambios'
+        """
+        capturado = capturado or datetime.now().isoformat(timespec='seconds')
+        clave = clave_registro(persona)
+        anterior = self._registros.get(clave)
+        if anterior is None:
+            # Capturada antes sin CURP: ese registro se actualiza (ver _indexar)
+            anterior = self._registros.get(_clave_sin_curp(clave_canonica(persona.get('nombre', ''))))
+
+        registro = {
+            'nombre': persona.get('nombre', ''),
+            'curp': persona.get('curp') or '',
+            'primera_captura': anterior['primera_captura'] if anterior else capturado,
+            'capturado': capturado
+        }
+
+        if anterior is not None and (anterior['nombre'], anterior['curp']) == (registro['nombre'], registro['curp']):
+            # Solo cambia la fecha de captura: se actualiza en memoria y se
+            # escribe junto con el lote (sin reescribir nada)
+            estado = 'sin_cambios'
+        else:
+            estado = 'actualizada' if anterior is not None else 'nueva'
+
+        self._indexar(registro)
+        self._pendientes.append(registro)
+        return estado
+
+    def guardar(self):
+        """Agrega las capturas pendientes al final del archivo en una sola escritura"""
+        if not self._pendientes:
+            return
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        lote = ''.join(json.dumps(r, ensure_ascii=False) + "\n" for r in self._pendientes)
+        if self._falta_salto:
+            lote = "\n" + lote
+            self._falta_salto = False
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(lote)
+            f.flush()
+            os.fsync(f.fileno())
+        self.lineas += len(self._pendientes)
+        self._pendientes = []
+
+        if self.lineas > FACTOR_COMPACTAR * len(self._registros):
+            self.compactar()
+
+    def compactar(self):
+        """Reescribe el archivo solo con los registros vigentes"""
+        temporal = self.ruta.with_suffix('.jsonl.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            for registro in self._registros.values():
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.replace(temporal, self.ruta)
+        self.lineas = len(self._registros)
+        self.lineas_invalidas = 0
+        self._falta_salto = False
+
+    def importar_carpeta(self, carpeta: Path) -> int:
+        """Importa la carpeta de un JSON por persona (fecha = mtime del archivo)"""
+        importados = 0
+        for archivo, datos, error in iterar_carpeta(carpeta):
+            if error or not isinstance(datos, dict) or not datos.get('nombre'):
+                continue
+            try:
+                mtime = (carpeta / archivo).stat().st_mtime
+                capturado = datetime.fromtimestamp(mtime).isoformat(timespec='seconds')
+            except OSError:
+                capturado = None
+            self.upsert(datos, capturado)
+            importados += 1
+        return importados
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.guardar()
+
+    # === CONSULTA ===
+
+    def __contains__(self, nombre: str) -> bool:
+        """True si hay alguna captura con ese nombre (misma normalización que el bot)"""
+        return clave_canonica(nombre) in self._por_nombre
+
+    def tiene(self, persona: Dict) -> bool:
+        """True si la persona (por CURP, o por nombre si no trae CURP) ya está guardada"""
+        return clave_registro(persona) in self._registros
+
+    def buscar_curp(self, curp: str) -> Optional[Dict]:
+        return self._registros.get(curp.strip().upper())
+
+    def buscar_nombre(self, nombre: str) -> List[Dict]:
+        return [self._registros[c] for c in self._por_nombre.get(clave_canonica(nombre), [])]
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._registros.values())
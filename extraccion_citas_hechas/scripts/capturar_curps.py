@@ -2,40 +2,41 @@
 # -*- coding: utf-8 -*-
 """
 Script para capturar pantalla y extraer nombres con CURPs
-Uso: python capturar_curps.py
+Uso:
+    python capturar_curps.py                # solo la pantalla actual
+    python capturar_curps.py --continuo     # recorre toda la lista haciendo scroll
 """
 
+import argparse
 import os
-import json
+import time
 import xml.etree.ElementTree as ET
 import subprocess
-import unicodedata
 from pathlib import Path
 from datetime import datetime
 
+from almacen_citas import AlmacenCitas
+
 # Rutas - Script se ejecuta desde carpeta base scrcpy-win64-v3.3.4
 SCRIPT_DIR = Path(__file__).parent.resolve()  # extraccion_citas_hechas/scripts/
 PROJECT_DIR = SCRIPT_DIR.parent  # extraccion_citas_hechas/
-JSON_FOLDER = PROJECT_DIR / "json"  # extraccion_citas_hechas/json/
+JSON_FOLDER = PROJECT_DIR / "json"  # extraccion_citas_hechas/json/ (formato anterior, se importa)
+ALMACEN = PROJECT_DIR / "capturas.jsonl"  # Todas las capturas (ver almacen_citas.py)
 SCREEN_XML = PROJECT_DIR / "screen_temp.xml"  # Temporal en extraccion_citas_hechas/
 
 # Detectar ruta de ADB (en la carpeta raíz scrcpy)
 ADB_PATH = PROJECT_DIR.parent / "adb.exe"
 ADB_CMD = f'"{ADB_PATH}"' if ADB_PATH.exists() else "adb"
 
-
-def sanitize_name(nombre):
-    """Sanitiza el nombre para usar como nombre de archivo"""
-    # Remover acentos
-    nombre_sin_acentos = ''.join(
-        c for c in unicodedata.normalize('NFD', nombre)
-        if unicodedata.category(c) != 'Mn'
-    )
-    # Reemplazar espacios y caracteres especiales
-    nombre_limpio = nombre_sin_acentos.replace(' ', '_').replace('Ñ', 'N').replace('ñ', 'n')
-    # Remover caracteres no alfanuméricos
-    nombre_limpio = ''.join(c for c in nombre_limpio if c.isalnum() or c == '_')
-    return nombre_limpio.upper()
+# Modo continuo: swipe hacia arriba de ~una página (se deja solape; los
+# repetidos se descartan contra lo ya guardado)
+SCROLL_X = 290
+SCROLL_Y_INICIO = 1055
+SCROLL_Y_FIN = 400
+SCROLL_DURACION = 1100        # ms
+DELAY_SCROLL = 1.5            # Espera a que la lista se detenga
+PANTALLAS_IGUALES_FIN = 2     # Scrolls seguidos sin cambio = fin de la lista
+MAX_PAGINAS = 500             # Tope de seguridad
 
 
 def capturar_pantalla():
@@ -115,27 +116,51 @@ def extraer_personas_con_curp(xml_file):
         return []
 
 
-def guardar_json(persona):
-    """Guarda la persona como archivo JSON"""
-    nombre_limpio = sanitize_name(persona['nombre'])
-    ruta_json = JSON_FOLDER / f"{nombre_limpio}.json"
-    
-    # Crear carpeta si no existe
-    JSON_FOLDER.mkdir(exist_ok=True)
+def huella_pantalla(personas):
+    """Identifica el contenido visible: si no cambia tras un scroll, la lista terminó"""
+    return tuple((p['nombre'], p['curp']) for p in personas)
+
+
+def hacer_scroll():
+    """Desliza la lista una página hacia abajo"""
+    cmd = f"{ADB_CMD} shell input swipe {SCROLL_X} {SCROLL_Y_INICIO} {SCROLL_X} {SCROLL_Y_FIN} {SCROLL_DURACION}"
+    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"❌ Error al hacer scroll: {result.stderr}")
+        return False
+    time.sleep(DELAY_SCROLL)
+    return True
+
+
+def guardar_personas(personas, almacen, solo_nuevas=False):
+    """
+    Agrega las personas de una pantalla al almacén (una sola escritura por lote)
     
-    # Guardar JSON
-    with open(ruta_json, 'w', encoding='utf-8') as f:
-        json.dump(persona, f, ensure_ascii=False, indent=2)
+    Args:
+        personas: Personas extraídas de la pantalla
+        almacen: AlmacenCitas abierto
+        solo_nuevas: Omitir las que ya están guardadas (modo continuo: el
+            solape entre páginas trae personas repetidas)
     
-    return ruta_json
+    Returns:
+        Número de personas nuevas
+    """
+    nuevas = 0
+    for persona in personas:
+        if solo_nuevas and almacen.tiene(persona):
+            continue
+        estado = almacen.upsert(persona)
+        if estado == 'nueva':
+            nuevas += 1
+        icono = {'nueva': '✅', 'actualizada': '🔁', 'sin_cambios': '🔁'}[estado]
+        print(f"  {icono} {persona['nombre']}" + ("" if estado == 'nueva' else f" ({estado.replace('_', ' ')})"))
+        print(f"     CURP: {persona['curp']}")
+    almacen.guardar()
+    return nuevas
 
 
-def main():
-    print("="*60)
-    print("CAPTURAR PANTALLA Y EXTRAER CURPs")
-    print("="*60)
-    print(f"\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
+def captura_unica():
+    """Captura y guarda solo la pantalla actual"""
     # 1. Capturar pantalla
     if not capturar_pantalla():
         print("\n❌ No se pudo capturar la pantalla")
@@ -151,13 +176,11 @@ def main():
     
     print(f"✅ Encontradas {len(personas)} personas")
     
-    # 3. Guardar cada persona
-    print("\n💾 Guardando archivos JSON...")
-    for persona in personas:
-        ruta = guardar_json(persona)
-        print(f"  ✅ {persona['nombre']}")
-        print(f"     CURP: {persona['curp']}")
-        print(f"     Archivo: {ruta.name}")
+    # 3. Guardar en el almacén
+    print("\n💾 Guardando capturas...")
+    almacen = AlmacenCitas(ALMACEN, carpeta_anterior=JSON_FOLDER)
+    guardar_personas(personas, almacen)
+    print(f"   Almacén: {ALMACEN.name} ({len(almacen)} personas)")
     
     # 4. Limpiar archivo temporal
     if os.path.exists(SCREEN_XML):
@@ -168,5 +191,79 @@ def main():
     print("="*60)
 
 
+def captura_continua(max_paginas=MAX_PAGINAS):
+    """
+    Captura → extrae → guarda las nuevas → scroll, hasta que la pantalla
+    deja de cambiar (fin de la lista)
+    """
+    almacen = AlmacenCitas(ALMACEN, carpeta_anterior=JSON_FOLDER)
+    print(f"\n📂 Ya guardadas: {len(almacen)} personas")
+    
+    inicio = time.perf_counter()
+    huella_anterior = None
+    iguales = 0
+    paginas = 0
+    vistas = 0
+    nuevas = 0
+    
+    while paginas < max_paginas:
+        paginas += 1
+        print(f"\n--- Página {paginas} ---")
+        if not capturar_pantalla():
+            print("\n❌ No se pudo capturar la pantalla, se detiene el recorrido")
+            break
+        
+        personas = extraer_personas_con_curp(SCREEN_XML)
+        huella = huella_pantalla(personas)
+        if huella == huella_anterior:
+            iguales += 1
+            print(f"⏸️  La pantalla no cambió ({iguales}/{PANTALLAS_IGUALES_FIN})")
+            if iguales >= PANTALLAS_IGUALES_FIN:
+                print("🏁 Fin de la lista")
+                break
+        else:
+            iguales = 0
+            vistas += len(personas)
+            nuevas += guardar_personas(personas, almacen, solo_nuevas=True)
+        huella_anterior = huella
+        
+        if not hacer_scroll():
+            break
+    else:
+        print(f"\n⚠️  Se alcanzó el tope de {max_paginas} páginas")
+    
+    if os.path.exists(SCREEN_XML):
+        os.remove(SCREEN_XML)
+    
+    minutos = (time.perf_counter() - inicio) / 60
+    print("\n" + "="*60)
+    print(f"✅ Recorrido completado: {paginas} páginas en {minutos:.1f} min")
+    print(f"   Personas en pantalla: {vistas} (con repetidas por solape)")
+    print(f"   Nuevas guardadas:     {nuevas}")
+    print(f"   Total guardadas:      {len(almacen)}")
+    if minutos > 0:
+        print(f"   ⚡ {nuevas / minutos:.1f} personas/minuto")
+    print("="*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captura nombres y CURPs de la pantalla de visitas")
+    parser.add_argument('--continuo', action='store_true',
+                        help="Recorrer toda la lista haciendo scroll hasta el final")
+    parser.add_argument('--max-paginas', type=int, default=MAX_PAGINAS,
+                        help="Tope de páginas en modo continuo")
+    args = parser.parse_args()
+    
+    print("="*60)
+    print("CAPTURAR PANTALLA Y EXTRAER CURPs")
+    print("="*60)
+    print(f"\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    if args.continuo:
+        captura_continua(args.max_paginas)
+    else:
+        captura_unica()
+
+
 if __name__ == "__main__":
     main()
@@ -1,68 +1,57 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script para convertir los archivos JSON de CURP a un archivo CSV
+Script para convertir las capturas de CURP a un archivo CSV
 
-Lee todos los archivos JSON de la carpeta json/ y los convierte a un CSV
-con dos columnas: nombre, CURP
+Lee el almacén capturas.jsonl (una lectura secuencial; si aún no existe, se
+importa la carpeta json/ del formato anterior) y lo convierte a un CSV con
+las columnas: nombre, CURP, capturado
 
 Uso:
     python json_to_csv.py
 """
 
-import os
-import json
 import csv
 from pathlib import Path
 
+from almacen_citas import AlmacenCitas
+
 # Rutas absolutas
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
 JSON_FOLDER = PROJECT_DIR / "json"
+ALMACEN = PROJECT_DIR / "capturas.jsonl"
 CSV_FOLDER = PROJECT_DIR / "csv"
 OUTPUT_CSV = CSV_FOLDER / "curps.csv"
 
 
-def leer_json_files():
+def leer_capturas():
     """
-    Lee todos los archivos JSON de la carpeta json/
+    Lee el almacén de capturas (registro vigente de cada persona)
     
     Returns:
-        Lista de diccionarios con {nombre, curp}
+        Lista de diccionarios con {nombre, CURP, capturado}
     """
     datos = []
     
-    if not JSON_FOLDER.exists():
-        print(f"❌ Error: No existe la carpeta {JSON_FOLDER}")
+    if not ALMACEN.exists() and not JSON_FOLDER.exists():
+        print(f"❌ Error: No existe {ALMACEN.name} ni la carpeta {JSON_FOLDER}")
         return datos
     
-    # Obtener todos los archivos JSON
-    json_files = list(JSON_FOLDER.glob("*.json"))
+    almacen = AlmacenCitas(ALMACEN, carpeta_anterior=JSON_FOLDER)
+    if almacen.lineas_invalidas:
+        print(f"⚠️  {almacen.lineas_invalidas} líneas ilegibles en {ALMACEN.name} (se omiten)")
     
-    if not json_files:
-        print(f"⚠️  No se encontraron archivos JSON en {JSON_FOLDER}")
-        return datos
+    for registro in almacen:
+        # Solo agregar si tiene nombre (CURP puede venir vacío)
+        if registro['nombre']:
+            datos.append({
+                'nombre': registro['nombre'],
+                'CURP': registro['curp'] or 'SIN CURP',
+                'capturado': registro.get('capturado') or ''
+            })
     
-    print(f"📂 Encontrados {len(json_files)} archivos JSON")
-    
-    # Leer cada archivo
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                nombre = data.get('nombre', '')
-                curp = data.get('curp', '')
-                
-                # Solo agregar si tiene nombre (CURP puede ser None)
-                if nombre:
-                    datos.append({
-                        'nombre': nombre,
-                        'CURP': curp if curp else 'SIN CURP'
-                    })
-        
-        except Exception as e:
-            print(f"⚠️  Error al leer {json_file.name}: {e}")
+    print(f"📂 Leídas {len(datos)} personas de {ALMACEN.name}")
     
     return datos
 
@@ -72,7 +61,7 @@ def guardar_csv(datos):
     Guarda los datos en un archivo CSV
     
     Args:
-        datos: Lista de diccionarios con {nombre, CURP}
+        datos: Lista de diccionarios con {nombre, CURP, capturado}
     """
     # Crear carpeta csv si no existe
     CSV_FOLDER.mkdir(exist_ok=True)
@@ -82,7 +71,7 @@ def guardar_csv(datos):
     
     # Escribir CSV
     with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=['nombre', 'CURP'])
+        writer = csv.DictWriter(f, fieldnames=['nombre', 'CURP', 'capturado'])
         
         # Escribir encabezados
         writer.writeheader()
@@ -106,11 +95,11 @@ def main():
     Función principal
     """
     print("="*60)
-    print("CONVERTIR JSON A CSV")
+    print("CONVERTIR CAPTURAS A CSV")
     print("="*60)
     
-    # Leer archivos JSON
-    datos = leer_json_files()
+    # Leer capturas
+    datos = leer_capturas()
     
     if not datos:
         print("❌ No hay datos para convertir")
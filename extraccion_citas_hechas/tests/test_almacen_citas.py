@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del almacén de capturas (almacen_citas.py)
+Prueba: una persona capturada primero sin CURP y después con él queda como
+un solo registro, en memoria y al volver a leer el archivo
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from almacen_citas import AlmacenCitas
+
+CURP = "GALA900101MVZRPN05"
+
+
+def test_sin_curp_y_luego_con_curp():
+    print("="*60)
+    print("TEST: upsert sin CURP -> con CURP")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "capturas.jsonl"
+        with AlmacenCitas(ruta) as almacen:
+            assert almacen.upsert({'nombre': "GARCIA LOPEZ ANA"}, "2024-01-01T10:00:00") == 'nueva'
+            assert almacen.upsert({'nombre': "GARCÍA LÓPEZ ANA", 'curp': CURP},
+                                  "2024-01-02T10:00:00") == 'actualizada'
+            # Otra persona con el mismo nombre y distinto CURP sigue siendo otra
+            assert almacen.upsert({'nombre': "GARCIA LOPEZ ANA", 'curp': "GALA910202MVZRPN08"},
+                                  "2024-01-03T10:00:00") == 'nueva'
+            assert len(almacen) == 2
+
+        # Releído del archivo: el registro sin CURP no reaparece
+        almacen = AlmacenCitas(ruta)
+        registros = almacen.buscar_nombre("GARCIA LOPEZ ANA")
+        print(f"   {registros}")
+        assert len(almacen) == 2
+        assert sorted(r['curp'] for r in registros) == [CURP, "GALA910202MVZRPN08"]
+        assert almacen.buscar_curp(CURP)['primera_captura'] == "2024-01-01T10:00:00"
+        assert not almacen.tiene({'nombre': "GARCIA LOPEZ ANA"})
+
+
+if __name__ == '__main__':
+    test_sin_curp_y_luego_con_curp()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -6,72 +6,91 @@ Versión modular con manejo robusto de errores y sistema de checkpoint
 """
 
 import os
+import sys
 import time
 import json
 import logging
-import xml.etree.ElementTree as ET
-from typing import Set
 from pathlib import Path
 
 # Importar módulos locales
 from config import *
+from coordenadas import invalidar_controles, tap_control
+from identidad import IndiceIdentidad
+from navegacion import Navegador
+from padron import PadronLista, barrer_lista, planificar
+from pantalla import SondaPantalla, es_lista_sin_visita
+from persistencia import PersistidorCurp
+from reintentos import PlanificadorReintentos
+import metricas
+from entrada import cerrar_inyector
+from jerarquia import cerrar_jerarquia
+from registro import configurar_logging, detener_logging, evento, registros_descartados
+from scroll import CalibradorScroll, PosicionLista
 from utils import (
     sanitize_name,
     adb_tap,
-    safe_adb_command,
+    adb_input,
     dump_screen_xml,
     get_people_with_buttons,
-    extraer_curp_de_xml
+    obtener_filas_nombres
 )
 
 
 # === CONFIGURACIÓN DE LOGGING ===
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Asíncrona (ver registro.py): escribir el log nunca detiene el loop del dispositivo
+configurar_logging(LOG_FILE, LOG_EVENTOS_FILE, LOG_NIVEL, LOG_COLA_MAX)
 logger = logging.getLogger(__name__)
 
+# === ESTADO DE LA LISTA ===
+# Calibración del swipe y página actual (compartidos por el loop y los resets)
+calibrador = CalibradorScroll()
+posicion = PosicionLista()
+# Qué pantalla se ve (foco de la ventana cuando ya se aprendió, dump si no)
+sonda = SondaPantalla()
+# Camino más corto a la lista "Sin visita" desde la pantalla detectada
+navegador = Navegador()
+# Fallas por persona: se reintentan después del pase principal, con límite
+reintentos = PlanificadorReintentos()
+
 
 # === FUNCIONES DE CHECKPOINT ===
 
 def load_checkpoint() -> dict:
     """
-    Carga el progreso guardado desde progreso.json
+    Carga el progreso guardado desde progreso.json y la carpeta json/
     
     Returns:
-        Dict con 'procesados' (set de nombres)
+        Dict con 'procesados' (IndiceIdentidad con pertenencia O(1) por nombre canónico)
     """
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"Checkpoint cargado: {len(data.get('procesados', []))} personas ya procesadas")
-                return {
-                    'procesados': set(data.get('procesados', []))
-                }
-        except Exception as e:
-            logger.error(f"Error al cargar checkpoint: {e}")
+    try:
+        procesados = IndiceIdentidad.construir(CHECKPOINT_FILE, FOLDER_JSON)
+    except Exception as e:
+        logger.error("Error al cargar checkpoint: %s", e)
+        procesados = IndiceIdentidad.construir(None, FOLDER_JSON)
+    
+    reporte = procesados.reporte_reconciliacion()
+    logger.info("Checkpoint cargado: %s personas ya procesadas (%s en checkpoint, %s con JSON)",
+                len(procesados), reporte['en_checkpoint'], reporte['con_archivo'])
+    if reporte['colisiones']:
+        logger.warning("⚠️  %s colisiones de identidad (ver tools/verificar_faltantes.py)",
+                       len(reporte['colisiones']))
     
-    return {'procesados': set()}
+    return {'procesados': procesados}
 
 
-def save_checkpoint(procesados: Set[str], scroll_count: int = 0, ultimo_scroll: int = 0):
+def save_checkpoint(procesados: IndiceIdentidad, scroll_count: int = 0, ultimo_scroll: int = 0):
     """
     Guarda el progreso actual en progreso.json
     
     Args:
-        procesados: Set de nombres ya procesados
+        procesados: Índice de personas ya procesadas
         scroll_count: (Obsoleto, mantenido por compatibilidad)
         ultimo_scroll: (Obsoleto, mantenido por compatibilidad)
     """
     try:
         data = {
             'procesados': list(procesados),
+            'abandonados': reintentos.abandonados(),
             'timestamp': time.time(),
             'total_procesados': len(procesados)
         }
@@ -79,13 +98,71 @@ def save_checkpoint(procesados: Set[str], scroll_count: int = 0, ultimo_scroll:
         with open(CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         
-        logger.debug(f"Checkpoint guardado: {len(procesados)} personas")
+        logger.debug("Checkpoint guardado: %s personas", len(procesados))
     except Exception as e:
-        logger.error(f"Error al guardar checkpoint: {e}")
+        logger.error("Error al guardar checkpoint: %s", e)
+
+
+# Extracción del CURP y escritura de JSON/checkpoint fuera del loop del dispositivo
+persistidor = PersistidorCurp(FOLDER_JSON, save_checkpoint)
+
+
+def atender_resultados(procesados: IndiceIdentidad):
+    """
+    Recoge lo que terminó el persistidor: evento por persona y, si el guardado
+    falló, la persona sale de procesados para intentarla otra vez (en un repaso)
+    """
+    for resultado in persistidor.resultados():
+        nombre = resultado['nombre']
+        if resultado['error']:
+            procesados.descartar(nombre)
+            registrar_fallo(nombre, f"guardar: {resultado['error']}")
+            evento('persona', nombre=nombre, resultado='fallo', paso='guardar',
+                   segundos=resultado['segundos'])
+            continue
+        reintentos.registrar_exito(nombre)
+        if not resultado['curp']:
+            # Quizá 'Siguiente' no llevó a la pantalla del CURP: recalibrarlo
+            invalidar_controles('BTN_SIGUIENTE', 'BTN_INICIAR_VISITA')
+        evento('persona', nombre=nombre, resultado='guardado' if resultado['curp'] else 'sin_curp',
+               segundos=resultado['segundos'])
+
+
+def registrar_fallo(nombre: str, motivo: str):
+    """Anota la falla en el planificador de reintentos (y en el JSONL)"""
+    abandonada = reintentos.registrar_fallo(nombre, motivo)
+    evento('reintento', nombre=nombre, motivo=motivo, abandonada=abandonada)
+
+
+def iniciar_repaso() -> bool:
+    """
+    Fin de un pase por la lista: si quedan personas por reintentar, espera a
+    que toque la primera, vuelve arriba y empieza otro recorrido
+    
+    Returns:
+        False si no hay nada que reintentar (el bot termina)
+    """
+    espera = reintentos.iniciar_repaso()
+    if espera is None:
+        return False
+    
+    logger.info("🔁 Repaso %s: %s personas por reintentar", reintentos.repasos, reintentos.pendientes)
+    if espera > 0:
+        logger.info("   Esperando %.0fs al siguiente reintento...", espera)
+        time.sleep(espera)
+    apply_filters()
+    posicion.reiniciar()
+    calibrador.descartar_medicion()
+    return True
 
 
 # === FUNCIONES DE FLUJO ===
 
+# Botones que llevan a la lista "Sin visita" (se recalibran si la lista no aparece)
+CONTROLES_FILTRO = ('BTN_INICIO', 'BTN_VISITAR_MENU', 'BTN_FILTRO', 'BTN_VALOR_TODOS',
+                    'BTN_TODOS_OPCION', 'BTN_APLICAR_FILTRO')
+
+
 def apply_filters():
     """
     Aplica los filtros para mostrar todas las personas
@@ -94,20 +171,20 @@ def apply_filters():
     logger.info("Aplicando filtros para mostrar lista completa...")
     
     # Ir al inicio
-    adb_tap(BTN_INICIO, DELAY_TAP_DEFAULT)
+    tap_control('BTN_INICIO', DELAY_TAP_DEFAULT)
     
     # Entrar al padrón
-    adb_tap(BTN_VISITAR_MENU, DELAY_TAP_DEFAULT)
+    tap_control('BTN_VISITAR_MENU', DELAY_TAP_DEFAULT)
     
     # Abrir filtro
-    adb_tap(BTN_FILTRO, DELAY_TAP_DEFAULT)
+    tap_control('BTN_FILTRO', DELAY_TAP_DEFAULT)
     
     # Seleccionar "Todos"
-    adb_tap(BTN_VALOR_TODOS, DELAY_TAP_DEFAULT)
-    adb_tap(BTN_TODOS_OPCION, DELAY_TAP_DEFAULT)
+    tap_control('BTN_VALOR_TODOS', DELAY_TAP_DEFAULT)
+    tap_control('BTN_TODOS_OPCION', DELAY_TAP_DEFAULT)
     
     # Aplicar filtro
-    adb_tap(BTN_APLICAR_FILTRO, DELAY_FILTRO_CARGA)
+    tap_control('BTN_APLICAR_FILTRO', DELAY_FILTRO_CARGA)
     
     logger.info("Filtros aplicados. Lista cargada.")
 
@@ -127,14 +204,14 @@ def regresar_a_lista():
     logger.debug("   Regresando a lista (2x ATRÁS)...")
     
     # Primer ATRÁS (salir de pantalla CURP)
-    if not safe_adb_command("shell input keyevent 4"):
+    if not adb_input("shell input keyevent 4"):
         logger.error("   ❌ Falló primer ATRÁS")
         return False
     
     time.sleep(1.5)  # Esperar a que procese
     
     # Segundo ATRÁS (salir de ficha de persona)
-    if not safe_adb_command("shell input keyevent 4"):
+    if not adb_input("shell input keyevent 4"):
         logger.error("   ❌ Falló segundo ATRÁS")
         return False
     
@@ -144,227 +221,361 @@ def regresar_a_lista():
     return True
 
 
-def verificar_pantalla_correcta() -> bool:
+def restaurar_posicion(desde: int = 0) -> bool:
+    """
+    Regresa a la página donde íbamos después de un reset (la lista quedó arriba)
+    
+    Estrategia:
+    1. Flings rápidos a ciegas (sin dumps) sin pasarse de la página guardada
+    2. Scrolls calibrados de una página hasta ver la huella (nombres guardados)
+    
+    Args:
+        desde: Página en la que está la lista ahora (> 0 para saltar hacia
+               adelante sin reset, ver saltar_a_pagina)
+    
+    Returns:
+        True si se verificó la huella (o no había nada que restaurar)
+    """
+    objetivo = posicion.pagina
+    if desde == 0 and (objetivo == 0 or not RESTAURAR_POSICION):
+        posicion.reiniciar()
+        return True
+    
+    flings = posicion.flings_necesarios(desde)
+    logger.info("⏩ Restaurando posición: página %s (%s flings)", objetivo, flings)
+    
+    for _ in range(flings):
+        adb_input(calibrador.comando_fling())
+        time.sleep(DELAY_FLING)
+    time.sleep(DELAY_SCROLL)
+    
+    for pasos in range(RESTAURAR_PASOS_MAX + 1):
+        if dump_screen_xml(SCREEN_XML_TEMP):
+            filas = obtener_filas_nombres(SCREEN_XML_TEMP)
+            if posicion.coincide(filas):
+                posicion.ajustar_fling(flings, pasos, desde)
+                posicion.actualizar(filas)
+                logger.info("   ✅ Posición restaurada (página %s, %s pasos extra)", objetivo, pasos)
+                return True
+        
+        if pasos < RESTAURAR_PASOS_MAX:
+            adb_input(calibrador.comando())
+            time.sleep(DELAY_SCROLL)
+    
+    # Probablemente un fling avanzó más de lo estimado: ser más conservador la próxima vez
+    posicion.paginas_por_fling = max(1.0, posicion.paginas_por_fling / 2)
+    logger.warning("   ⚠️  No se encontró la huella, volviendo al inicio de la lista")
+    return False
+
+
+def saltar_a_pagina(padron: PadronLista, destino: int, procesados: IndiceIdentidad) -> bool:
+    """
+    Avanza con flings hasta la página `destino` y la verifica con los nombres
+    que el padrón pone ahí ahora (los procesados ya salieron de la lista)
+    
+    Returns:
+        False si no se encontró: la lista se deja arriba (filtros reaplicados)
+    """
+    desde = posicion.pagina
+    logger.info("🗂️  Sin pendientes en pantalla: saltando de la página %s a la %s", desde, destino)
+    posicion.pagina = destino
+    posicion.huella = padron.nombres_en(destino, procesados)
+    calibrador.descartar_medicion()
+    if restaurar_posicion(desde):
+        return True
+    
+    logger.warning("   ⚠️  La página %s del padrón ya no coincide, volviendo al inicio", destino)
+    apply_filters()
+    posicion.reiniciar()
+    return False
+
+
+def reiniciar_lista():
+    """
+    Vuelve a la lista por el camino más corto (ver navegacion.py); si para eso
+    hubo que reaplicar filtros, regresa a la página donde íbamos
+    Si la huella no aparece, la lista se queda arriba y se empieza desde ahí
+    """
+    lista_arriba = navegador.ir_a_lista()
+    if lista_arriba is None:
+        # Reset completo (Inicio + filtros)
+        tap_control('BTN_INICIO', DELAY_TAP_DEFAULT)
+        apply_filters()
+        lista_arriba = True
+    
+    if lista_arriba:
+        calibrador.descartar_medicion()
+        if not restaurar_posicion():
+            apply_filters()
+            posicion.reiniciar()
+
+
+def verificar_pantalla_correcta(xml_path: str = None) -> bool:
     """
     Verifica que estamos en la pantalla correcta (filtro "Sin visita realizada")
     
     VALIDACIÓN CRÍTICA: Antes de procesar personas, verificamos que no nos hayamos
     salido accidentalmente de la pantalla correcta.
     
+    Args:
+        xml_path: Dump recién tomado de la pantalla; sin él se pregunta a la sonda
+    
     Returns:
         True si estamos en la pantalla correcta, False si no
     """
     try:
-        # Capturar XML de la pantalla actual
-        if not dump_screen_xml(SCREEN_XML_TEMP):
-            logger.warning("⚠️  No se pudo capturar XML para verificación")
-            return False
-        
-        # Buscar el texto indicador "Personas sin visita realizada" o "sin visita"
-        tree = ET.parse(SCREEN_XML_TEMP)
-        root = tree.getroot()
+        if xml_path is not None:
+            correcta = es_lista_sin_visita(xml_path)
+        else:
+            correcta = sonda.responder('lista_sin_visita', SCREEN_XML_TEMP)
+            if correcta is None:
+                logger.warning("⚠️  No se pudo capturar XML para verificación")
+                return False
         
-        for node in root.findall(".//node[@class='android.widget.TextView']"):
-            text = node.get("text", "").strip()
-            if "sin visita" in text.lower() or "sin visita realizada" in text.lower():
-                logger.debug("✓ Verificación: Estamos en la pantalla correcta")
-                return True
+        if correcta:
+            logger.debug("✓ Verificación: Estamos en la pantalla correcta")
+            return True
         
         # Si no encontramos el texto, estamos en la pantalla incorrecta
         logger.warning("⚠️  ALERTA: No estamos en la pantalla 'Sin visita realizada'")
         return False
         
     except Exception as e:
-        logger.error(f"Error al verificar pantalla: {e}")
+        logger.error("Error al verificar pantalla: %s", e)
         return False
 
 
-def recuperar_pantalla_correcta():
+def recuperar_pantalla_correcta(xml_actual: str = None):
     """
     Intenta recuperar la pantalla correcta si nos salimos accidentalmente
     
-    Estrategia SIMPLE:
-    1. Presionar botón INICIO para resetear
-    2. Reaplicar filtros (como al inicio del bot)
+    Estrategia:
+    1. Detectar la pantalla actual y seguir el camino más corto a la lista
+       (p. ej. un ATRÁS desde la ficha, o solo el filtro desde el padrón)
+    2. Si no se llegó: Inicio + filtros completos, con los botones recalibrados
+    3. Si la lista quedó arriba, regresar a la página donde íbamos (flings + huella)
+    
+    Args:
+        xml_actual: Dump con el que se detectó el problema (se reutiliza)
     """
     logger.warning("🔄 Intentando recuperar pantalla correcta...")
     
-    # Presionar botón INICIO para resetear
-    logger.debug("   Presionando botón INICIO...")
-    adb_tap(BTN_INICIO, DELAY_TAP_DEFAULT)
+    lista_arriba = navegador.ir_a_lista(xml_actual)
     
-    # Reaplicar filtros (igual que al inicio)
-    apply_filters()
+    # Si no funcionó, puede ser un botón que cambió de lugar: recalibrar y reintentar
+    if lista_arriba is None:
+        logger.warning("   Reintentando con Inicio + filtros y coordenadas recalibradas...")
+        invalidar_controles(*CONTROLES_FILTRO)
+        tap_control('BTN_INICIO', DELAY_TAP_DEFAULT)
+        apply_filters()
+        if not verificar_pantalla_correcta():
+            logger.error("❌ No se pudo recuperar la pantalla correcta")
+            return False
+        lista_arriba = True
     
-    # Verificar si funcionó
-    if verificar_pantalla_correcta():
-        logger.info("✅ Pantalla correcta recuperada")
-        return True
-    else:
-        logger.error("❌ No se pudo recuperar la pantalla correcta")
-        return False
+    logger.info("✅ Pantalla correcta recuperada")
+    if lista_arriba:
+        calibrador.descartar_medicion()
+        if not restaurar_posicion():
+            apply_filters()
+            posicion.reiniciar()
+    return True
 
 
-def process_person(nombre: str, coordenadas_boton: str, procesados: Set[str]) -> bool:
+def process_person(nombre: str, coordenadas_boton: str, procesados: IndiceIdentidad) -> bool:
     """
     Procesa una persona: entra a su ficha, captura CURP, guarda JSON
     
     Args:
         nombre: Nombre completo de la persona
         coordenadas_boton: Coordenadas del botón "Visitar" de esta persona
-        procesados: Set de personas ya procesadas
+        procesados: Índice de personas ya procesadas
     
     Returns:
         True si se procesó exitosamente
     """
     nombre_limpio = sanitize_name(nombre)
-    ruta_json = os.path.join(FOLDER_JSON, f"{nombre_limpio}.json")
     
-    # Verificar si ya existe el archivo
-    if os.path.exists(ruta_json):
-        logger.info(f"⏭️  Ya existe: {nombre_limpio}.json - Saltando")
+    # Verificar si ya existe el archivo (índice construido al inicio, sin tocar disco)
+    if procesados.tiene_archivo(nombre):
+        logger.info("⏭️  Ya existe: %s.json - Saltando", nombre_limpio)
         procesados.add(nombre)
+        evento('persona', nombre=nombre, resultado='ya_existe')
         return True
     
-    logger.info(f"📝 Procesando ({len(procesados)+1}/{TOTAL_OBJETIVO}): {nombre}")
+    logger.info("📝 Procesando (%s/%s): %s", len(procesados)+1, TOTAL_OBJETIVO, nombre)
+    inicio = time.perf_counter()
+    
+    def fallo(paso: str) -> bool:
+        evento('persona', nombre=nombre, resultado='fallo', paso=paso,
+               segundos=round(time.perf_counter() - inicio, 2))
+        registrar_fallo(nombre, paso)
+        return False
     
     try:
         # 1. Hacer clic en el botón "Visitar" de ESTA persona (coordenadas dinámicas)
-        logger.debug(f"   Clic en botón Visitar: {coordenadas_boton}")
+        logger.debug("   Clic en botón Visitar: %s", coordenadas_boton)
         if not adb_tap(coordenadas_boton, DELAY_TAP_DEFAULT):
-            logger.error(f"   ❌ Falló tap en botón Visitar")
-            return False
+            logger.error("   ❌ Falló tap en botón Visitar")
+            return fallo('visitar')
         
         # 2. Iniciar visita (esperar a ver si la pantalla cambia)
-        logger.debug(f"   Iniciando visita...")
-        if not adb_tap(BTN_INICIAR_VISITA, DELAY_TAP_DEFAULT):
-            logger.error(f"   ❌ Falló tap en Iniciar Visita")
-            return False
+        logger.debug("   Iniciando visita...")
+        if not tap_control('BTN_INICIAR_VISITA', DELAY_TAP_DEFAULT):
+            logger.error("   ❌ Falló tap en Iniciar Visita")
+            return fallo('iniciar_visita')
         
         # 2.5. Verificar si la visita ya fue realizada
         # Si la pantalla no cambia en 5 segundos, significa que ya se visitó
-        logger.debug(f"   Verificando si la visita ya fue realizada (esperando 5s)...")
+        logger.debug("   Verificando si la visita ya fue realizada (esperando 5s)...")
         time.sleep(5)
         
-        # Capturar XML para verificar si estamos en la misma pantalla
-        if not dump_screen_xml("temp_check.xml"):
-            logger.warning(f"   ⚠️  No se pudo verificar estado de visita")
-        else:
-            # Buscar si sigue apareciendo "Iniciar visita" (señal de que ya fue visitada)
-            try:
-                tree = ET.parse("temp_check.xml")
-                root = tree.getroot()
-                
-                # Buscar texto "Iniciar visita" o "Ya visitada" o similar
-                for node in root.findall(".//node[@class='android.widget.TextView']"):
-                    text = node.get("text", "").strip()
-                    if "Iniciar visita" in text or "visitada" in text.lower():
-                        logger.warning(f"   ⚠️  Esta persona ya fue visitada. Omitiendo...")
-                        # Regresar al inicio
-                        adb_tap(BTN_INICIO, DELAY_TAP_DEFAULT)
-                        apply_filters()
-                        # Marcar como procesada para no intentar de nuevo
-                        procesados.add(nombre)
-                        return True  # Retornar True porque técnicamente se "procesó"
-                
-                # Limpiar archivo temporal
-                if os.path.exists("temp_check.xml"):
-                    os.remove("temp_check.xml")
-                    
-            except Exception as e:
-                logger.warning(f"   ⚠️  Error al verificar estado: {e}")
+        # ¿Sigue apareciendo "Iniciar visita"? (señal de que ya fue visitada)
+        # La sonda usa el foco de la ventana si ya sabe distinguir ambas pantallas
+        ya_visitada = sonda.responder('ya_visitada', "temp_check.xml")
+        if os.path.exists("temp_check.xml"):
+            os.remove("temp_check.xml")
+        
+        if ya_visitada is None:
+            logger.warning("   ⚠️  No se pudo verificar estado de visita")
+        elif ya_visitada:
+            logger.warning("   ⚠️  Esta persona ya fue visitada. Omitiendo...")
+            # Regresar al inicio y a la página donde íbamos
+            reiniciar_lista()
+            # Marcar como procesada para no intentar de nuevo
+            procesados.add(nombre)
+            evento('persona', nombre=nombre, resultado='ya_visitada',
+                   segundos=round(time.perf_counter() - inicio, 2))
+            return True  # Retornar True porque técnicamente se "procesó"
         
         # Si llegamos aquí, la pantalla cambió (visita no realizada previamente)
         # Esperar el tiempo restante para que carguen los datos
-        logger.debug(f"   Visita no realizada previamente. Esperando {DELAY_CARGA_DATOS - 5}s más...")
+        logger.debug("   Visita no realizada previamente. Esperando %ss más...", DELAY_CARGA_DATOS - 5)
         time.sleep(DELAY_CARGA_DATOS - 5)  # Ya esperamos 5s, esperamos el resto
         
+        # 2.6. Campos de la ficha: con los datos ya cargados (a los 5s aún pueden faltar)
+        datos_ficha = b""
+        if CAPTURA_CAMPOS:
+            ruta_ficha = os.path.join(FOLDER_XML, f"{nombre_limpio}_ficha.xml")
+            if dump_screen_xml(ruta_ficha):
+                with open(ruta_ficha, 'rb') as f:
+                    datos_ficha = f.read()
+                os.remove(ruta_ficha)
+            else:
+                logger.warning("   ⚠️  No se pudo capturar la ficha; solo campos de la pantalla del CURP")
+        
         # 3. Ir a la pantalla del CURP
-        logger.debug(f"   Presionando 'Siguiente' para ir a pantalla CURP...")
-        if not adb_tap(BTN_SIGUIENTE, DELAY_TAP_DEFAULT):
-            logger.error(f"   ❌ Falló tap en Siguiente")
-            return False
+        logger.debug("   Presionando 'Siguiente' para ir a pantalla CURP...")
+        if not tap_control('BTN_SIGUIENTE', DELAY_TAP_DEFAULT):
+            logger.error("   ❌ Falló tap en Siguiente")
+            return fallo('siguiente')
         
         # 3.5. Esperar a que cargue la pantalla del CURP (CRÍTICO)
-        logger.debug(f"   Esperando {DELAY_SIGUIENTE}s a que cargue pantalla CURP...")
+        logger.debug("   Esperando %ss a que cargue pantalla CURP...", DELAY_SIGUIENTE)
         time.sleep(DELAY_SIGUIENTE)
         
-        # 4. Capturar XML de la pantalla del CURP
-        logger.debug(f"   Capturando XML del CURP...")
+        # 4-5. Capturar XML de la pantalla del CURP (servidor de jerarquía, o dump + descarga)
+        logger.debug("   Capturando XML del CURP...")
         ruta_xml_temp = os.path.join(FOLDER_XML, f"{nombre_limpio}_temp.xml")
-        if not safe_adb_command(f"shell uiautomator dump {CURP_XML_TEMP}"):
-            logger.error(f"   ❌ Falló dump del XML")
-            return False
-        
-        # 5. Descargar XML temporal
-        logger.debug(f"   Descargando XML temporal...")
-        if not safe_adb_command(f"pull {CURP_XML_TEMP} {ruta_xml_temp}"):
-            logger.error(f"   ❌ Falló pull del XML")
-            return False
-        
-        # 6. Extraer CURP del XML
-        logger.debug(f"   Extrayendo CURP del XML...")
-        curp = extraer_curp_de_xml(ruta_xml_temp)
+        if not dump_screen_xml(ruta_xml_temp):
+            logger.error("   ❌ Falló dump del XML")
+            return fallo('dump_curp')
         
-        if not curp:
-            logger.warning(f"   ⚠️  No se pudo extraer CURP del XML")
-            # Guardar JSON sin CURP
-            data = {
-                "nombre": nombre,
-                "curp": None,
-                "error": "No se encontró CURP en el XML"
-            }
-        else:
-            # Guardar JSON con CURP
-            data = {
-                "nombre": nombre,
-                "curp": curp
-            }
-        
-        # 7. Guardar JSON
-        with open(ruta_json, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"   ✅ Guardado: {nombre_limpio}.json" + (f" (CURP: {curp})" if curp else " (sin CURP)"))
-        
-        # 8. Borrar XML temporal
-        if os.path.exists(ruta_xml_temp):
-            os.remove(ruta_xml_temp)
+        # 6-8. Extraer CURP y guardar JSON en segundo plano (ver persistencia.py)
+        with open(ruta_xml_temp, 'rb') as f:
+            datos_xml = f.read()
+        os.remove(ruta_xml_temp)
+        persistidor.encolar(nombre, nombre_limpio, datos_xml, inicio, datos_ficha)
         
         # 9. OPTIMIZACIÓN: Regresar a lista con botón ATRÁS (mantiene scroll)
-        logger.debug(f"   Regresando a lista...")
+        logger.debug("   Regresando a lista...")
         if not regresar_a_lista():
-            logger.warning(f"   ⚠️  Falló regreso a lista, intentando recuperar...")
-            # Fallback: ir al inicio y reaplicar filtros
-            adb_tap(BTN_INICIO, DELAY_TAP_DEFAULT)
-            apply_filters()
+            logger.warning("   ⚠️  Falló regreso a lista, intentando recuperar...")
+            # Fallback: ir al inicio, reaplicar filtros y volver a la página
+            reiniciar_lista()
         
-        logger.info(f"   ✅ Completado: {nombre_limpio}.json")
-        procesados.add(nombre)
+        # Se marca ya: si el guardado falla, atender_resultados() la quita
+        logger.debug("   ✅ Completado: %s.json (guardado en cola)", nombre_limpio)
+        procesados.add(nombre, archivo=f"{nombre_limpio}.json")
         return True
         
     except Exception as e:
-        logger.error(f"   ❌ Error al procesar {nombre}: {e}")
+        logger.error("   ❌ Error al procesar %s: %s", nombre, e)
+        fallo('excepcion')
         # Intentar regresar a lista en caso de error
         logger.debug("   Intentando regresar a lista después de error...")
         if not regresar_a_lista():
-            # Fallback: ir al inicio y reaplicar filtros
-            adb_tap(BTN_INICIO, DELAY_TAP_DEFAULT)
-            apply_filters()
+            # Fallback: ir al inicio, reaplicar filtros y volver a la página
+            reiniciar_lista()
         return False
 
 
-def do_scroll():
+def do_scroll(filas=None):
     """
-    Ejecuta el scroll perfecto para avanzar en la lista
+    Ejecuta el scroll para avanzar en la lista
+    
+    Args:
+        filas: Geometría de la página visible (para medir el avance en el siguiente dump)
     """
     logger.info("📜 Haciendo scroll para ver más personas...")
-    # Extraer solo la parte del comando después de 'adb '
-    scroll_cmd = SCROLL_COMMAND.replace("adb ", "")
-    safe_adb_command(scroll_cmd)
+    calibrador.registrar_antes(filas or [])
+    
+    if SCROLL_CALIBRADO:
+        scroll_cmd = calibrador.comando()
+    else:
+        # Extraer solo la parte del comando después de 'adb '
+        scroll_cmd = SCROLL_COMMAND.replace("adb ", "")
+    if adb_input(scroll_cmd):
+        posicion.avanzar()
     time.sleep(DELAY_SCROLL)
 
 
+# === PADRÓN (BARRIDO Y PLAN) ===
+
+def escanear_padron():
+    """
+    Barrido rápido: recorre la lista filtrada desde arriba sin visitar a nadie
+    y guarda cada nombre con su página en PADRON_FILE
+    """
+    logger.info("="*80)
+    logger.info("🗂️  BARRIDO DEL PADRÓN (sin visitas)")
+    logger.info("="*80)
+    
+    apply_filters()
+    posicion.reiniciar()
+    
+    def leer_filas(xml_path):
+        filas = obtener_filas_nombres(xml_path)
+        calibrador.medir(filas)
+        return filas
+    
+    padron = barrer_lista(dump_screen_xml, leer_filas, do_scroll)
+    padron.guardar(PADRON_FILE)
+    
+    procesados = load_checkpoint()['procesados']
+    registrar_plan(padron, procesados)
+    logger.info("🗂️  Padrón guardado en %s: %s personas en %s páginas",
+                PADRON_FILE, len(padron), max(padron.paginas.values(), default=-1) + 1)
+    evento('padron', personas=len(padron), scrolls=calibrador.total_scrolls)
+
+
+def registrar_plan(padron: PadronLista, procesados: IndiceIdentidad):
+    """Pendientes según el padrón y tiempo estimado para llegar a TOTAL_OBJETIVO"""
+    medido = metricas.resumen().get('persona')
+    plan = planificar(padron, procesados, TOTAL_OBJETIVO, desde=posicion.pagina,
+                      abandonados=reintentos,
+                      segundos_persona=medido['promedio'] if medido else ETA_SEGUNDOS_PERSONA)
+    minutos = plan['eta_segundos'] / 60
+    logger.info("⏳ Plan: %s pendientes en el padrón, faltan %s para el objetivo "
+                "(%s páginas, ~%.0f min)", len(plan['pendientes']), plan['faltan'],
+                plan['paginas'], minutos)
+    if not plan['alcanzable']:
+        logger.warning("⚠️  El padrón solo tiene %s pendientes: el objetivo de %s no se alcanzará "
+                       "con esta lista", len(plan['pendientes']), TOTAL_OBJETIVO)
+    evento('plan', pendientes=len(plan['pendientes']), faltan=plan['faltan'],
+           paginas=plan['paginas'], eta_segundos=plan['eta_segundos'])
+
+
 # === FUNCIÓN PRINCIPAL ===
 
 def main():
@@ -373,7 +584,7 @@ def main():
     """
     logger.info("="*80)
     logger.info("🤖 BOT RPA - EXTRACCIÓN DE CURP")
-    logger.info(f"   Objetivo: {TOTAL_OBJETIVO} registros")
+    logger.info("   Objetivo: %s registros", TOTAL_OBJETIVO)
     logger.info("="*80)
     
     # Crear carpetas si no existen
@@ -385,12 +596,28 @@ def main():
     procesados = checkpoint['procesados']
     
     if procesados:
-        logger.info(f"🔄 Reanudando desde checkpoint: {len(procesados)} ya procesados")
-    
-    # Aplicar filtros iniciales (SOLO UNA VEZ)
+        logger.info("🔄 Reanudando desde checkpoint: %s ya procesados", len(procesados))
+    if reintentos.cargar_abandonados(CHECKPOINT_FILE):
+        logger.info("🚫 %s personas abandonadas en corridas anteriores (no se intentan)",
+                    len(reintentos.abandonados()))
+    
+    persistidor.iniciar()
+    
+    # Padrón del barrido previo (--escanear): a qué página saltar y cuánto falta
+    padron = PadronLista.cargar(PADRON_FILE) if USAR_PADRON else None
+    if padron:
+        edad = (time.time() - (padron.timestamp or time.time())) / 3600
+        logger.info("🗂️  Padrón cargado: %s personas (barrido de hace %.1f h)", len(padron), edad)
+        registrar_plan(padron, procesados)
+    
+    # Aplicar filtros iniciales (SOLO UNA VEZ): el pase principal empieza con la lista
+    # arriba. El camino corto solo sirve si pasó por el filtro (la dejó arriba); si la
+    # app ya estaba en la lista o en una ficha, la lista puede estar a media página
     # OPTIMIZACIÓN: No volvemos a aplicar filtros después de cada persona
     # En su lugar, usamos el botón ATRÁS que mantiene la posición del scroll
-    apply_filters()
+    if navegador.ir_a_lista() is not True:
+        apply_filters()
+    posicion.reiniciar()
     
     # Variables de control
     intentos_sin_nuevos = 0
@@ -398,61 +625,83 @@ def main():
     
     # Loop principal SIMPLIFICADO
     while len(procesados) < TOTAL_OBJETIVO:
-        # VALIDACIÓN CRÍTICA: Verificar que estamos en la pantalla correcta
+        atender_resultados(procesados)
+        
+        # Capturar XML de la pantalla actual (hace falta para las coordenadas)
+        logger.info("\n📸 Capturando pantalla actual...")
+        if not dump_screen_xml(SCREEN_XML_TEMP):
+            logger.error("❌ No se pudo capturar XML de pantalla. Reintentando...")
+            time.sleep(3)
+            continue
+        
+        # VALIDACIÓN CRÍTICA: Verificar que estamos en la pantalla correcta (mismo dump)
         logger.debug("🔍 Verificando que estamos en la pantalla correcta...")
-        if not verificar_pantalla_correcta():
+        if not verificar_pantalla_correcta(SCREEN_XML_TEMP):
             logger.error("❌ ERROR: Nos salimos de la pantalla 'Sin visita realizada'")
             
             # Intentar recuperar
-            if recuperar_pantalla_correcta():
+            recuperada = recuperar_pantalla_correcta(SCREEN_XML_TEMP)
+            evento('recuperacion', exito=recuperada, pagina=posicion.pagina)
+            if recuperada:
                 logger.info("✅ Pantalla recuperada, continuando...")
                 continue
             else:
                 logger.error("❌ CRÍTICO: No se pudo recuperar la pantalla. Deteniendo bot.")
                 break
         
-        # Capturar XML de la pantalla actual
-        logger.info(f"\n📸 Capturando pantalla actual...")
-        if not dump_screen_xml(SCREEN_XML_TEMP):
-            logger.error("❌ No se pudo capturar XML de pantalla. Reintentando...")
-            time.sleep(3)
-            continue
-        
         # Extraer personas y sus botones
         personas_en_pantalla = get_people_with_buttons(SCREEN_XML_TEMP)
         
+        # Geometría de las filas: mide el avance del último scroll y sirve para el siguiente
+        filas = obtener_filas_nombres(SCREEN_XML_TEMP)
+        calibrador.medir(filas)
+        posicion.actualizar(filas)
+        
         if not personas_en_pantalla:
             logger.warning("⚠️  No se detectaron personas en la pantalla")
-            do_scroll()
+            do_scroll(filas)
             intentos_sin_nuevos += 1
             
             if intentos_sin_nuevos >= max_intentos_sin_nuevos:
-                logger.warning(f"⚠️  {max_intentos_sin_nuevos} scrolls sin personas nuevas. Finalizando.")
+                if iniciar_repaso():
+                    intentos_sin_nuevos = 0
+                    continue
+                logger.warning("⚠️  %s scrolls sin personas nuevas. Finalizando.", max_intentos_sin_nuevos)
                 break
             continue
         
-        logger.info(f"👥 Detectadas {len(personas_en_pantalla)} personas en pantalla")
+        logger.info("👥 Detectadas %s personas en pantalla", len(personas_en_pantalla))
         
         # Procesar cada persona visible que NO esté en procesados
+        # (las que fallaron esperan al repaso; las abandonadas no se intentan)
         encontrado_nuevo = False
         for nombre, coordenadas in personas_en_pantalla:
-            if nombre not in procesados:
+            if nombre not in procesados and reintentos.puede_intentar(nombre):
                 # Procesar esta persona
-                if process_person(nombre, coordenadas, procesados):
+                with metricas.medir('persona'):
+                    procesado = process_person(nombre, coordenadas, procesados)
+                if procesado:
                     encontrado_nuevo = True
                     intentos_sin_nuevos = 0  # Resetear contador
                     
                     # Guardar checkpoint cada 10 registros
+                    # (lo escribe el persistidor, después de los resultados ya encolados)
                     if len(procesados) % 10 == 0:
-                        save_checkpoint(procesados, 0, 0)  # scroll_count y scroll_actual ya no son necesarios
-                        logger.info(f"💾 Checkpoint guardado: {len(procesados)}/{TOTAL_OBJETIVO}")
+                        persistidor.encolar_checkpoint(list(procesados))
+                        logger.info("💾 Checkpoint: %s/%s (cola de guardado: %s, retraso %.1fs)",
+                                    len(procesados), TOTAL_OBJETIVO,
+                                    persistidor.profundidad, persistidor.retraso)
+                        evento('checkpoint', procesados=len(procesados),
+                               cola=persistidor.profundidad, retraso=round(persistidor.retraso, 2))
+                        if padron:
+                            registrar_plan(padron, procesados)
                     
                     # IMPORTANTE: Después de procesar, la persona desaparece de la lista
                     # Salir del for para refrescar la pantalla SIN hacer scroll
                     logger.debug("   Refrescando pantalla (persona desapareció de lista)...")
                     break
                 else:
-                    logger.warning(f"⚠️  Falló procesamiento de {nombre}. Continuando...")
+                    logger.warning("⚠️  Falló procesamiento de %s. Continuando...", nombre)
         
         # Si encontramos y procesamos alguien, NO hacer scroll
         # La lista se actualiza automáticamente y las personas suben de posición
@@ -462,36 +711,84 @@ def main():
         
         # Si TODAS las personas visibles ya fueron procesadas, hacer 1 scroll
         logger.info("🔍 Todas las personas visibles ya fueron procesadas")
+        
+        # Con padrón: si la siguiente página con pendientes está más lejos, ir con flings
+        # (sin contar a las que esperan un repaso ni a las abandonadas)
+        destino = None
+        if padron:
+            no_toca = {n for n in padron.paginas if not reintentos.puede_intentar(n)}
+            destino = padron.siguiente_pagina(procesados, posicion.pagina + 1, abandonados=no_toca)
+        if destino is not None and destino > posicion.pagina + 1:
+            if not saltar_a_pagina(padron, destino, procesados):
+                padron = None   # El padrón ya no describe la lista: seguir página por página
+            intentos_sin_nuevos += 1
+            continue
+        
         logger.info("📜 Haciendo 1 scroll para ver más personas...")
-        do_scroll()
+        do_scroll(filas)
         intentos_sin_nuevos += 1
         
         if intentos_sin_nuevos >= max_intentos_sin_nuevos:
-            logger.warning(f"⚠️  {max_intentos_sin_nuevos} scrolls sin personas nuevas. Finalizando.")
+            if iniciar_repaso():
+                intentos_sin_nuevos = 0
+                continue
+            logger.warning("⚠️  %s scrolls sin personas nuevas. Finalizando.", max_intentos_sin_nuevos)
             break
     
-    # Guardar checkpoint final
+    # Terminar los guardados pendientes y guardar checkpoint final
+    persistidor.detener()
+    atender_resultados(procesados)
     save_checkpoint(procesados, 0, 0)
     
     # Resumen final
     logger.info("\n" + "="*80)
     logger.info("✅ PROCESO COMPLETADO")
-    logger.info(f"   Total procesados: {len(procesados)}/{TOTAL_OBJETIVO}")
-    logger.info(f"   XMLs guardados en: {FOLDER_XML}")
-    logger.info(f"   Scrolls realizados: {scroll_count}")
+    logger.info("   Total procesados: %s/%s", len(procesados), TOTAL_OBJETIVO)
+    logger.info("   XMLs guardados en: %s", FOLDER_XML)
+    logger.info("   Scrolls realizados: %s", calibrador.total_scrolls)
+    solape = calibrador.solape_promedio()
+    if solape is not None:
+        logger.info("   Solape promedio de scroll: %.0f%%", solape * 100)
+    logger.info("   Guardados en segundo plano: %s (%s fallidos, retraso máx. %.1fs)",
+                persistidor.guardados, persistidor.fallidos, persistidor.retraso_max)
+    logger.info("   Sonda de pantalla: %s por foco, %s por dump", sonda.respuestas_foco, sonda.respuestas_dump)
+    abandonados = reintentos.abandonados()
+    logger.info("   Reintentos: %s repasos, %s sin resolver, %s abandonados",
+                reintentos.repasos, reintentos.pendientes, len(abandonados))
+    for abandonado in abandonados:
+        logger.info("   🚫 %s (%s intentos: %s)", abandonado['nombre'], abandonado['intentos'],
+                    ", ".join(abandonado['motivos']))
+    tiempos = metricas.resumen()
+    for operacion, datos in tiempos.items():
+        logger.info("   ⏱️  %s: %s veces, %.2fs promedio, %.1fs total",
+                    operacion, datos['veces'], datos['promedio'], datos['total'])
     logger.info("="*80)
     
+    evento('metricas', operaciones=tiempos, sonda_foco=sonda.respuestas_foco,
+           sonda_dump=sonda.respuestas_dump)
+    evento('fin', procesados=len(procesados), objetivo=TOTAL_OBJETIVO,
+           scrolls=calibrador.total_scrolls, abandonados=len(abandonados),
+           log_descartados=registros_descartados())
+    
     # Verificar si se completó el objetivo
     if len(procesados) >= TOTAL_OBJETIVO:
         logger.info("🎉 ¡Objetivo alcanzado!")
     else:
-        logger.warning(f"⚠️  Faltan {TOTAL_OBJETIVO - len(procesados)} registros")
+        logger.warning("⚠️  Faltan %s registros", TOTAL_OBJETIVO - len(procesados))
 
 
 if __name__ == '__main__':
     try:
-        main()
+        if '--escanear' in sys.argv:
+            escanear_padron()
+        else:
+            main()
     except KeyboardInterrupt:
         logger.info("\n⚠️  Bot detenido manualmente por el usuario")
     except Exception as e:
-        logger.error(f"\n❌ Error fatal: {e}", exc_info=True)
\ No newline at end of file
+        logger.error("\n❌ Error fatal: %s", e, exc_info=True)
+    finally:
+        persistidor.detener()
+        cerrar_inyector()
+        cerrar_jerarquia()
+        detener_logging()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Carga masiva de carpetas con un JSON por persona
+- Lee los archivos con un pool de hilos (I/O en paralelo)
+- Usa orjson si está instalado (opcional, más rápido que json)
+- Entrega los registros de forma perezosa (generador)
+- Mantiene un snapshot consolidado junto a la carpeta, invalidado por el
+  mtime del directorio, para no reabrir miles de archivos en cada ejecución
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# (nombre_archivo, datos o None, error o None)
+Registro = Tuple[str, Optional[dict], Optional[str]]
+
+HILOS_DEFAULT = 8
+TAMANO_LOTE = 256
+
+
+def ruta_snapshot(carpeta: Path) -> Path:
+    """El snapshot vive AL LADO de la carpeta para no alterar su mtime"""
+    return carpeta.parent / f".{carpeta.name}_snapshot.json"
+
+
+def invalidar_snapshot(carpeta):
+    """Borra el snapshot (usar tras reescribir archivos existentes en su lugar)"""
+    snapshot = ruta_snapshot(Path(carpeta))
+    if snapshot.exists():
+        snapshot.unlink()
+
+
+def leer_json(ruta: Path) -> Registro:
+    """Lee un archivo JSON sin lanzar excepciones"""
+    try:
+        with open(ruta, 'rb') as f:
+            return (ruta.name, _loads(f.read()), None)
+    except Exception as e:
+        return (ruta.name, None, str(e))
+
+
+def _cargar_snapshot(carpeta: Path, mtime_ns: int) -> Optional[List[Registro]]:
+    """Devuelve los registros del snapshot si sigue vigente"""
+    snapshot = ruta_snapshot(carpeta)
+    if not snapshot.exists():
+        return None
+    try:
+        with open(snapshot, 'rb') as f:
+            data = _loads(f.read())
+        if data.get('mtime_ns') != mtime_ns:
+            return None
+        return [tuple(r) for r in data['registros']]
+    except Exception:
+        return None
+
+
+def _guardar_snapshot(carpeta: Path, mtime_ns: int, registros: List[Registro]):
+    """Guarda el snapshot consolidado (escritura atómica)"""
+    snapshot = ruta_snapshot(carpeta)
+    temporal = snapshot.with_suffix('.tmp')
+    try:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'mtime_ns': mtime_ns, 'total': len(registros), 'registros': registros},
+                      f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporal, snapshot)
+    except OSError:
+        pass
+
+
+def iterar_carpeta(carpeta, hilos: int = HILOS_DEFAULT, usar_snapshot: bool = True) -> Iterator[Registro]:
+    """
+    Recorre todos los *.json de una carpeta
+
+    Args:
+        carpeta: Carpeta con un JSON por persona
+        hilos: Tamaño del pool de hilos de lectura
+        usar_snapshot: Reutilizar/escribir el snapshot consolidado
+
+    Yields:
+        Tuplas (nombre_archivo, datos, error) en orden alfabético de archivo
+
+    Nota: el mtime del directorio cambia al crear, borrar o renombrar archivos
+    (lo que hace el bot), pero no al reescribir uno existente en su lugar.
+    Quien reescriba archivos debe llamar invalidar_snapshot(); para forzar una
+    lectura completa usar usar_snapshot=False.
+    """
+    carpeta = Path(carpeta)
+    if not carpeta.is_dir():
+        return
+
+    mtime_ns = carpeta.stat().st_mtime_ns
+    if usar_snapshot:
+        registros = _cargar_snapshot(carpeta, mtime_ns)
+        if registros is not None:
+            yield from registros
+            return
+
+    archivos = sorted(carpeta.glob("*.json"))
+    leidos: List[Registro] = []
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        # Por lotes: no se encolan miles de lecturas si el consumidor va lento
+        for inicio in range(0, len(archivos), TAMANO_LOTE):
+            for registro in pool.map(leer_json, archivos[inicio:inicio + TAMANO_LOTE]):
+                if usar_snapshot:
+                    leidos.append(registro)
+                yield registro
+
+    # Solo se llega aquí si el consumidor recorrió todo: el snapshot queda completo
+    if usar_snapshot:
+        _guardar_snapshot(carpeta, mtime_ns, leidos)
@@ -19,6 +19,7 @@ DELAY_SIGUIENTE = 2         # Espera después de "Siguiente" para que cargue pan
 DELAY_TAP_DEFAULT = 1     # Delay por defecto entre taps
 DELAY_FILTRO_CARGA = 1      # Espera después de aplicar filtro para que cargue lista
 DELAY_SCROLL = 1.5            # Espera después de hacer scroll
+DELAY_ATRAS = 1.5             # Espera después del botón ATRÁS
 
 # === COORDENADAS FIJAS (Menú Principal) ===
 # Estas coordenadas son FIJAS y siempre las mismas
@@ -34,21 +35,134 @@ BTN_APLICAR_FILTRO = "476 221"
 BTN_INICIAR_VISITA = "648 157"
 BTN_SIGUIENTE = "694 1063"
 
+# === CALIBRACIÓN AUTOMÁTICA DE COORDENADAS ===
+# Las coordenadas de arriba son el valor por defecto. Con la calibración activa,
+# la primera vez que se usa cada botón en un dispositivo (modelo + resolución)
+# se busca en un dump por texto / resource-id y su centro se guarda en disco.
+# Solo se vuelve a buscar cuando la verificación de pantalla falla
+CALIBRAR_COORDENADAS = True
+CONTROLES = {
+    # nombre: textos (o content-desc) aceptados y/o resource-id
+    'BTN_INICIO': {'textos': ['Inicio']},
+    'BTN_VISITAR_MENU': {'textos': ['Visitar', 'Padrón', 'Padron']},
+    'BTN_FILTRO': {'textos': ['Filtro', 'Filtros', 'Filtrar']},
+    'BTN_VALOR_TODOS': {'textos': ['Seleccionar valor', 'Todos']},
+    'BTN_TODOS_OPCION': {'textos': ['Sin visita realizada', 'Sin visita']},
+    'BTN_APLICAR_FILTRO': {'textos': ['Aplicar', 'Aplicar filtro']},
+    'BTN_INICIAR_VISITA': {'textos': ['Iniciar visita', 'Iniciar Visita']},
+    'BTN_SIGUIENTE': {'textos': ['Siguiente']},
+}
+
+# === NAVEGACIÓN ===
+# Para volver a la lista "Sin visita" se detecta la pantalla actual y se hace solo lo
+# necesario (ver navegacion.py). Si la app abre la lista con un intent / deep link,
+# ponerlo aquí (comando de la tablet, p. ej. "am start -a android.intent.action.VIEW
+# -d 'app://padron?filtro=sin_visita'") y se usará desde cualquier pantalla
+NAVEGACION_INTENT = ""
+
+# === SONDA DE PANTALLA ===
+# "¿Estamos en la lista?" / "¿ya estaba visitada?" se responden con el foco de
+# `dumpsys window` (barato) una vez que la sonda aprendió qué ventana es cada
+# pantalla; mientras tanto, o si el foco no distingue, con un uiautomator dump
+SONDA_FOCO = True
+SONDA_CONFIRMACIONES = 3      # Dumps con la misma respuesta antes de confiar en el foco
+SONDA_CONTROL_CADA = 25       # Respuestas por foco antes de un dump de control
+
 # === COMANDO DE SCROLL ===
-SCROLL_COMMAND = "adb shell input swipe 290 1055 290 400 1100"
+# Swipe inicial; si SCROLL_CALIBRADO está activo, la distancia y duración se ajustan
+# midiendo cuánto se movieron las filas entre dumps consecutivos
+SCROLL_X = 290
+SCROLL_Y_INICIO = 1055
+SCROLL_Y_FIN = 400
+SCROLL_DURACION = 1100        # ms
+SCROLL_COMMAND = f"adb shell input swipe {SCROLL_X} {SCROLL_Y_INICIO} {SCROLL_X} {SCROLL_Y_FIN} {SCROLL_DURACION}"
+
+SCROLL_CALIBRADO = True       # Ajustar el swipe para avanzar exactamente una página
+SCROLL_FILAS_SOLAPE = 1       # Filas de la página anterior que deben seguir visibles tras el scroll
+SCROLL_DISTANCIA_MIN = 150    # px mínimos de swipe
+SCROLL_Y_MIN = 150            # El dedo nunca termina por encima de esta Y (barra superior)
+
+# === RESTAURAR POSICIÓN DESPUÉS DE UN RESET ===
+# Tras tocar Inicio + reaplicar filtros la lista vuelve arriba; el bot regresa a la
+# página donde iba con flings rápidos y verifica con los nombres que había en pantalla
+RESTAURAR_POSICION = True
+SCROLL_DURACION_FLING = 150   # ms (swipe rápido, la lista sigue de largo)
+PAGINAS_POR_FLING = 2.0       # Estimación inicial, se ajusta en cada restauración
+DELAY_FLING = 0.8             # Espera entre flings (sin dump intermedio)
+RESTAURAR_PASOS_MAX = 4       # Scrolls de una página para encontrar la huella tras los flings
+
+# === PADRÓN Y PLAN DE VISITAS ===
+# `python bot_padron.py --escanear` recorre la lista filtrada una vez (sin visitar a nadie)
+# y guarda cada nombre con su página en PADRON_FILE. Si el archivo existe, el bot salta
+# con flings a la siguiente página con pendientes y estima el tiempo restante (ver padron.py)
+USAR_PADRON = True
+PADRON_PAGINAS_SIN_NUEVOS = 2  # Páginas seguidas sin nombres nuevos = fin de la lista
+PADRON_PAGINAS_MAX = 300
+ETA_SEGUNDOS_PERSONA = 20     # Estimación inicial; luego se usa el promedio medido
+ETA_SEGUNDOS_PAGINA = 3       # Scroll + dump de una página
 
 # === RUTAS (ABSOLUTAS) ===
 FOLDER_XML = str(PROJECT_DIR / "xml")
 FOLDER_JSON = str(PROJECT_DIR / "json")
 CHECKPOINT_FILE = str(PROJECT_DIR / "progreso.json")
 LOG_FILE = str(PROJECT_DIR / "bot.log")
+LOG_EVENTOS_FILE = str(PROJECT_DIR / "bot_eventos.jsonl")  # Flujo JSONL (None = desactivado)
 SCREEN_XML_TEMP = "screen.xml"
-CURP_XML_TEMP = "/sdcard/temp_curp.xml"
+CALIBRACION_XML_TEMP = "calibracion.xml"
+COORDENADAS_CACHE_FILE = str(PROJECT_DIR / "coordenadas_cache.json")
+PADRON_FILE = str(PROJECT_DIR / "padron.json")
+
+# === LOGGING ===
+# Asíncrono: el loop solo encola; un hilo aparte escribe bot.log, consola y JSONL
+LOG_NIVEL = "INFO"            # "DEBUG" para ver cada tap y cada paso de la visita
+LOG_COLA_MAX = 10000          # Registros en espera; si se llena se descartan (no bloquea)
+
+# === CAPTURA DE CAMPOS DE LA FICHA ===
+# Además del CURP, guardar en "campos" del JSON todo EditText con valor (fecha de
+# nacimiento, sexo, domicilio, teléfono...) de la ficha y de la pantalla del CURP.
+# Cuesta un dump más por persona: la ficha se captura después de DELAY_CARGA_DATOS
+# (con los datos ya cargados); la pantalla del CURP usa el dump que ya se toma
+CAPTURA_CAMPOS = False
+
+# === GUARDADO EN SEGUNDO PLANO ===
+# El CURP se extrae y el JSON se escribe en un hilo aparte mientras el bot regresa a la lista
+PERSISTIR_EN_SEGUNDO_PLANO = True
+PERSISTIR_COLA_MAX = 20       # Dumps en espera antes de que el bot espere al hilo
+
+# === REINTENTOS DE PERSONAS QUE FALLAN ===
+# Una persona que falla no se reintenta en el pase principal sino en repasos posteriores,
+# con espera creciente; tras REINTENTOS_MAX intentos se abandona y queda en el checkpoint
+REINTENTOS_MAX = 3
+REINTENTO_ESPERA_BASE = 30    # s antes del primer reintento (se duplica en cada falla)
+REINTENTO_ESPERA_MAX = 300
 
 # === CONFIGURACIÓN ADB ===
 MAX_RETRIES_ADB = 3
 ADB_TIMEOUT = 10
 
+# Cómo se mandan taps, swipes y keyevents (ver entrada.py):
+#   'sendevent': eventos crudos al touchscreen para los taps (sin arrancar la JVM de `input`)
+#   'shell':     `input` dentro de un solo adb shell que queda abierto
+#   'adb':       un proceso `adb shell input ...` por comando (comportamiento anterior)
+# Si 'sendevent' no es posible en la tablet se usa 'shell' automáticamente
+INPUT_BACKEND = "sendevent"
+
+# === LECTURA DE PANTALLA ===
+# 'dump':     `uiautomator dump` + pull en cada lectura (arranque en frío cada vez)
+# 'servidor': servidor de uiautomator2 residente en la tablet (JSON-RPC por HTTP);
+#             si no responde se usa 'dump' el resto de la corrida (ver jerarquia.py)
+JERARQUIA_BACKEND = "dump"
+JERARQUIA_PODAR = True        # Guardar solo TextView/EditText/clickables y sus ancestros
+SERVIDOR_UI_PUERTO = 9008             # Puerto local (adb forward)
+SERVIDOR_UI_PUERTO_TABLET = 9008      # Puerto del servidor en la tablet
+SERVIDOR_UI_URL = f"http://127.0.0.1:{SERVIDOR_UI_PUERTO}/jsonrpc/0"
+SERVIDOR_UI_TIMEOUT = 10              # s por petición
+SERVIDOR_UI_PROFUNDIDAD = 50          # Profundidad máxima del árbol
+# Comando (en la tablet) para arrancar el servidor si no contesta; "" = no arrancarlo
+SERVIDOR_UI_ARRANQUE = ("am instrument -w -r -e debug false -e class com.github.uiautomator.stub.Stub "
+                        "com.github.uiautomator.test/androidx.test.runner.AndroidJUnitRunner")
+SERVIDOR_UI_ESPERA_ARRANQUE = 15      # s esperando a que conteste tras arrancarlo
+
 # === FILTROS DE DETECCIÓN DE NOMBRES ===
 MIN_NOMBRE_LENGTH = 15      # Mínimo de caracteres para considerar un texto como nombre
 NOMBRE_DEBE_TENER_ESPACIOS = True  # Los nombres deben tener espacios
@@ -0,0 +1,176 @@
+"""
+Coordenadas de botones calibradas por dispositivo
+- Cada control (BTN_INICIO, BTN_FILTRO, ...) se busca en un dump por texto,
+  content-desc o resource-id; se toma el centro del ancestro clickable
+- El resultado se guarda en disco por modelo + resolución del dispositivo,
+  así que la calibración se paga una sola vez por dispositivo
+- Si el control no aparece, se usa la coordenada fija de config.py (y también
+  se recuerda, para no volver a hacer dumps por él)
+- Cuando la verificación de pantalla falla, invalidar() borra los controles
+  sospechosos y se vuelven a buscar la próxima vez que se usen
+"""
+
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import config
+from utils import adb_output, adb_tap, calculate_center, dump_screen_xml
+
+logger = logging.getLogger(__name__)
+
+
+def identificar_dispositivo() -> str:
+    """'<modelo> <ancho>x<alto>' (p. ej. 'SM-T295 800x1280'), o 'desconocido'"""
+    modelo = adb_output("shell getprop ro.product.model") or "desconocido"
+    tamano = adb_output("shell wm size") or ""
+    # "Physical size: 800x1280" (+ "Override size: ..." si se cambió)
+    resolucion = tamano.splitlines()[-1].split(":")[-1].strip() if tamano else "?"
+    return f"{modelo.strip()} {resolucion}"
+
+
+def _coincide(node, selector: Dict) -> bool:
+    textos = {t.lower() for t in selector.get('textos', [])}
+    if textos:
+        for atributo in ("text", "content-desc"):
+            if node.get(atributo, "").strip().lower() in textos:
+                return True
+    resource_id = selector.get('resource_id')
+    return bool(resource_id) and node.get("resource-id", "").endswith(resource_id)
+
+
+def localizar_controles(xml_path: str, selectores: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Busca los controles en un dump (una sola pasada)
+
+    Returns:
+        Dict nombre -> coordenadas 'x y' de los que se encontraron
+    """
+    try:
+        root = ET.parse(xml_path).getroot()
+    except Exception as e:
+        logger.warning("No se pudo leer el dump de calibración '%s': %s", xml_path, e)
+        return {}
+
+    padres = {hijo: padre for padre in root.iter() for hijo in padre}
+    encontrados: Dict[str, str] = {}
+    for node in root.iter("node"):
+        for nombre, selector in selectores.items():
+            if nombre in encontrados or not _coincide(node, selector):
+                continue
+            # El texto suele estar en un TextView dentro del botón: subir al clickable
+            objetivo = node
+            while objetivo is not None and objetivo.get("clickable") != "true":
+                objetivo = padres.get(objetivo)
+            centro = calculate_center((objetivo if objetivo is not None else node).get("bounds", ""))
+            if centro:
+                encontrados[nombre] = centro
+    return encontrados
+
+
+class CoordenadasCalibradas:
+    """Cache en disco de coordenadas por dispositivo"""
+
+    def __init__(self, ruta: str = config.COORDENADAS_CACHE_FILE,
+                 selectores: Optional[Dict[str, Dict]] = None,
+                 dispositivo: Optional[str] = None):
+        self.ruta = ruta
+        self.selectores = selectores if selectores is not None else config.CONTROLES
+        self._dispositivo = dispositivo
+        self._cache: Dict[str, Dict[str, Dict]] = {}
+        self.calibraciones = 0
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                self._cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def dispositivo(self) -> str:
+        if self._dispositivo is None:
+            self._dispositivo = identificar_dispositivo()
+            logger.info("📱 Dispositivo: %s", self._dispositivo)
+        return self._dispositivo
+
+    @property
+    def controles(self) -> Dict[str, Dict]:
+        return self._cache.setdefault(self.dispositivo, {})
+
+    def obtener(self, nombre: str) -> str:
+        """Coordenadas del control; lo calibra con un dump si aún no está en cache"""
+        guardado = self.controles.get(nombre)
+        if guardado is None:
+            guardado = self.calibrar(nombre)
+        return guardado['coordenadas']
+
+    def calibrar(self, nombre: str, xml_path: Optional[str] = None) -> Dict:
+        """
+        Busca el control en la pantalla actual (o en xml_path) y lo guarda
+
+        Solo se busca el control pedido: se calibra justo antes de tocarlo, que
+        es cuando debe estar en pantalla (un texto igual en otra pantalla, como
+        los "Visitar" de cada fila, no debe tomarse por él)
+        """
+        if xml_path is None:
+            xml_path = config.CALIBRACION_XML_TEMP
+            if not dump_screen_xml(xml_path):
+                xml_path = None
+
+        selector = {nombre: self.selectores.get(nombre, {})}
+        encontrados = localizar_controles(xml_path, selector) if xml_path else {}
+        self.calibraciones += 1
+
+        fecha = datetime.now().isoformat(timespec='seconds')
+        if nombre in encontrados:
+            self.controles[nombre] = {'coordenadas': encontrados[nombre], 'origen': 'dump', 'fecha': fecha}
+            logger.info("🎯 %s calibrado en %s", nombre, encontrados[nombre])
+        else:
+            self.controles[nombre] = {'coordenadas': getattr(config, nombre), 'origen': 'config', 'fecha': fecha}
+            logger.info("🎯 %s no se encontró en pantalla, se usa el valor de config (%s)",
+                        nombre, self.controles[nombre]['coordenadas'])
+
+        self.guardar()
+        return self.controles[nombre]
+
+    def invalidar(self, nombres: Iterable[str]):
+        """Olvida los controles indicados: se vuelven a calibrar en su próximo uso"""
+        borrados = [n for n in nombres if self.controles.pop(n, None) is not None]
+        if borrados:
+            logger.info("🎯 Se recalibrarán: %s", ", ".join(borrados))
+            self.guardar()
+
+    def guardar(self):
+        temporal = self.ruta + '.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            logger.warning("No se pudo guardar el cache de coordenadas: %s", e)
+
+
+_calibradas: Optional[CoordenadasCalibradas] = None
+
+
+def coordenadas_de(nombre: str) -> str:
+    """Coordenadas calibradas (o las fijas de config si la calibración está apagada)"""
+    global _calibradas
+    if not config.CALIBRAR_COORDENADAS:
+        return getattr(config, nombre)
+    if _calibradas is None:
+        _calibradas = CoordenadasCalibradas()
+    return _calibradas.obtener(nombre)
+
+
+def tap_control(nombre: str, delay: float = 1.5) -> bool:
+    """adb_tap sobre un control con nombre (BTN_INICIO, BTN_FILTRO, ...)"""
+    return adb_tap(coordenadas_de(nombre), delay)
+
+
+def invalidar_controles(*nombres: str):
+    """Tras una verificación fallida: recalibrar estos controles en su próximo uso"""
+    if config.CALIBRAR_COORDENADAS and _calibradas is not None:
+        _calibradas.invalidar(nombres)
@@ -0,0 +1,97 @@
+"""
+Extracción rápida de CURP desde los bytes del dump
+Recorre el archivo crudo (memory-mapped) con UN patrón compilado y verifica
+dígito verificador y fecha de nacimiento de cada candidato. Solo si el
+resultado es ambiguo (ninguno o varios CURP válidos distintos) hace falta
+parsear el XML y buscar el EditText con la etiqueta "CURP"
+"""
+
+import mmap
+import re
+from datetime import date
+from typing import List, Optional
+
+# CURP: 4 letras + 6 dígitos (AAMMDD) + sexo + 5 letras + homoclave (dígito antes
+# de 2000, letra desde 2000) + dígito verificador
+CURP_PATTERN = re.compile(r'[A-Z]{4}\d{6}[HMX][A-Z]{5}[A-Z0-9]\d')
+
+# En bytes solo se buscan nodos cuyo texto ES el CURP (así lo muestra el
+# EditText). El prefijo literal text=" deja que el motor salte directo a los
+# atributos; un CURP dentro de un texto más largo queda para el respaldo
+CURP_BYTES = re.compile(rb'text="([A-Z]{4}\d{6}[HMX][A-Z]{5}[A-Z0-9]\d)"')
+
+# Valores del cálculo del dígito verificador (RENAPO)
+_ALFABETO = "0123456789ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"
+_VALOR = {c: i for i, c in enumerate(_ALFABETO)}
+
+
+def digito_verificador(curp17: str) -> Optional[int]:
+    """Dígito verificador de los primeros 17 caracteres (None si hay caracteres inválidos)"""
+    try:
+        suma = sum(_VALOR[c] * (18 - i) for i, c in enumerate(curp17[:17]))
+    except KeyError:
+        return None
+    return (10 - suma % 10) % 10
+
+
+def fecha_nacimiento(curp: str) -> Optional[date]:
+    """
+    Fecha AAMMDD del CURP; el siglo lo da el carácter 17
+    (dígito = nacidos antes de 2000, letra = desde 2000)
+    """
+    try:
+        anio = int(curp[4:6]) + (2000 if curp[16].isalpha() else 1900)
+        return date(anio, int(curp[6:8]), int(curp[8:10]))
+    except (ValueError, IndexError):
+        return None
+
+
+def curp_valido(curp: str) -> bool:
+    """Formato, fecha de nacimiento y dígito verificador"""
+    return (len(curp) == 18
+            and CURP_PATTERN.fullmatch(curp) is not None
+            and fecha_nacimiento(curp) is not None
+            and digito_verificador(curp) == int(curp[17]))
+
+
+def buscar_curps(datos: bytes) -> List[str]:
+    """CURP válidos DISTINTOS encontrados en los bytes, en orden de aparición"""
+    encontrados: List[str] = []
+    for match in CURP_BYTES.finditer(datos):
+        curp = match.group(1).decode('ascii')
+        if curp not in encontrados and curp_valido(curp):
+            encontrados.append(curp)
+    return encontrados
+
+
+def curps_en_archivo(xml_path: str) -> List[str]:
+    """buscar_curps sobre el archivo sin copiarlo a memoria (mmap)"""
+    with open(xml_path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                return buscar_curps(datos)
+        except ValueError:
+            # Archivo vacío: no se puede mapear
+            return []
+
+
+def curp_de_arbol(root) -> Optional[str]:
+    """
+    Búsqueda estructurada sobre el XML ya parseado
+    1. EditText cuyo hijo TextView dice "CURP" (el valor está en el EditText)
+    2. Primer texto de cualquier nodo que tenga forma de CURP
+    """
+    for node in root.iter("node"):
+        if node.get("class") != "android.widget.EditText":
+            continue
+        for child in node.iter("node"):
+            if child.get("class") == "android.widget.TextView" and child.get("text", "").strip() == "CURP":
+                curp = node.get("text", "").strip()
+                if curp and curp != "null" and len(curp) == 18:
+                    return curp
+
+    for node in root.iter("node"):
+        match = CURP_PATTERN.search(node.get("text", ""))
+        if match:
+            return match.group(0)
+    return None
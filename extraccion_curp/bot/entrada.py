@@ -0,0 +1,262 @@
+"""
+Inyección de toques sin arrancar `input` en cada evento
+- `adb shell input tap` arranca un proceso adb en la PC, una sesión en la
+  tablet y una JVM (app_process) para el comando `input`: cientos de ms antes
+  de que el toque llegue
+- INPUT_BACKEND = 'shell': un solo `adb shell` abierto todo el tiempo; los
+  comandos se escriben por su stdin y se espera una marca de fin en stdout
+- INPUT_BACKEND = 'sendevent': además, los taps se escriben como eventos
+  crudos en el touchscreen (/dev/input/eventN), sin JVM. Swipes y keyevents
+  siguen usando `input` en la misma sesión (la física del swipe calibrado y
+  los botones de navegación virtuales dependen de él). Si no se encuentra un
+  touchscreen escribible, o la pantalla está rotada, se usa 'shell'
+- INPUT_BACKEND = 'adb': el comportamiento anterior (un proceso por comando)
+- Si la sesión se cae se reabre una vez; si no abre, se usa 'adb'
+- Cada envío se cronometra en metricas como 'input_<modo>_<tipo>' para
+  comparar los backends entre corridas; lo que cae al respaldo cuenta como
+  'input_adb_<tipo>' y el intento fallido de la sesión como '..._fallido'
+"""
+
+import logging
+import queue
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+import metricas
+from utils import ADB_CMD, adb_output, safe_adb_command
+
+logger = logging.getLogger(__name__)
+
+# Códigos de linux/input-event-codes.h
+EV_SYN, EV_KEY, EV_ABS = 0, 1, 3
+BTN_TOUCH = 0x14a
+ABS_MT_SLOT, ABS_MT_TOUCH_MAJOR = 0x2f, 0x30
+ABS_MT_POSITION_X, ABS_MT_POSITION_Y = 0x35, 0x36
+ABS_MT_TRACKING_ID, ABS_MT_PRESSURE = 0x39, 0x3a
+
+
+class SesionShell:
+    """Un `adb shell` persistente: ejecutar() escribe un comando y espera su código de salida"""
+
+    def __init__(self, timeout: float = config.ADB_TIMEOUT, comando: Optional[List[str]] = None):
+        self.timeout = timeout
+        self.comando = comando or [ADB_CMD, "shell"]
+        self._proceso: Optional[subprocess.Popen] = None
+        self._lineas: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._contador = 0
+
+    @property
+    def abierta(self) -> bool:
+        return self._proceso is not None and self._proceso.poll() is None
+
+    def abrir(self) -> bool:
+        try:
+            self._proceso = subprocess.Popen(
+                self.comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace', bufsize=1)
+        except OSError as e:
+            logger.warning("No se pudo abrir adb shell persistente: %s", e)
+            self._proceso = None
+            return False
+        self._lineas = queue.Queue()
+        threading.Thread(target=self._leer, args=(self._proceso.stdout, self._lineas),
+                         name="adb-shell", daemon=True).start()
+        return self.ejecutar("true")
+
+    @staticmethod
+    def _leer(salida, lineas: queue.Queue):
+        # readline() bloquea: un hilo aparte permite esperar con timeout
+        for linea in salida:
+            lineas.put(linea.rstrip("\r\n"))
+        lineas.put(None)
+
+    def ejecutar(self, comando: str) -> bool:
+        if not self.abierta:
+            return False
+        self._contador += 1
+        marca = f"__fin_{self._contador}__"
+        try:
+            self._proceso.stdin.write(f"{comando}; echo {marca} $?\n")
+            self._proceso.stdin.flush()
+            while True:
+                linea = self._lineas.get(timeout=self.timeout)
+                if linea is None:
+                    break                       # El proceso terminó
+                if linea.startswith(marca):
+                    return linea[len(marca):].strip() == "0"
+                if linea.strip():
+                    logger.debug("adb shell: %s", linea)
+        except (OSError, ValueError, queue.Empty) as e:
+            logger.warning("adb shell persistente sin respuesta (%s): %s", comando, str(e) or "timeout")
+        self.cerrar()
+        return False
+
+    def cerrar(self):
+        if self._proceso is None:
+            return
+        try:
+            self._proceso.stdin.close()
+            self._proceso.wait(timeout=2)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self._proceso.kill()
+        self._proceso = None
+
+
+def parsear_getevent(salida: str) -> Optional[Dict]:
+    """
+    Busca el touchscreen multitouch en la salida de `getevent -p`
+
+    Returns:
+        {'ruta', 'x': (min, max), 'y': (min, max), 'slot', 'btn_touch',
+         'presion', 'tamano'} o None si no hay ninguno
+    """
+    for bloque in salida.split("add device")[1:]:
+        ruta = re.search(r"(/dev/input/event\d+)", bloque)
+        ejes: Dict[int, tuple] = {}
+        for codigo, minimo, maximo in re.findall(
+                r"\b([0-9a-f]{4})\s*:\s*value -?\d+, min (-?\d+), max (-?\d+)", bloque):
+            ejes[int(codigo, 16)] = (int(minimo), int(maximo))
+        if not ruta or ABS_MT_POSITION_X not in ejes or ABS_MT_POSITION_Y not in ejes:
+            continue
+        teclas = re.search(r"KEY \(0001\):([0-9a-f\s]+?)(?:\n\s*[A-Z]{3} \(|$)", bloque)
+        return {
+            'ruta': ruta.group(1),
+            'x': ejes[ABS_MT_POSITION_X],
+            'y': ejes[ABS_MT_POSITION_Y],
+            'slot': ABS_MT_SLOT in ejes,
+            'btn_touch': bool(teclas) and f"{BTN_TOUCH:04x}" in teclas.group(1).split(),
+            'presion': ejes.get(ABS_MT_PRESSURE, (0, 0))[1],
+            'tamano': ejes.get(ABS_MT_TOUCH_MAJOR, (0, 0))[1],
+        }
+    return None
+
+
+def comando_tap_sendevent(touch: Dict, ancho: int, alto: int, x: int, y: int, id_toque: int) -> str:
+    """Un tap (dedo abajo + arriba) como una línea de sendevent (protocolo multitouch B)"""
+    def escalar(valor: int, total: int, rango: tuple) -> int:
+        minimo, maximo = rango
+        return minimo + round(valor * (maximo - minimo + 1) / total)
+
+    eventos = []
+    if touch['slot']:
+        eventos.append((EV_ABS, ABS_MT_SLOT, 0))
+    eventos += [(EV_ABS, ABS_MT_TRACKING_ID, id_toque),
+                (EV_ABS, ABS_MT_POSITION_X, escalar(x, ancho, touch['x'])),
+                (EV_ABS, ABS_MT_POSITION_Y, escalar(y, alto, touch['y']))]
+    # Con eje de presión, presión 0 es "hover" para Android: hay que mandarla
+    if touch['presion']:
+        eventos.append((EV_ABS, ABS_MT_PRESSURE, max(1, touch['presion'] // 2)))
+    if touch['tamano']:
+        eventos.append((EV_ABS, ABS_MT_TOUCH_MAJOR, max(1, touch['tamano'] // 4)))
+    if touch['btn_touch']:
+        eventos.append((EV_KEY, BTN_TOUCH, 1))
+    eventos.append((EV_SYN, 0, 0))
+    eventos.append((EV_ABS, ABS_MT_TRACKING_ID, -1))
+    if touch['btn_touch']:
+        eventos.append((EV_KEY, BTN_TOUCH, 0))
+    eventos.append((EV_SYN, 0, 0))
+    return ";".join(f"sendevent {touch['ruta']} {t} {c} {v}" for t, c, v in eventos)
+
+
+class InyectorEntrada:
+    """Envía 'tap x y', 'swipe ...' y 'keyevent N' por el backend configurado"""
+
+    def __init__(self, backend: str = config.INPUT_BACKEND):
+        self.backend = backend if backend in ('adb', 'shell', 'sendevent') else 'adb'
+        self.sesion = SesionShell()
+        self._touch: Optional[Dict] = None
+        self._pantalla = (0, 0)
+        self._id_toque = 0
+        self._preparado = False
+
+    def _preparar(self):
+        """Abre la sesión y, para 'sendevent', detecta el touchscreen (una vez)"""
+        self._preparado = True
+        if self.backend == 'adb':
+            return
+        if not self.sesion.abrir():
+            logger.warning("⌨️  Sin adb shell persistente: se usa un proceso por comando")
+            self.backend = 'adb'
+            return
+        if self.backend == 'sendevent' and not self._detectar_touchscreen():
+            self.backend = 'shell'
+        logger.info("⌨️  Entrada: %s", self.backend)
+
+    def _detectar_touchscreen(self) -> bool:
+        touch = parsear_getevent(adb_output("shell getevent -p") or "")
+        if touch is None:
+            logger.info("⌨️  No se encontró touchscreen multitouch: taps con 'input'")
+            return False
+        tamano = re.findall(r"(\d+)x(\d+)", adb_output("shell wm size") or "")
+        orientacion = re.search(r"SurfaceOrientation: (\d)",
+                                adb_output('shell "dumpsys input | grep SurfaceOrientation"') or "")
+        if not tamano or not orientacion or orientacion.group(1) != "0":
+            # Los ejes crudos son los de la pantalla sin rotar
+            logger.info("⌨️  Pantalla rotada o sin datos de orientación: taps con 'input'")
+            return False
+        if not self.sesion.ejecutar(f"test -w {touch['ruta']}"):
+            logger.info("⌨️  Sin permiso de escritura en %s: taps con 'input'", touch['ruta'])
+            return False
+        self._touch = touch
+        ancho, alto = tamano[-1]                # El último es el "Override size" si existe
+        self._pantalla = (int(ancho), int(alto))
+        return True
+
+    def enviar(self, argumentos: str) -> bool:
+        """
+        Args:
+            argumentos: Lo que iría después de 'adb shell input' ('tap 100 200')
+
+        Returns:
+            True si el comando se ejecutó exitosamente
+        """
+        if not self._preparado:
+            self._preparar()
+        tipo = argumentos.split()[0]
+        if self.backend != 'adb':
+            comando = self._comando(tipo, argumentos)
+            inicio = time.perf_counter()
+            enviado = self.sesion.ejecutar(comando)
+            # Sesión caída (tablet desconectada un momento, adb reiniciado...): reabrir una vez
+            if not enviado and not self.sesion.abierta and self.sesion.abrir():
+                enviado = self.sesion.ejecutar(comando)
+            # Los intentos fallidos aparte, para no mezclarlos con la latencia del backend
+            estado = "" if enviado else "_fallido"
+            metricas.registrar(f"input_{self.backend}_{tipo}{estado}", time.perf_counter() - inicio)
+            if enviado:
+                return True
+        # Un proceso adb por comando (backend 'adb' o respaldo de la sesión)
+        with metricas.medir(f"input_adb_{tipo}"):
+            return safe_adb_command(f"shell input {argumentos}")
+
+    def _comando(self, tipo: str, argumentos: str) -> str:
+        if tipo == 'tap' and self._touch is not None:
+            x, y = (int(float(v)) for v in argumentos.split()[1:3])
+            self._id_toque = (self._id_toque + 1) % 65536
+            return comando_tap_sendevent(self._touch, *self._pantalla, x, y, self._id_toque)
+        return f"input {argumentos}"
+
+    def cerrar(self):
+        self.sesion.cerrar()
+
+
+_inyector: Optional[InyectorEntrada] = None
+
+
+def enviar_input(argumentos: str) -> bool:
+    """Inyector compartido del bot (se crea en el primer uso)"""
+    global _inyector
+    if _inyector is None:
+        _inyector = InyectorEntrada()
+    return _inyector.enviar(argumentos)
+
+
+def cerrar_inyector():
+    global _inyector
+    if _inyector is not None:
+        _inyector.cerrar()
+        _inyector = None
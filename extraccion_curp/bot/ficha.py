@@ -0,0 +1,81 @@
+"""
+Campos de la ficha de la persona a partir de los dumps que ya toma el bot
+- Cada EditText con valor es un campo; la etiqueta es su TextView hijo (igual
+  que "CURP" en curp_de_arbol), o el hint / content-desc / resource-id
+- Las etiquetas se normalizan a claves ("Fecha de nacimiento" ->
+  "fecha_de_nacimiento"); si se repiten se numeran (telefono, telefono_2)
+- Se unen los campos de la ficha (dump de "ya visitada") y de la pantalla
+  del CURP; un campo vacío nunca pisa a uno con valor
+"""
+
+import logging
+import re
+import unicodedata
+import xml.etree.ElementTree as ET
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+VALORES_VACIOS = {"", "null", "Seleccionar", "Seleccionar valor"}
+
+
+def normalizar_etiqueta(etiqueta: str) -> str:
+    """'Teléfono (celular):' -> 'telefono_celular'"""
+    sin_acentos = unicodedata.normalize('NFKD', etiqueta).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r"[^a-z0-9]+", "_", sin_acentos.lower()).strip("_")
+
+
+def _etiqueta(node) -> Optional[str]:
+    for hijo in node.iter("node"):
+        if hijo is not node and hijo.get("class") == "android.widget.TextView":
+            texto = hijo.get("text", "").strip()
+            if texto:
+                return texto
+    for atributo in ("hint", "content-desc"):
+        if node.get(atributo, "").strip():
+            return node.get(atributo).strip()
+    resource_id = node.get("resource-id", "")
+    return resource_id.split("/")[-1] if resource_id else None
+
+
+def campos_de_arbol(root) -> Dict[str, str]:
+    """
+    Returns:
+        Dict clave -> valor de los EditText con etiqueta y valor (en orden de pantalla)
+    """
+    campos: Dict[str, str] = {}
+    for node in root.iter("node"):
+        if node.get("class") != "android.widget.EditText":
+            continue
+        valor = node.get("text", "").strip()
+        etiqueta = _etiqueta(node)
+        if not etiqueta or valor in VALORES_VACIOS or valor == etiqueta:
+            continue                        # Campo vacío (solo muestra la etiqueta/hint)
+        clave = normalizar_etiqueta(etiqueta) or "campo"
+        base, n = clave, 2
+        while clave in campos:
+            clave = f"{base}_{n}"
+            n += 1
+        campos[clave] = valor
+    return campos
+
+
+def campos_de_xml(datos: bytes) -> Dict[str, str]:
+    """campos_de_arbol sobre un dump en memoria ({} si está vacío o corrupto)"""
+    if not datos:
+        return {}
+    try:
+        return campos_de_arbol(ET.fromstring(datos))
+    except ET.ParseError as e:
+        logger.warning("No se pudieron leer campos de la ficha: %s", e)
+        return {}
+
+
+def unir_campos(*capturas: Dict[str, str]) -> Dict[str, str]:
+    """Las capturas posteriores ganan, salvo que vengan vacías"""
+    unidos: Dict[str, str] = {}
+    for campos in capturas:
+        for clave, valor in campos.items():
+            if valor:
+                unidos[clave] = valor
+    return unidos
@@ -0,0 +1,171 @@
+"""
+Índice canónico de identidad de personas
+Une el checkpoint (progreso.json) y la carpeta de resultados JSON bajo una
+sola normalización de nombre, con pertenencia O(1)
+"""
+
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from cargador_json import iterar_carpeta
+
+
+def clave_canonica(nombre: str) -> str:
+    """
+    Normalización ÚNICA de nombres usada por el bot y todas las herramientas
+    - Quita acentos y caracteres especiales
+    - Convierte ñ a n
+    - Reemplaza espacios/guiones (uno o varios) por un guion bajo
+    - Todo en mayúsculas
+
+    Ejemplo: "JOSÉ  MARÍA-LÓPEZ" -> "JOSE_MARIA_LOPEZ"
+    """
+    # Normalizar unicode para quitar acentos
+    nfkd = unicodedata.normalize('NFKD', nombre)
+    sin_acentos = ''.join([c for c in nfkd if not unicodedata.combining(c)])
+
+    # Reemplazar ñ por n
+    sin_acentos = sin_acentos.replace('Ñ', 'N').replace('ñ', 'n')
+
+    # Eliminar caracteres especiales (solo dejar letras, números, espacios y guiones)
+    limpio = re.sub(r'[^\w\s-]', '', sin_acentos).strip().upper()
+
+    # Reemplazar múltiples espacios/guiones por uno solo
+    return re.sub(r'[-\s]+', '_', limpio)
+
+
+class IndiceIdentidad:
+    """
+    Conjunto de personas conocidas, indexado por clave canónica
+
+    Se comporta como el antiguo set `procesados` (add, in, len, iteración),
+    pero dos escrituras distintas del mismo nombre ("JOSÉ PÉREZ" / "JOSE PEREZ")
+    se consideran la misma persona.
+    """
+
+    def __init__(self):
+        self._nombres: Dict[str, str] = {}      # clave -> nombre original (primero visto)
+        self._archivos: Dict[str, str] = {}     # clave -> nombre del archivo JSON
+        self._en_checkpoint: Set[str] = set()   # claves presentes en progreso.json
+        self.colisiones: List[Dict] = []
+
+    @classmethod
+    def construir(cls, checkpoint_file: Optional[str] = None,
+                  carpeta_json: Optional[str] = None) -> 'IndiceIdentidad':
+        """
+        Construye el índice UNA VEZ a partir del checkpoint y de la carpeta de resultados
+
+        Args:
+            checkpoint_file: Ruta a progreso.json (puede no existir)
+            carpeta_json: Carpeta con un JSON por persona (puede no existir)
+        """
+        indice = cls()
+
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for nombre in data.get('procesados', []):
+                indice._registrar(nombre, origen='checkpoint')
+
+        if carpeta_json:
+            for archivo, datos, error in iterar_carpeta(carpeta_json):
+                if error:
+                    indice.colisiones.append({
+                        'tipo': 'archivo_ilegible',
+                        'archivo': archivo,
+                        'detalle': error
+                    })
+                nombre = datos.get('nombre') if isinstance(datos, dict) else None
+                indice._registrar(nombre or Path(archivo).stem, origen='archivo',
+                                  archivo=archivo)
+
+        return indice
+
+    def _registrar(self, nombre: str, origen: str, archivo: Optional[str] = None) -> str:
+        """Agrega un nombre al índice anotando las colisiones que detecte"""
+        clave = clave_canonica(nombre)
+        existente = self._nombres.get(clave)
+
+        if existente is None:
+            self._nombres[clave] = nombre
+        elif existente != nombre:
+            self.colisiones.append({
+                'tipo': 'misma_clave',
+                'clave': clave,
+                'nombres': [existente, nombre],
+                'origen': origen
+            })
+
+        if origen == 'checkpoint':
+            self._en_checkpoint.add(clave)
+
+        if archivo is not None:
+            if Path(archivo).stem != clave:
+                self.colisiones.append({
+                    'tipo': 'archivo_no_canonico',
+                    'clave': clave,
+                    'archivo': archivo,
+                    'esperado': f"{clave}.json"
+                })
+            if clave in self._archivos:
+                self.colisiones.append({
+                    'tipo': 'archivo_duplicado',
+                    'clave': clave,
+                    'archivos': [self._archivos[clave], archivo]
+                })
+            else:
+                self._archivos[clave] = archivo
+
+        return clave
+
+    # === Interfaz tipo set (compatible con el antiguo `procesados`) ===
+
+    def add(self, nombre: str, archivo: Optional[str] = None):
+        """Marca una persona como procesada (se guardará en el próximo checkpoint)"""
+        clave = self._registrar(nombre, origen='bot', archivo=archivo)
+        self._en_checkpoint.add(clave)
+
+    def descartar(self, nombre: str):
+        """Quita a una persona (su resultado no se pudo guardar: se vuelve a intentar)"""
+        clave = clave_canonica(nombre)
+        self._nombres.pop(clave, None)
+        self._archivos.pop(clave, None)
+        self._en_checkpoint.discard(clave)
+
+    def __contains__(self, nombre: str) -> bool:
+        return clave_canonica(nombre) in self._nombres
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+    def __iter__(self) -> Iterator[str]:
+        """Itera los nombres originales (uno por persona)"""
+        return iter(self._nombres.values())
+
+    # === Consultas ===
+
+    def tiene_archivo(self, nombre: str) -> bool:
+        """True si la persona ya tiene su JSON de resultado en la carpeta"""
+        return clave_canonica(nombre) in self._archivos
+
+    def reporte_reconciliacion(self) -> Dict:
+        """
+        Compara checkpoint contra carpeta de resultados
+
+        Returns:
+            Dict con 'solo_checkpoint' (procesados sin archivo), 'solo_archivo'
+            (archivos que no están en el checkpoint) y 'colisiones'
+        """
+        claves_archivo = set(self._archivos)
+        return {
+            'total': len(self._nombres),
+            'en_checkpoint': len(self._en_checkpoint),
+            'con_archivo': len(claves_archivo),
+            'solo_checkpoint': sorted(self._nombres[c] for c in self._en_checkpoint - claves_archivo),
+            'solo_archivo': sorted(self._nombres[c] for c in claves_archivo - self._en_checkpoint),
+            'colisiones': list(self.colisiones)
+        }
@@ -0,0 +1,180 @@
+"""
+Jerarquía de la pantalla desde un servidor residente en la tablet
+- `uiautomator dump` arranca uiautomator en frío, espera a que la app quede
+  quieta y escribe un archivo que luego hay que descargar: la operación más
+  lenta de cada corrida
+- Con JERARQUIA_BACKEND = 'servidor' se usa el servidor de uiautomator2
+  (JSON-RPC por HTTP, ya instalado en la tablet) que queda corriendo: una
+  petición devuelve el XML del árbol actual en el mismo formato que el dump
+- El XML se guarda en la misma ruta que usaría dump_screen_xml, así que los
+  parsers no cambian; opcionalmente se podan los nodos que ningún parser usa
+  (solo quedan TextView, EditText, clickables y sus ancestros)
+- Si el servidor no responde (ni después de intentar arrancarlo) se vuelve al
+  uiautomator dump por el resto de la corrida
+"""
+
+import json
+import logging
+import subprocess
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+import config
+from utils import ADB_CMD, safe_adb_command
+
+logger = logging.getLogger(__name__)
+
+CLASES_UTILES = ("android.widget.TextView", "android.widget.EditText")
+
+
+class ErrorServidorUI(Exception):
+    """El servidor no respondió o respondió con un error JSON-RPC"""
+
+
+class ClienteJerarquia:
+    """Cliente JSON-RPC mínimo del servidor de uiautomator2"""
+
+    def __init__(self, url: str = config.SERVIDOR_UI_URL, timeout: float = config.SERVIDOR_UI_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self._id = 0
+
+    def llamar(self, metodo: str, *params):
+        self._id += 1
+        cuerpo = json.dumps({"jsonrpc": "2.0", "id": self._id, "method": metodo,
+                             "params": list(params)}).encode('utf-8')
+        peticion = urllib.request.Request(self.url, data=cuerpo,
+                                          headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                datos = json.loads(respuesta.read().decode('utf-8'))
+        except (OSError, ValueError) as e:          # URLError y timeouts son OSError
+            raise ErrorServidorUI(f"{metodo}: {e}") from e
+        if datos.get("error"):
+            raise ErrorServidorUI(f"{metodo}: {datos['error']}")
+        return datos.get("result")
+
+    def activo(self) -> bool:
+        try:
+            return self.llamar("ping") == "pong"
+        except ErrorServidorUI:
+            return False
+
+    def jerarquia(self, comprimida: bool = False) -> str:
+        """XML del árbol actual (mismo formato que uiautomator dump)"""
+        xml = self.llamar("dumpWindowHierarchy", comprimida, config.SERVIDOR_UI_PROFUNDIDAD)
+        if not isinstance(xml, str) or not xml.strip():
+            raise ErrorServidorUI("dumpWindowHierarchy: respuesta vacía")
+        return xml
+
+
+def _util(node) -> bool:
+    return node.get("class") in CLASES_UTILES or node.get("clickable") == "true"
+
+
+def podar(xml: str) -> bytes:
+    """Deja solo los nodos útiles y sus ancestros (conserva la estructura padre/hijo)"""
+    root = ET.fromstring(xml)
+
+    def conservar(node) -> bool:
+        hijos_utiles = False
+        for hijo in list(node):
+            if conservar(hijo):
+                hijos_utiles = True
+            else:
+                node.remove(hijo)
+        return hijos_utiles or _util(node)
+
+    for hijo in list(root):
+        if not conservar(hijo):
+            root.remove(hijo)
+    return ET.tostring(root, encoding='utf-8', xml_declaration=True)
+
+
+class JerarquiaResidente:
+    """Backend de dump_screen_xml: pide el árbol al servidor y lo guarda en disco"""
+
+    def __init__(self, cliente: Optional[ClienteJerarquia] = None, podar_nodos: bool = config.JERARQUIA_PODAR):
+        self.cliente = cliente or ClienteJerarquia()
+        self.podar_nodos = podar_nodos
+        self.disponible: Optional[bool] = None      # None = aún no se intentó conectar
+        self._instrumentacion: Optional[subprocess.Popen] = None
+
+    def _conectar(self) -> bool:
+        """Redirige el puerto y, si el servidor no contesta, intenta arrancarlo"""
+        safe_adb_command(f"forward tcp:{config.SERVIDOR_UI_PUERTO} tcp:{config.SERVIDOR_UI_PUERTO_TABLET}", max_retries=1)
+        if self.cliente.activo():
+            return True
+        if config.SERVIDOR_UI_ARRANQUE:
+            logger.info("🌳 Arrancando servidor de jerarquía en la tablet...")
+            try:
+                self._instrumentacion = subprocess.Popen(
+                    f'"{ADB_CMD}" shell {config.SERVIDOR_UI_ARRANQUE}', shell=True,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except OSError as e:
+                logger.warning("No se pudo arrancar el servidor de jerarquía: %s", e)
+                return False
+            limite = time.monotonic() + config.SERVIDOR_UI_ESPERA_ARRANQUE
+            while time.monotonic() < limite:
+                time.sleep(0.5)
+                if self.cliente.activo():
+                    return True
+        return False
+
+    def guardar(self, output_path: str) -> bool:
+        """
+        Returns:
+            True si el XML quedó en output_path; False para usar uiautomator dump
+        """
+        if self.disponible is None:
+            self.disponible = self._conectar()
+            if self.disponible:
+                logger.info("🌳 Jerarquía por servidor residente (%s)", self.cliente.url)
+            else:
+                logger.warning("⚠️  Servidor de jerarquía no disponible: se usa uiautomator dump")
+        if not self.disponible:
+            return False
+
+        try:
+            xml = self.cliente.jerarquia()
+        except ErrorServidorUI as e:
+            # Una caída aislada (la app cambió de pantalla a media lectura) no
+            # desactiva el servidor; si ya no contesta ni al ping, sí
+            logger.warning("Servidor de jerarquía: %s", e)
+            self.disponible = self.cliente.activo()
+            return False
+
+        try:
+            datos = podar(xml) if self.podar_nodos else xml.encode('utf-8')
+        except ET.ParseError as e:
+            logger.warning("XML del servidor de jerarquía inválido: %s", e)
+            return False
+        with open(output_path, 'wb') as f:
+            f.write(datos)
+        return True
+
+    def cerrar(self):
+        if self._instrumentacion is not None and self._instrumentacion.poll() is None:
+            self._instrumentacion.terminate()
+        self._instrumentacion = None
+
+
+_residente: Optional[JerarquiaResidente] = None
+
+
+def guardar_jerarquia(output_path: str) -> bool:
+    """Backend compartido del bot (se conecta en el primer uso)"""
+    global _residente
+    if _residente is None:
+        _residente = JerarquiaResidente()
+    return _residente.guardar(output_path)
+
+
+def cerrar_jerarquia():
+    global _residente
+    if _residente is not None:
+        _residente.cerrar()
+        _residente = None
@@ -0,0 +1,49 @@
+"""
+Tiempos de las operaciones contra el dispositivo
+- medir('dump') cronometra un bloque; registrar() anota una duración ya medida
+- Solo se guardan agregados (veces, total, máximo), no cada medición
+- resumen() lo usa el bot al final: una línea por operación en el log y el
+  evento 'metricas' en el JSONL
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+_operaciones: Dict[str, Dict[str, float]] = {}
+
+
+def registrar(nombre: str, segundos: float):
+    datos = _operaciones.get(nombre)
+    if datos is None:
+        datos = _operaciones[nombre] = {'veces': 0, 'total': 0.0, 'maximo': 0.0}
+    datos['veces'] += 1
+    datos['total'] += segundos
+    datos['maximo'] = max(datos['maximo'], segundos)
+
+
+@contextmanager
+def medir(nombre: str):
+    """with medir('dump'): ... (se registra aunque el bloque lance una excepción)"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nombre, time.perf_counter() - inicio)
+
+
+def resumen() -> Dict[str, Dict[str, float]]:
+    """nombre -> {'veces', 'total', 'promedio', 'maximo'} (segundos, redondeados a ms)"""
+    return {
+        nombre: {
+            'veces': int(datos['veces']),
+            'total': round(datos['total'], 3),
+            'promedio': round(datos['total'] / datos['veces'], 3),
+            'maximo': round(datos['maximo'], 3),
+        }
+        for nombre, datos in sorted(_operaciones.items())
+    }
+
+
+def reiniciar():
+    _operaciones.clear()
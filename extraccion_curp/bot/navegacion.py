@@ -0,0 +1,191 @@
+"""
+Navegación por estados hasta la lista "Sin visita realizada"
+- detectar_pantalla() reconoce la pantalla en un dump por los textos de sus
+  controles (los mismos de CONTROLES en config.py)
+- El grafo ARISTAS dice qué acciones llevan de una pantalla a otra; camino()
+  elige el de menos acciones (Dijkstra, el grafo es diminuto)
+- Así, desde la ficha basta un ATRÁS y desde el padrón sin filtro no hace
+  falta volver a Inicio; solo una pantalla desconocida paga la secuencia
+  completa (Inicio -> Visitar -> Filtro -> Valor -> Opción -> Aplicar)
+- Si NAVEGACION_INTENT está definido, abrir la lista con ese intent es una
+  arista más desde cualquier pantalla
+- Al final se verifica con un dump; si no se llegó, ir_a_lista() devuelve
+  None y el bot usa la secuencia completa de siempre
+"""
+
+import heapq
+import logging
+import time
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import config
+import metricas
+from coordenadas import tap_control
+from pantalla import es_lista_sin_visita
+from utils import adb_input, dump_screen_xml, safe_adb_command
+
+logger = logging.getLogger(__name__)
+
+LISTA = 'lista_sin_visita'
+DESCONOCIDA = 'desconocida'
+
+# Acción: ('tap', control, delay) | ('atras',) | ('intent',)
+Accion = Tuple
+ATRAS: Accion = ('atras',)
+
+# pantalla -> [(destino, acciones)]; las de '*' salen de cualquier pantalla
+ARISTAS: Dict[str, List[Tuple[str, List[Accion]]]] = {
+    'curp': [('ficha', [ATRAS])],
+    'ficha': [(LISTA, [ATRAS])],        # Regresa a la lista en la misma posición
+    'menu': [('padron', [('tap', 'BTN_VISITAR_MENU', config.DELAY_TAP_DEFAULT)])],
+    'padron': [('filtro', [('tap', 'BTN_FILTRO', config.DELAY_TAP_DEFAULT)])],
+    'filtro': [(LISTA, [('tap', 'BTN_VALOR_TODOS', config.DELAY_TAP_DEFAULT),
+                        ('tap', 'BTN_TODOS_OPCION', config.DELAY_TAP_DEFAULT),
+                        ('tap', 'BTN_APLICAR_FILTRO', config.DELAY_FILTRO_CARGA)])],
+    '*': [('menu', [('tap', 'BTN_INICIO', config.DELAY_TAP_DEFAULT)])],
+}
+
+# Pasar por aquí deja la lista arriba (hay que restaurar la página)
+REINICIAN_LISTA = {'filtro', 'menu'}
+
+
+def _textos(root) -> Set[str]:
+    textos = set()
+    for node in root.iter("node"):
+        for atributo in ("text", "content-desc"):
+            valor = node.get(atributo, "").strip().lower()
+            if valor:
+                textos.add(valor)
+    return textos
+
+
+def _tiene(textos: Set[str], control: str) -> bool:
+    return any(t.lower() in textos for t in config.CONTROLES.get(control, {}).get('textos', []))
+
+
+def detectar_pantalla(xml_path: str) -> str:
+    """
+    Returns:
+        'filtro', 'curp', 'ficha', 'lista_sin_visita', 'padron', 'menu' o 'desconocida'
+    """
+    try:
+        root = ET.parse(xml_path).getroot()
+    except (OSError, ET.ParseError) as e:
+        logger.warning("No se pudo leer '%s' para detectar la pantalla: %s", xml_path, e)
+        return DESCONOCIDA
+    textos = _textos(root)
+
+    # El orden importa: el diálogo de filtro también dice "Sin visita realizada",
+    # y la lista filtrada también tiene el botón Filtro y los "Visitar"
+    if _tiene(textos, 'BTN_APLICAR_FILTRO'):
+        return 'filtro'
+    if "curp" in textos:
+        return 'curp'
+    if _tiene(textos, 'BTN_INICIAR_VISITA'):
+        return 'ficha'
+    if any("sin visita" in t for t in textos):
+        return LISTA
+    if _tiene(textos, 'BTN_FILTRO'):
+        return 'padron'
+    if _tiene(textos, 'BTN_VISITAR_MENU'):
+        return 'menu'
+    return DESCONOCIDA
+
+
+def _aristas(pantalla: str) -> List[Tuple[str, List[Accion]]]:
+    salidas = ARISTAS.get(pantalla, []) + ARISTAS['*']
+    if config.NAVEGACION_INTENT:
+        salidas = salidas + [(LISTA, [('intent',)])]
+    return salidas
+
+
+def camino(desde: str, hasta: str = LISTA) -> Optional[List[Tuple[str, List[Accion]]]]:
+    """
+    Returns:
+        Lista de (pantalla destino, acciones) con el menor número de acciones,
+        [] si ya se está ahí, o None si no hay camino
+    """
+    distancias = {desde: 0}
+    previo: Dict[str, Tuple[str, List[Accion]]] = {}
+    pendientes = [(0, desde)]
+    while pendientes:
+        costo, pantalla = heapq.heappop(pendientes)
+        if pantalla == hasta:
+            break
+        if costo > distancias[pantalla]:
+            continue
+        for destino, acciones in _aristas(pantalla):
+            nuevo = costo + len(acciones)
+            if nuevo < distancias.get(destino, float('inf')):
+                distancias[destino] = nuevo
+                previo[destino] = (pantalla, acciones)
+                heapq.heappush(pendientes, (nuevo, destino))
+    if hasta not in distancias:
+        return None
+
+    pasos = []
+    pantalla = hasta
+    while pantalla != desde:
+        origen, acciones = previo[pantalla]
+        pasos.append((pantalla, acciones))
+        pantalla = origen
+    return list(reversed(pasos))
+
+
+def ejecutar_accion(accion: Accion) -> bool:
+    if accion[0] == 'tap':
+        return tap_control(accion[1], accion[2])
+    if accion[0] == 'atras':
+        ok = adb_input("shell input keyevent 4")
+        time.sleep(config.DELAY_ATRAS)
+        return ok
+    ok = safe_adb_command(f"shell {config.NAVEGACION_INTENT}", max_retries=1)
+    time.sleep(config.DELAY_FILTRO_CARGA)
+    return ok
+
+
+class Navegador:
+    """Lleva el dispositivo a la lista "Sin visita" por el camino más corto"""
+
+    def __init__(self, xml_path: str = config.SCREEN_XML_TEMP,
+                 dump: Callable[[str], bool] = dump_screen_xml,
+                 ejecutar: Callable[[Accion], bool] = ejecutar_accion):
+        self.xml_path = xml_path
+        self.dump = dump
+        self.ejecutar = ejecutar
+
+    def ir_a_lista(self, xml_actual: Optional[str] = None) -> Optional[bool]:
+        """
+        Args:
+            xml_actual: Dump reciente de la pantalla (si no, se toma uno)
+
+        Returns:
+            None si no se llegó a la lista; si se llegó, True cuando la lista
+            quedó arriba (pasó por el filtro) y False si conserva su posición
+        """
+        with metricas.medir('navegacion'):
+            if xml_actual is None:
+                if not self.dump(self.xml_path):
+                    return None
+                xml_actual = self.xml_path
+
+            desde = detectar_pantalla(xml_actual)
+            pasos = camino(desde)
+            if pasos is None:
+                return None
+            if not pasos:
+                return False
+
+            acciones = [a for _, acciones_paso in pasos for a in acciones_paso]
+            logger.info("🧭 %s -> %s: %s", desde, LISTA,
+                        " -> ".join(a[1] if a[0] == 'tap' else a[0].upper() for a in acciones))
+            for accion in acciones:
+                if not self.ejecutar(accion):
+                    return None
+
+            if not self.dump(self.xml_path) or not es_lista_sin_visita(self.xml_path):
+                logger.warning("🧭 El camino corto desde '%s' no llegó a la lista", desde)
+                return None
+            return any(destino in REINICIAN_LISTA for destino, _ in pasos) or \
+                any(a[0] == 'intent' for a in acciones)
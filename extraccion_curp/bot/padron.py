@@ -0,0 +1,211 @@
+"""
+Padrón completo de la lista filtrada y plan de visitas
+- barrer_lista() recorre la lista "Sin visita" una sola vez (solo scrolls y
+  dumps, sin entrar a ninguna ficha) y anota cada nombre con la página en la
+  que apareció por primera vez; se guarda en PADRON_FILE
+- Las personas procesadas salen de la lista "Sin visita" y las de abajo
+  suben: la página de cada pendiente se recalcula con su lugar entre los
+  nombres del padrón que siguen en la lista (filas por pantalla y filas
+  que avanza cada scroll, medidas en el barrido), no con la del barrido
+- Las corridas siguientes cargan el padrón: planificar() deja a los
+  pendientes en orden de página y estima cuánto falta contra TOTAL_OBJETIVO
+- El loop del bot sigue mandando (la lista puede haber cambiado desde el
+  barrido): el padrón solo le dice a qué página saltar con flings cuando la
+  visible ya no tiene pendientes, en vez de avanzar página por página
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+Fila = Tuple[str, int, int]
+
+
+class PadronLista:
+    """nombre -> página (0 = arriba), en el orden en que aparecen en la lista"""
+
+    def __init__(self, paginas: Optional[Dict[str, int]] = None, timestamp: Optional[float] = None):
+        self.paginas: Dict[str, int] = dict(paginas or {})
+        self.timestamp = timestamp
+
+    def agregar(self, nombres: Iterable[str], pagina: int) -> int:
+        """Returns: cuántos nombres no estaban (los repetidos conservan su primera página)"""
+        nuevos = 0
+        for nombre in nombres:
+            if nombre not in self.paginas:
+                self.paginas[nombre] = pagina
+                nuevos += 1
+        return nuevos
+
+    def _geometria(self) -> Tuple[int, float]:
+        """
+        Filas visibles por pantalla (nombres de la página 0) y filas que avanza
+        cada scroll (promedio de nombres nuevos de las páginas intermedias; la
+        última puede quedar incompleta)
+        """
+        por_pagina: Dict[int, int] = {}
+        for pagina in self.paginas.values():
+            por_pagina[pagina] = por_pagina.get(pagina, 0) + 1
+        pantalla = max(1, por_pagina.get(0, 0))
+        ultima = max(por_pagina, default=0)
+        intermedias = [n for p, n in por_pagina.items() if 0 < p < ultima]
+        if intermedias:
+            avance = sum(intermedias) / len(intermedias)
+        else:
+            avance = pantalla - config.SCROLL_FILAS_SOLAPE
+        return pantalla, max(1.0, avance)
+
+    def _en_lista(self, excluidos) -> List[str]:
+        """Nombres del padrón que siguen en la lista (los procesados ya salieron), en orden"""
+        return [nombre for nombre in self.paginas if nombre not in excluidos]
+
+    def paginas_actuales(self, excluidos) -> Dict[str, int]:
+        """
+        Página en la que aparece ahora cada nombre que sigue en la lista: la
+        primera en la que entra a la pantalla según su lugar en la lista
+
+        Args:
+            excluidos: Contenedor con `in` de los que ya salieron de la lista
+                (p. ej. el IndiceIdentidad de procesados)
+        """
+        pantalla, avance = self._geometria()
+        return {nombre: max(0, math.ceil((lugar - pantalla + 1) / avance))
+                for lugar, nombre in enumerate(self._en_lista(excluidos))}
+
+    def nombres_en(self, pagina: int, excluidos=()) -> List[str]:
+        """Nombres visibles en la página (sin los excluidos, la lista se recorre hacia arriba)"""
+        pantalla, avance = self._geometria()
+        inicio = int(round(pagina * avance))
+        return self._en_lista(excluidos)[inicio:inicio + pantalla]
+
+    def pendientes(self, excluidos, abandonados=()) -> List[Tuple[str, int]]:
+        """
+        Args:
+            excluidos: Los que ya salieron de la lista (procesados)
+            abandonados: Siguen en la lista pero no se visitan (abandonados, en espera)
+
+        Returns:
+            [(nombre, página actual)] de los que faltan, en el orden de la lista
+        """
+        return [(nombre, pagina) for nombre, pagina in self.paginas_actuales(excluidos).items()
+                if nombre not in abandonados]
+
+    def siguiente_pagina(self, excluidos, desde: int, abandonados=()) -> Optional[int]:
+        """Primera página actual >= desde con algún pendiente (None si ya no hay)"""
+        paginas = [pagina for _, pagina in self.pendientes(excluidos, abandonados)
+                   if pagina >= desde]
+        return min(paginas) if paginas else None
+
+    def __len__(self) -> int:
+        return len(self.paginas)
+
+    def guardar(self, ruta: str):
+        data = {
+            'timestamp': self.timestamp or time.time(),
+            'total': len(self.paginas),
+            'personas': [{'nombre': nombre, 'pagina': pagina}
+                         for nombre, pagina in self.paginas.items()],
+        }
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> Optional['PadronLista']:
+        """None si no hay padrón (o no se puede leer)"""
+        if not ruta or not os.path.exists(ruta):
+            return None
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            paginas = {p['nombre']: int(p['pagina']) for p in data.get('personas', [])}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("No se pudo leer el padrón %s: %s", ruta, e)
+            return None
+        return cls(paginas, data.get('timestamp'))
+
+
+def barrer_lista(dump: Callable[[str], bool], leer_filas: Callable[[str], List[Fila]],
+                 desplazar: Callable[[List[Fila]], object], xml_path: str = config.SCREEN_XML_TEMP,
+                 paginas_sin_nuevos: int = config.PADRON_PAGINAS_SIN_NUEVOS,
+                 paginas_max: int = config.PADRON_PAGINAS_MAX) -> PadronLista:
+    """
+    Recorre la lista desde arriba hasta que `paginas_sin_nuevos` páginas
+    seguidas no agregan nombres (fin de la lista)
+
+    Args:
+        dump: Guarda la pantalla en la ruta dada
+        leer_filas: Filas (nombre, y_arriba, y_abajo) del XML
+        desplazar: Avanza una página (recibe las filas visibles, para el calibrador)
+    """
+    padron = PadronLista()
+    sin_nuevos = 0
+    for pagina in range(paginas_max + 1):
+        filas = leer_filas(xml_path) if dump(xml_path) else []
+        nuevos = padron.agregar((nombre for nombre, _, _ in filas), pagina)
+        logger.info("🗂️  Página %s: %s nombres nuevos (%s en total)", pagina, nuevos, len(padron))
+
+        sin_nuevos = 0 if nuevos else sin_nuevos + 1
+        if sin_nuevos >= paginas_sin_nuevos:
+            break
+        desplazar(filas)
+    else:
+        logger.warning("🗂️  Se alcanzó el máximo de %s páginas sin llegar al final", paginas_max)
+
+    padron.timestamp = time.time()
+    return padron
+
+
+def planificar(padron: PadronLista, procesados, objetivo: int, desde: int = 0, abandonados=(),
+               segundos_persona: float = config.ETA_SEGUNDOS_PERSONA,
+               segundos_pagina: float = config.ETA_SEGUNDOS_PAGINA,
+               segundos_salto: float = config.DELAY_FLING / config.PAGINAS_POR_FLING) -> Dict:
+    """
+    Orden de visita y tiempo estimado para llegar al objetivo
+
+    La app conserva la posición de la lista al volver de una ficha, así que
+    el orden que menos se desplaza es el de la lista: página por página, y
+    las páginas sin pendientes se cruzan con flings (segundos_salto por página).
+    Las páginas son las actuales (ver paginas_actuales), no las del barrido
+
+    Args:
+        procesados: Personas ya procesadas (se excluyen)
+        abandonados: Personas que ya no se intentan (también se excluyen)
+        desde: Página en la que está la lista ahora
+
+    Returns:
+        Dict con 'pendientes' [(nombre, página)] en orden de visita, 'faltan'
+        (para el objetivo), 'alcanzable' (el padrón alcanza para el objetivo),
+        'paginas' (con algo que visitar) y 'eta_segundos'
+    """
+    pendientes = padron.pendientes(procesados, abandonados)
+    # Lo que quedó arriba de la página actual se deja al final (requiere volver arriba)
+    pendientes.sort(key=lambda p: p[1] < desde)
+    faltan = max(0, objetivo - len(procesados))
+    a_visitar = pendientes[:faltan]
+
+    paginas = list(dict.fromkeys(pagina for _, pagina in a_visitar))    # En orden de visita
+    saltadas = 0
+    actual = desde
+    for pagina in paginas:
+        if pagina < actual:
+            actual = 0          # Reset: la lista vuelve arriba
+        saltadas += max(0, pagina - actual - 1)
+        actual = pagina
+
+    return {
+        'pendientes': pendientes,
+        'faltan': faltan,
+        'alcanzable': len(pendientes) >= faltan,
+        'paginas': len(paginas),
+        'eta_segundos': round(len(a_visitar) * segundos_persona + len(paginas) * segundos_pagina
+                              + saltadas * segundos_salto, 1),
+    }
@@ -0,0 +1,129 @@
+"""
+Sonda barata de la pantalla actual
+- `dumpsys window` dice qué ventana tiene el foco en una fracción de lo que
+  tarda un uiautomator dump (que además hay que descargar)
+- La app no dice qué pantalla es cada ventana: la sonda lo aprende. Cada dump
+  se anota junto con el foco que había; cuando un foco ya dio varias veces la
+  misma respuesta (y otro foco dio la contraria) basta con consultar el foco
+- Un foco que dio las dos respuestas (apps de una sola actividad) no sirve y
+  se sigue usando el dump; cada SONDA_CONTROL_CADA respuestas por foco se hace
+  un dump de control por si la app cambió
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Optional, Tuple
+
+import config
+import metricas
+from utils import adb_output, dump_screen_xml
+
+logger = logging.getLogger(__name__)
+
+COMANDO_FOCO = 'shell "dumpsys window | grep mCurrentFocus"'
+
+
+def _textos(xml_path: str):
+    root = ET.parse(xml_path).getroot()
+    for node in root.findall(".//node[@class='android.widget.TextView']"):
+        yield node.get("text", "").strip()
+
+
+def es_lista_sin_visita(xml_path: str) -> bool:
+    """La lista filtrada muestra "Personas sin visita realizada" """
+    return any("sin visita" in texto.lower() for texto in _textos(xml_path))
+
+
+def es_ya_visitada(xml_path: str) -> bool:
+    """Tras tocar "Iniciar visita" la ficha no cambió (o dice "visitada")"""
+    return any("Iniciar visita" in texto or "visitada" in texto.lower() for texto in _textos(xml_path))
+
+
+PREGUNTAS: Dict[str, Callable[[str], bool]] = {
+    'lista_sin_visita': es_lista_sin_visita,
+    'ya_visitada': es_ya_visitada,
+}
+
+
+def foco_actual() -> Optional[str]:
+    """'paquete/Actividad' de la ventana con el foco, o None (transición, error)"""
+    with metricas.medir('sonda_foco'):
+        salida = adb_output(COMANDO_FOCO)
+    # mCurrentFocus=Window{1a2b3c u0 mx.gob.padron/mx.gob.padron.MainActivity}
+    coincidencia = re.search(r"mCurrentFocus=Window\{([^}]*)\}", salida or "")
+    if not coincidencia or not coincidencia.group(1).split():
+        return None
+    return coincidencia.group(1).split()[-1]
+
+
+class SondaPantalla:
+    """Responde preguntas sobre la pantalla con el foco cuando puede, con un dump si no"""
+
+    def __init__(self, confirmaciones: int = config.SONDA_CONFIRMACIONES,
+                 control_cada: int = config.SONDA_CONTROL_CADA,
+                 activa: bool = config.SONDA_FOCO):
+        self.confirmaciones = confirmaciones
+        self.control_cada = control_cada
+        self.activa = activa
+        # (pregunta, foco) -> {'si': dumps con True, 'no': dumps con False, 'sin_control': respuestas por foco}
+        self._vistos: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.respuestas_foco = 0
+        self.respuestas_dump = 0
+
+    def _confiable(self, pregunta: str, foco: str) -> Optional[bool]:
+        """La respuesta aprendida para este foco, o None si todavía no alcanza"""
+        visto = self._vistos.get((pregunta, foco))
+        if visto is None or (visto['si'] and visto['no']):
+            return None
+        respuesta = visto['si'] > 0
+        if visto['si' if respuesta else 'no'] < self.confirmaciones:
+            return None
+        # El foco solo distingue pantallas si otro foco dio la respuesta contraria
+        contraria = 'no' if respuesta else 'si'
+        if not any(p == pregunta and f != foco and v[contraria]
+                   for (p, f), v in self._vistos.items()):
+            return None
+        if visto['sin_control'] >= self.control_cada:
+            return None
+        return respuesta
+
+    def anotar(self, pregunta: str, foco: Optional[str], respuesta: bool):
+        """Aprende de un dump ya hecho (foco consultado justo antes)"""
+        if foco is None:
+            return
+        visto = self._vistos.setdefault((pregunta, foco), {'si': 0, 'no': 0, 'sin_control': 0})
+        antes = visto['si'] and visto['no']
+        visto['si' if respuesta else 'no'] += 1
+        visto['sin_control'] = 0
+        if visto['si'] and visto['no'] and not antes:
+            logger.info("🔎 El foco %s no distingue '%s': se seguirá usando el dump", foco, pregunta)
+
+    def responder(self, pregunta: str, xml_path: str) -> Optional[bool]:
+        """
+        Args:
+            pregunta: Clave de PREGUNTAS ('lista_sin_visita', 'ya_visitada')
+            xml_path: Dónde guardar el dump si hace falta
+
+        Returns:
+            True/False, o None si no se pudo saber (dump fallido)
+        """
+        foco = foco_actual() if self.activa else None
+        if foco is not None:
+            respuesta = self._confiable(pregunta, foco)
+            if respuesta is not None:
+                self._vistos[(pregunta, foco)]['sin_control'] += 1
+                self.respuestas_foco += 1
+                logger.debug("🔎 %s = %s (foco %s)", pregunta, respuesta, foco)
+                return respuesta
+
+        if not dump_screen_xml(xml_path):
+            return None
+        try:
+            respuesta = PREGUNTAS[pregunta](xml_path)
+        except ET.ParseError as e:
+            logger.warning("No se pudo leer el dump '%s': %s", xml_path, e)
+            return None
+        self.respuestas_dump += 1
+        self.anotar(pregunta, foco, respuesta)
+        return respuesta
@@ -0,0 +1,172 @@
+"""
+Extracción y guardado de resultados en un hilo aparte
+- El hilo del dispositivo solo lee los bytes del dump del CURP y los encola;
+  aquí se extrae y valida el CURP y se escribe el JSON de la persona, mientras
+  el bot ya va de regreso a la lista
+- Cola acotada: si el trabajador se atrasa, encolar() espera (nunca hay más de
+  PERSISTIR_COLA_MAX dumps en memoria)
+- Los checkpoints pasan por la misma cola, así que se escriben después de los
+  resultados encolados antes que ellos, y sin las personas que fallaron
+- Cada resultado vuelve al hilo del dispositivo por resultados(); si falló,
+  la persona se quita de procesados para volver a intentarla
+- profundidad (trabajos en espera) y retraso (segundos que lleva esperando el
+  más viejo) para el log y los eventos
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import config
+from ficha import campos_de_xml, unir_campos
+from identidad import clave_canonica
+from utils import extraer_curp_de_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class PersistidorCurp:
+    """Trabajador de fondo: bytes del dump -> CURP -> json/NOMBRE.json"""
+
+    def __init__(self, carpeta_json: str, guardar_checkpoint: Callable[[List[str]], None],
+                 cola_max: int = config.PERSISTIR_COLA_MAX,
+                 en_hilo: bool = config.PERSISTIR_EN_SEGUNDO_PLANO,
+                 capturar_campos: bool = config.CAPTURA_CAMPOS):
+        """
+        Args:
+            carpeta_json: Carpeta de resultados (un JSON por persona)
+            guardar_checkpoint: Escribe el checkpoint con la lista de nombres
+            cola_max: Trabajos en espera antes de que encolar() bloquee
+            en_hilo: False = todo se hace en encolar() (como antes, sin hilo)
+            capturar_campos: Agregar 'campos' (EditTexts de la ficha, ver ficha.py) al JSON
+        """
+        self.carpeta_json = carpeta_json
+        self.guardar_checkpoint = guardar_checkpoint
+        self.en_hilo = en_hilo
+        self.capturar_campos = capturar_campos
+        self._cola: queue.Queue = queue.Queue(maxsize=cola_max)
+        self._resultados: queue.Queue = queue.Queue()
+        self._encolados = deque()           # Momento en que se encoló cada trabajo pendiente
+        self._fallidos = set()              # Claves cuyo último intento falló
+        self._hilo: Optional[threading.Thread] = None
+        self.guardados = 0
+        self.fallidos = 0
+        self.retraso_max = 0.0
+
+    # === HILO DEL DISPOSITIVO ===
+
+    def iniciar(self):
+        if self.en_hilo and self._hilo is None:
+            self._hilo = threading.Thread(target=self._trabajar, name="persistidor", daemon=True)
+            self._hilo.start()
+
+    def encolar(self, nombre: str, nombre_limpio: str, datos: bytes, inicio: float,
+                datos_ficha: bytes = b""):
+        """
+        Args:
+            nombre: Nombre completo de la persona
+            nombre_limpio: Nombre del archivo (sin .json)
+            datos: Bytes del dump de la pantalla del CURP
+            inicio: perf_counter() del inicio de la visita (para los segundos del evento)
+            datos_ficha: Dump de la ficha tomado antes (solo para los campos)
+        """
+        self._poner({'tipo': 'persona', 'nombre': nombre, 'nombre_limpio': nombre_limpio,
+                     'datos': datos, 'datos_ficha': datos_ficha, 'inicio': inicio})
+
+    def encolar_checkpoint(self, nombres: List[str]):
+        """nombres: copia de procesados tomada ahora (el hilo no toca el índice)"""
+        self._poner({'tipo': 'checkpoint', 'nombres': nombres})
+
+    def _poner(self, trabajo: Dict):
+        if self._hilo is None:
+            self._hacer(trabajo)
+            return
+        self._encolados.append(time.monotonic())
+        self._cola.put(trabajo)
+
+    def resultados(self) -> List[Dict]:
+        """Resultados terminados desde la última llamada (no bloquea)"""
+        terminados = []
+        while True:
+            try:
+                terminados.append(self._resultados.get_nowait())
+            except queue.Empty:
+                return terminados
+
+    @property
+    def profundidad(self) -> int:
+        return len(self._encolados)
+
+    @property
+    def retraso(self) -> float:
+        """Segundos que lleva esperando el trabajo pendiente más viejo"""
+        try:
+            return time.monotonic() - self._encolados[0]
+        except IndexError:
+            return 0.0
+
+    def detener(self, timeout: Optional[float] = None):
+        """Termina lo que está en la cola y detiene el hilo"""
+        if self._hilo is None:
+            return
+        self._cola.put(None)
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    # === HILO DE FONDO ===
+
+    def _trabajar(self):
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                return
+            try:
+                self._hacer(trabajo)
+            finally:
+                encolado = self._encolados.popleft()
+                self.retraso_max = max(self.retraso_max, time.monotonic() - encolado)
+
+    def _hacer(self, trabajo: Dict):
+        if trabajo['tipo'] == 'checkpoint':
+            self.guardar_checkpoint([n for n in trabajo['nombres']
+                                     if clave_canonica(n) not in self._fallidos])
+            return
+
+        nombre = trabajo['nombre']
+        resultado = {'nombre': nombre, 'nombre_limpio': trabajo['nombre_limpio'],
+                     'curp': None, 'error': None}
+        try:
+            curp = extraer_curp_de_bytes(trabajo['datos'], nombre)
+            if not curp:
+                logger.warning("   ⚠️  No se pudo extraer CURP del XML (%s)", nombre)
+                data = {"nombre": nombre, "curp": None, "error": "No se encontró CURP en el XML"}
+            else:
+                data = {"nombre": nombre, "curp": curp}
+            if self.capturar_campos:
+                data["campos"] = unir_campos(campos_de_xml(trabajo['datos_ficha']),
+                                             campos_de_xml(trabajo['datos']))
+
+            ruta_json = os.path.join(self.carpeta_json, f"{trabajo['nombre_limpio']}.json")
+            temporal = ruta_json + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, ruta_json)
+
+            resultado['curp'] = curp
+            self._fallidos.discard(clave_canonica(nombre))
+            self.guardados += 1
+            logger.info("   ✅ Guardado: %s.json (%s)", trabajo['nombre_limpio'],
+                        f"CURP: {curp}" if curp else "sin CURP")
+        except Exception as e:
+            resultado['error'] = str(e) or type(e).__name__
+            self._fallidos.add(clave_canonica(nombre))
+            self.fallidos += 1
+            logger.error("   ❌ No se pudo guardar %s: %s", nombre, resultado['error'])
+
+        resultado['segundos'] = round(time.perf_counter() - trabajo['inicio'], 2)
+        self._resultados.put(resultado)
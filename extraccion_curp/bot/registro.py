@@ -0,0 +1,145 @@
+"""
+Logging asíncrono del bot
+- Los loggers solo encolan el registro (QueueHandler): escribir a disco o a
+  la consola ocurre en el hilo del QueueListener, nunca en el loop del dispositivo
+- La cola es acotada; si se llena (disco lento) se descartan registros y se
+  cuentan, en lugar de bloquear el loop
+- Además del log legible (bot.log + consola) se escribe un flujo compacto
+  JSONL con todos los registros y con los eventos estructurados de evento()
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+FORMATO_HUMANO = '%(asctime)s - %(levelname)s - %(message)s'
+
+logger_eventos = logging.getLogger('eventos')
+
+_listener: Optional['OyenteCola'] = None
+_manejador_cola: Optional['ManejadorColaAcotada'] = None
+
+
+class ManejadorColaAcotada(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (y cuenta) en vez de bloquear si la cola está llena"""
+
+    def __init__(self, cola: queue.Queue):
+        super().__init__(cola)
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El listener está en el mismo proceso: el formateo (mensaje, fecha,
+        # traceback) se deja para su hilo en vez de hacerlo aquí
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class OyenteCola(logging.handlers.QueueListener):
+    """QueueListener cuyo aviso de cierre espera lugar en la cola (solo al salir)"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class SinEventos(logging.Filter):
+    """Los eventos estructurados solo van al JSONL, no al log legible"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not hasattr(record, 'evento')
+
+
+class FormatoJSONL(logging.Formatter):
+    """Una línea JSON compacta por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            't': round(record.created, 3),
+            'nivel': record.levelname,
+            'origen': record.name,
+        }
+        evento = getattr(record, 'evento', None)
+        if evento is not None:
+            datos['evento'] = evento
+            datos.update(getattr(record, 'datos', {}))
+        else:
+            datos['msg'] = record.getMessage()
+            if record.exc_info:
+                datos['error'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+def configurar_logging(log_file: str, eventos_file: Optional[str] = None,
+                       nivel: str = 'INFO', cola_max: int = 10000):
+    """
+    Instala el pipeline asíncrono en el logger raíz (reemplaza a basicConfig)
+
+    Args:
+        log_file: Log legible (bot.log)
+        eventos_file: Flujo JSONL (None = no se escribe)
+        nivel: Nivel mínimo ('DEBUG', 'INFO', ...)
+        cola_max: Registros en espera antes de empezar a descartar
+    """
+    global _listener, _manejador_cola
+    detener_logging()
+
+    formato = logging.Formatter(FORMATO_HUMANO)
+    sin_eventos = SinEventos()
+
+    archivo = logging.FileHandler(log_file, encoding='utf-8')
+    consola = logging.StreamHandler()
+    for manejador in (archivo, consola):
+        manejador.setFormatter(formato)
+        manejador.addFilter(sin_eventos)
+    manejadores = [archivo, consola]
+
+    if eventos_file:
+        jsonl = logging.FileHandler(eventos_file, encoding='utf-8')
+        jsonl.setFormatter(FormatoJSONL())
+        manejadores.append(jsonl)
+
+    cola = queue.Queue(maxsize=cola_max)
+    _manejador_cola = ManejadorColaAcotada(cola)
+    _listener = OyenteCola(cola, *manejadores, respect_handler_level=True)
+
+    raiz = logging.getLogger()
+    for previo in list(raiz.handlers):
+        raiz.removeHandler(previo)
+    raiz.addHandler(_manejador_cola)
+    raiz.setLevel(getattr(logging, nivel.upper(), logging.INFO))
+
+    _listener.start()
+    atexit.register(detener_logging)
+
+
+def detener_logging():
+    """Vacía la cola y cierra los archivos (también se llama solo al salir)"""
+    global _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_manejador_cola)
+    _listener.stop()
+    for manejador in _listener.handlers:
+        manejador.close()
+    _listener = None
+    if _manejador_cola.descartados:
+        print(f"⚠️  Log: {_manejador_cola.descartados} registros descartados (cola llena)")
+
+
+def registros_descartados() -> int:
+    return _manejador_cola.descartados if _manejador_cola is not None else 0
+
+
+def evento(tipo: str, **datos):
+    """
+    Evento estructurado (solo JSONL), p. ej. evento('persona', resultado='guardado', segundos=17.2)
+    """
+    if logger_eventos.isEnabledFor(logging.INFO):
+        logger_eventos.info(tipo, extra={'evento': tipo, 'datos': datos})
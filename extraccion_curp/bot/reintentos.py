@@ -0,0 +1,137 @@
+"""
+Reintentos diferidos de personas que fallan
+- Cada falla se anota por persona con su motivo (el paso de la visita o el
+  error del guardado)
+- Durante el pase principal una persona que falló no se vuelve a intentar
+  aunque siga en pantalla: se deja para los repasos, que empiezan cuando el
+  pase principal termina
+- Entre intentos se espera REINTENTO_ESPERA_BASE * 2^(intentos-1) segundos
+  (hasta REINTENTO_ESPERA_MAX)
+- Al llegar a REINTENTOS_MAX la persona se abandona; los abandonados se
+  guardan en el checkpoint y las corridas siguientes no gastan tiempo del
+  dispositivo en ellos (para reintentarlos, quitarlos de "abandonados" en
+  progreso.json)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import config
+from identidad import clave_canonica
+
+logger = logging.getLogger(__name__)
+
+
+class PlanificadorReintentos:
+    """Fallas por persona (clave canónica), repasos y abandonados"""
+
+    def __init__(self, intentos_max: int = config.REINTENTOS_MAX,
+                 espera_base: float = config.REINTENTO_ESPERA_BASE,
+                 espera_max: float = config.REINTENTO_ESPERA_MAX,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.intentos_max = intentos_max
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.reloj = reloj
+        self.repasos = 0                        # 0 = pase principal
+        self._fallos: Dict[str, Dict] = {}      # clave -> {'nombre', 'intentos', 'motivos', 'proximo'}
+        self._abandonados: Dict[str, Dict] = {}
+        # El checkpoint se escribe desde el hilo del persistidor
+        self._lock = threading.Lock()
+
+    def cargar_abandonados(self, checkpoint_file: Optional[str]) -> int:
+        """
+        Recupera los abandonados guardados en el checkpoint
+
+        Returns:
+            Cuántos se cargaron
+        """
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return 0
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                abandonados = json.load(f).get('abandonados', [])
+            with self._lock:
+                for registro in abandonados:
+                    self._abandonados[clave_canonica(registro['nombre'])] = {
+                        'nombre': registro['nombre'],
+                        'intentos': int(registro.get('intentos', 0)),
+                        'motivos': list(registro.get('motivos', [])),
+                    }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("No se pudieron leer los abandonados del checkpoint: %s", e)
+        return len(self._abandonados)
+
+    def registrar_fallo(self, nombre: str, motivo: str) -> bool:
+        """
+        Returns:
+            True si con esta falla la persona se abandona
+        """
+        clave = clave_canonica(nombre)
+        with self._lock:
+            if clave in self._abandonados:
+                return True
+            fallo = self._fallos.setdefault(clave, {'nombre': nombre, 'intentos': 0, 'motivos': []})
+            fallo['intentos'] += 1
+            fallo['motivos'].append(motivo)
+            if fallo['intentos'] >= self.intentos_max:
+                del self._fallos[clave]
+                fallo.pop('proximo', None)
+                self._abandonados[clave] = fallo
+                logger.warning("🚫 %s se abandona tras %s intentos (%s)", nombre, fallo['intentos'],
+                               ", ".join(fallo['motivos']))
+                return True
+            espera = min(self.espera_max, self.espera_base * 2 ** (fallo['intentos'] - 1))
+            fallo['proximo'] = self.reloj() + espera
+        logger.info("🔁 %s: intento %s/%s falló (%s); se reintenta en el repaso (en %.0fs o más)",
+                    nombre, fallo['intentos'], self.intentos_max, motivo, espera)
+        return False
+
+    def registrar_exito(self, nombre: str):
+        with self._lock:
+            self._fallos.pop(clave_canonica(nombre), None)
+
+    def puede_intentar(self, nombre: str) -> bool:
+        """False si está abandonada, o si falló y aún no toca (pase principal o en espera)"""
+        clave = clave_canonica(nombre)
+        with self._lock:
+            if clave in self._abandonados:
+                return False
+            fallo = self._fallos.get(clave)
+        if fallo is None:
+            return True
+        return self.repasos > 0 and self.reloj() >= fallo['proximo']
+
+    def __contains__(self, nombre: str) -> bool:
+        """`nombre in reintentos`: la persona está abandonada (para excluirla como a procesados)"""
+        return clave_canonica(nombre) in self._abandonados
+
+    @property
+    def pendientes(self) -> int:
+        """Personas con fallas que todavía se van a reintentar"""
+        return len(self._fallos)
+
+    def iniciar_repaso(self) -> Optional[float]:
+        """
+        Fin de un pase: si quedan reintentos (y repasos disponibles), empieza
+        otro repaso
+
+        Returns:
+            Segundos a esperar hasta que toque el primero, o None si no hay repaso
+        """
+        if not self._fallos or self.repasos >= self.intentos_max:
+            return None
+        self.repasos += 1
+        with self._lock:
+            primero = min(fallo['proximo'] for fallo in self._fallos.values())
+        return max(0.0, primero - self.reloj())
+
+    def abandonados(self) -> List[Dict]:
+        """Copia para el checkpoint: [{'nombre', 'intentos', 'motivos'}]"""
+        with self._lock:
+            return [{'nombre': a['nombre'], 'intentos': a['intentos'], 'motivos': list(a['motivos'])}
+                    for a in self._abandonados.values()]
@@ -0,0 +1,185 @@
+"""
+Scroll calibrado de la lista de personas
+Mide cuánto se movieron las filas entre dumps consecutivos (usando los bounds
+de los nombres) y ajusta distancia/duración del swipe para avanzar una página.
+También lleva la posición en la lista para regresar a ella después de un reset
+"""
+
+import logging
+from statistics import median
+from typing import List, Optional, Tuple
+
+from config import (
+    SCROLL_X, SCROLL_Y_INICIO, SCROLL_Y_FIN, SCROLL_DURACION,
+    SCROLL_FILAS_SOLAPE, SCROLL_DISTANCIA_MIN, SCROLL_Y_MIN,
+    SCROLL_DURACION_FLING, PAGINAS_POR_FLING
+)
+
+logger = logging.getLogger(__name__)
+
+# Fila de la lista: (nombre, y_arriba, y_abajo)
+Fila = Tuple[str, int, int]
+
+
+class CalibradorScroll:
+    """
+    Ajusta el swipe para que cada scroll avance exactamente una página
+
+    Flujo:
+    1. registrar_antes(filas) justo antes de hacer swipe
+    2. comando() devuelve el swipe actual
+    3. medir(filas) con el siguiente dump: calcula desplazamiento real y solape
+    """
+
+    def __init__(self, x: int = SCROLL_X, y_inicio: int = SCROLL_Y_INICIO,
+                 y_fin: int = SCROLL_Y_FIN, duracion: int = SCROLL_DURACION,
+                 filas_solape: int = SCROLL_FILAS_SOLAPE):
+        self.x = x
+        self.y_inicio = y_inicio
+        self.distancia = y_inicio - y_fin
+        self.filas_solape = filas_solape
+
+        # Velocidad del dedo constante (ms por px) para que el swipe no se vuelva "fling"
+        self.ms_por_px = duracion / self.distancia
+
+        # px que se mueve la lista por cada px de swipe (se aprende midiendo)
+        self.factor: Optional[float] = None
+
+        self.total_scrolls = 0
+        self.historial_solape: List[float] = []
+        self._antes: Optional[List[Fila]] = None
+
+    @property
+    def duracion(self) -> int:
+        return max(100, int(self.distancia * self.ms_por_px))
+
+    def comando(self) -> str:
+        """Comando ADB (sin el prefijo 'adb') del swipe calibrado actual"""
+        y_fin = self.y_inicio - self.distancia
+        return f"shell input swipe {self.x} {self.y_inicio} {self.x} {y_fin} {self.duracion}"
+
+    def comando_fling(self) -> str:
+        """Swipe rápido (la lista sigue de largo): para regresar a una página lejana"""
+        y_fin = self.y_inicio - self.distancia
+        return f"shell input swipe {self.x} {self.y_inicio} {self.x} {y_fin} {SCROLL_DURACION_FLING}"
+
+    def descartar_medicion(self):
+        """La lista se reinició entre swipe y dump: la medición pendiente ya no sirve"""
+        self._antes = None
+
+    def registrar_antes(self, filas: List[Fila]):
+        """Guarda la geometría de la página visible antes del swipe"""
+        self._antes = list(filas) if filas else None
+        self.total_scrolls += 1
+
+    def objetivo_px(self, filas: List[Fila]) -> Optional[int]:
+        """
+        Desplazamiento ideal: la fila (n - SOLAPE) de esta página queda
+        donde está hoy la primera fila
+        """
+        if len(filas) <= self.filas_solape:
+            return None
+        return filas[len(filas) - self.filas_solape][1] - filas[0][1]
+
+    def medir(self, filas: List[Fila]) -> Optional[float]:
+        """
+        Compara la página actual con la anterior al swipe y recalibra
+
+        Returns:
+            Proporción de solape lograda (filas repetidas / filas anteriores),
+            o None si no había medición pendiente
+        """
+        antes, self._antes = self._antes, None
+        if not antes or not filas:
+            return None
+
+        posiciones_antes = {nombre: y1 for nombre, y1, _ in antes}
+        desplazamientos = [posiciones_antes[nombre] - y1
+                           for nombre, y1, _ in filas if nombre in posiciones_antes]
+        solape = len(desplazamientos) / len(antes)
+        self.historial_solape.append(solape)
+
+        objetivo = self.objetivo_px(antes)
+        ideal = self.filas_solape / len(antes)
+
+        if not desplazamientos:
+            # Ninguna fila en común: nos saltamos personas, acortar el swipe
+            self.distancia = max(SCROLL_DISTANCIA_MIN, int(self.distancia * 0.75))
+            logger.warning("📏 Scroll sin solape (posibles filas saltadas). Reduciendo swipe a %spx",
+                           self.distancia)
+            return solape
+
+        desplazado = median(desplazamientos)
+
+        # Fin de la lista: la última fila no cambió, la medición no sirve para calibrar
+        if filas[-1][0] == antes[-1][0] or desplazado <= 0 or objetivo is None:
+            logger.info("📏 Solape de scroll: %.0f%% (fin de lista o sin referencia)", solape * 100)
+            return solape
+
+        medido = desplazado / self.distancia
+        self.factor = medido if self.factor is None else (self.factor + medido) / 2
+
+        distancia_max = self.y_inicio - SCROLL_Y_MIN
+        self.distancia = int(min(distancia_max, max(SCROLL_DISTANCIA_MIN, objetivo / self.factor)))
+
+        logger.info("📏 Solape de scroll: %.0f%% (ideal %.0f%%) - movió %.0fpx, objetivo %spx -> "
+                    "swipe %spx / %sms", solape * 100, ideal * 100, desplazado, objetivo,
+                    self.distancia, self.duracion)
+        return solape
+
+    def solape_promedio(self) -> Optional[float]:
+        if not self.historial_solape:
+            return None
+        return sum(self.historial_solape) / len(self.historial_solape)
+
+
+class PosicionLista:
+    """
+    Profundidad de scroll en la lista filtrada: página actual + huella
+    (nombres visibles) para poder regresar a ella después de un reset
+    """
+
+    def __init__(self):
+        self.pagina = 0
+        self.huella: List[str] = []
+        self.paginas_por_fling = PAGINAS_POR_FLING
+
+    def actualizar(self, filas: List[Fila]):
+        """Registra los nombres visibles en la página actual"""
+        if filas:
+            self.huella = [nombre for nombre, _, _ in filas]
+
+    def avanzar(self):
+        self.pagina += 1
+
+    def reiniciar(self):
+        """La lista volvió arriba (Inicio + filtros)"""
+        self.pagina = 0
+        self.huella = []
+
+    def coincide(self, filas: List[Fila]) -> bool:
+        """
+        True si la página visible es la de la huella. Se exigen más coincidencias
+        que las filas de solape para no confundirla con la página anterior
+        """
+        if not self.huella:
+            return False
+        visibles = {nombre for nombre, _, _ in filas}
+        comunes = len(visibles.intersection(self.huella))
+        return comunes >= min(len(self.huella), SCROLL_FILAS_SOLAPE + 1)
+
+    def flings_necesarios(self, desde: int = 0) -> int:
+        """
+        Flings a ciegas sin pasarse (se deja al menos una página para verificar)
+
+        Args:
+            desde: Página en la que está la lista ahora (0 = arriba, tras un reset)
+        """
+        return max(0, int((self.pagina - desde - 1) / self.paginas_por_fling))
+
+    def ajustar_fling(self, flings: int, pasos: int, desde: int = 0):
+        """Aprende cuántas páginas avanza un fling a partir de una restauración exitosa"""
+        if flings > 0:
+            medido = (self.pagina - desde - pasos) / flings
+            if medido > 0:
+                self.paginas_por_fling = (self.paginas_por_fling + medido) / 2
@@ -5,13 +5,18 @@ Incluye: sanitización de nombres, cálculo de coordenadas, manejo de ADB
 
 import os
 import re
+import subprocess
 import time
-import unicodedata
 import xml.etree.ElementTree as ET
 from typing import Optional, List, Tuple
 import logging
 from pathlib import Path
 
+import config
+import metricas
+from curp import buscar_curps, curp_de_arbol, curp_valido, curps_en_archivo
+from identidad import clave_canonica
+
 logger = logging.getLogger(__name__)
 
 # === RUTA BASE DEL PROYECTO ===
@@ -22,7 +27,7 @@ ADB_PATH = PROJECT_ROOT / "adb.exe"
 
 # Verificar que adb.exe existe
 if not ADB_PATH.exists():
-    logger.warning(f"⚠️  adb.exe no encontrado en: {ADB_PATH}")
+    logger.warning("⚠️  adb.exe no encontrado en: %s", ADB_PATH)
     logger.warning("   Usando 'adb' del PATH del sistema")
     ADB_CMD = "adb"
 else:
@@ -32,27 +37,11 @@ else:
 def sanitize_name(name: str) -> str:
     """
     Limpia el nombre para que sea un archivo válido en Windows
-    - Quita acentos y caracteres especiales
-    - Convierte ñ a n
-    - Reemplaza espacios por guiones bajos
-    - Todo en mayúsculas
+    (Delegada a identidad.clave_canonica, la normalización única del proyecto)
     
     Ejemplo: "JOSÉ MARÍA LÓPEZ" -> "JOSE_MARIA_LOPEZ"
     """
-    # Normalizar unicode para quitar acentos
-    nfkd = unicodedata.normalize('NFKD', name)
-    name_sin_acentos = ''.join([c for c in nfkd if not unicodedata.combining(c)])
-    
-    # Reemplazar ñ por n
-    name_sin_acentos = name_sin_acentos.replace('Ñ', 'N').replace('ñ', 'n')
-    
-    # Eliminar caracteres especiales (solo dejar letras, números, espacios y guiones)
-    name_limpio = re.sub(r'[^\w\s-]', '', name_sin_acentos).strip().upper()
-    
-    # Reemplazar múltiples espacios/guiones por uno solo
-    name_limpio = re.sub(r'[-\s]+', '_', name_limpio)
-    
-    return name_limpio
+    return clave_canonica(name)
 
 
 def calculate_center(bounds_str: str) -> Optional[str]:
@@ -81,10 +70,10 @@ def calculate_center(bounds_str: str) -> Optional[str]:
             
             return f"{center_x} {center_y}"
         else:
-            logger.warning(f"Formato de bounds inválido: {bounds_str}")
+            logger.warning("Formato de bounds inválido: %s", bounds_str)
             return None
     except Exception as e:
-        logger.error(f"Error al calcular centro de bounds '{bounds_str}': {e}")
+        logger.error("Error al calcular centro de bounds '%s': %s", bounds_str, e)
         return None
 
 
@@ -108,17 +97,49 @@ def safe_adb_command(cmd: str, max_retries: int = 3) -> bool:
             if result == 0:
                 return True
             
-            logger.warning(f"Intento {attempt + 1}/{max_retries} falló para: {full_cmd}")
+            logger.warning("Intento %s/%s falló para: %s", attempt + 1, max_retries, full_cmd)
             time.sleep(2)  # Esperar antes de reintentar
             
         except Exception as e:
-            logger.error(f"Error en intento {attempt + 1}: {e}")
+            logger.error("Error en intento %s: %s", attempt + 1, e)
             time.sleep(2)
     
-    logger.error(f"Comando ADB falló después de {max_retries} intentos: {full_cmd}")
+    logger.error("Comando ADB falló después de %s intentos: %s", max_retries, full_cmd)
     return False
 
 
+def adb_output(cmd: str, timeout: float = 10) -> Optional[str]:
+    """
+    Ejecuta un comando ADB y devuelve su salida estándar
+    
+    Args:
+        cmd: Comando ADB a ejecutar (sin el prefijo 'adb')
+        timeout: Segundos máximos de espera
+    
+    Returns:
+        Salida del comando (sin espacios al final) o None si falló
+    """
+    try:
+        result = subprocess.run(f'"{ADB_CMD}" {cmd}', shell=True, capture_output=True,
+                                text=True, encoding='utf-8', errors='replace', timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning("Comando ADB sin respuesta (%s): %s", cmd, e)
+        return None
+    if result.returncode != 0:
+        logger.warning("Comando ADB falló (%s): %s", cmd, result.stderr.strip())
+        return None
+    return result.stdout.rstrip()
+
+
+def adb_input(cmd: str) -> bool:
+    """
+    Como safe_adb_command, para comandos 'shell input ...' (tap, swipe, keyevent)
+    Van por el inyector de INPUT_BACKEND (ver entrada.py) en vez de un proceso por comando
+    """
+    import entrada  # entrada.py importa este módulo (ADB_CMD, safe_adb_command)
+    return entrada.enviar_input(cmd.replace("shell input ", "", 1))
+
+
 def adb_tap(coordenadas: str, delay: float = 1.5) -> bool:
     """
     Ejecuta un tap en las coordenadas especificadas y espera
@@ -131,7 +152,7 @@ def adb_tap(coordenadas: str, delay: float = 1.5) -> bool:
         True si el tap se ejecutó exitosamente
     """
     cmd = f"shell input tap {coordenadas}"
-    success = safe_adb_command(cmd)
+    success = adb_input(cmd)
     
     if success:
         time.sleep(delay)
@@ -139,6 +160,56 @@ def adb_tap(coordenadas: str, delay: float = 1.5) -> bool:
     return success
 
 
+def parse_bounds(bounds_str: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Convierte bounds '[x1,y1][x2,y2]' a la tupla (x1, y1, x2, y2)
+    
+    Returns:
+        Tupla de enteros o None si el formato es inválido
+    """
+    match = re.findall(r'\[(\d+),(\d+)\]', bounds_str or "")
+    if len(match) != 2:
+        return None
+    return (int(match[0][0]), int(match[0][1]), int(match[1][0]), int(match[1][1]))
+
+
+def es_texto_nombre(text: str) -> bool:
+    """
+    Filtro de nombres de persona en la lista: texto en mayúsculas,
+    largo (>15 chars), con espacios y que no sea un texto del sistema
+    """
+    if not (text and text.isupper() and len(text) >= 15 and ' ' in text):
+        return False
+    return not any(keyword in text for keyword in ["Status", "HISTORIAL", "VISITA", "Registros", "Padron", "encontrados"])
+
+
+def obtener_filas_nombres(xml_path: str) -> List[Tuple[str, int, int]]:
+    """
+    Extrae la geometría de las filas de la lista (para calibrar el scroll)
+    
+    Args:
+        xml_path: Ruta al archivo XML de la pantalla
+    
+    Returns:
+        Lista de tuplas (nombre, y_arriba, y_abajo) ordenada de arriba hacia abajo
+    """
+    try:
+        root = ET.parse(xml_path).getroot()
+    except Exception as e:
+        logger.error("Error al parsear XML '%s': %s", xml_path, e)
+        return []
+    
+    filas = []
+    for node in root.findall(".//node[@class='android.widget.TextView']"):
+        text = node.get("text", "").strip()
+        if es_texto_nombre(text):
+            bounds = parse_bounds(node.get("bounds"))
+            if bounds:
+                filas.append((text, bounds[1], bounds[3]))
+    
+    return sorted(filas, key=lambda fila: fila[1])
+
+
 def get_people_with_buttons(xml_path: str) -> List[Tuple[str, str]]:
     """
     Extrae nombres de personas y coordenadas de sus botones 'Visitar' desde el XML
@@ -166,13 +237,11 @@ def get_people_with_buttons(xml_path: str) -> List[Tuple[str, str]]:
         for node in root.findall(".//node[@class='android.widget.TextView']"):
             text = node.get("text", "").strip()
             
-            # Filtro: texto en mayúsculas, largo (>15 chars), con espacios
-            if text and text.isupper() and len(text) >= 15 and ' ' in text:
-                # Excluir textos del sistema
-                if not any(keyword in text for keyword in ["Status", "HISTORIAL", "VISITA", "Registros", "Padron", "encontrados"]):
-                    nombres_encontrados.append((text, node))
+            # Filtro: texto en mayúsculas, largo (>15 chars), con espacios (excluye textos del sistema)
+            if es_texto_nombre(text):
+                nombres_encontrados.append((text, node))
         
-        logger.info(f"Nombres potenciales encontrados: {len(nombres_encontrados)}")
+        logger.debug("Nombres potenciales encontrados: %s", len(nombres_encontrados))
         
         # Ahora buscar botones "Visitar" clickables
         botones_visitar = []
@@ -187,7 +256,7 @@ def get_people_with_buttons(xml_path: str) -> List[Tuple[str, str]]:
                             botones_visitar.append((coords, node))
                             break
         
-        logger.info(f"Botones 'Visitar' encontrados: {len(botones_visitar)}")
+        logger.debug("Botones 'Visitar' encontrados: %s", len(botones_visitar))
         
         # Emparejar nombres con botones (asumiendo que están en el mismo orden)
         min_length = min(len(nombres_encontrados), len(botones_visitar))
@@ -196,19 +265,20 @@ def get_people_with_buttons(xml_path: str) -> List[Tuple[str, str]]:
             nombre = nombres_encontrados[i][0]
             coords = botones_visitar[i][0]
             people_buttons.append((nombre, coords))
-            logger.info(f"✓ Emparejado: {nombre} -> {coords}")
+            logger.debug("✓ Emparejado: %s -> %s", nombre, coords)
         
-        logger.info(f"Total emparejado: {len(people_buttons)} personas con botones")
+        logger.info("Total emparejado: %s personas con botones", len(people_buttons))
         return people_buttons
         
     except Exception as e:
-        logger.error(f"Error al parsear XML '{xml_path}': {e}", exc_info=True)
+        logger.error("Error al parsear XML '%s': %s", xml_path, e, exc_info=True)
         return []
 
 
 def dump_screen_xml(output_path: str = "screen.xml") -> bool:
     """
     Captura el XML de la pantalla actual usando uiautomator dump
+    (o el servidor residente si JERARQUIA_BACKEND = 'servidor', ver jerarquia.py)
     
     Args:
         output_path: Ruta local donde guardar el XML
@@ -216,26 +286,56 @@ def dump_screen_xml(output_path: str = "screen.xml") -> bool:
     Returns:
         True si se capturó exitosamente
     """
-    # Dump a la tablet
-    if not safe_adb_command("shell uiautomator dump /sdcard/screen.xml"):
-        return False
+    if config.JERARQUIA_BACKEND == 'servidor':
+        import jerarquia  # jerarquia.py importa este módulo (ADB_CMD, safe_adb_command)
+        with metricas.medir('dump_servidor'):
+            if jerarquia.guardar_jerarquia(output_path):
+                return True
     
-    # Pull a la PC
-    if not safe_adb_command(f"pull /sdcard/screen.xml {output_path}"):
-        return False
+    with metricas.medir('dump'):
+        # Dump a la tablet
+        if not safe_adb_command("shell uiautomator dump /sdcard/screen.xml"):
+            return False
+        
+        # Pull a la PC
+        if not safe_adb_command(f"pull /sdcard/screen.xml {output_path}"):
+            return False
     
     # Verificar que el archivo existe y no está vacío
     if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-        logger.error(f"XML descargado está vacío o no existe: {output_path}")
+        logger.error("XML descargado está vacío o no existe: %s", output_path)
         return False
     
     return True
 
 
+def _resolver_curp(candidatos: List[str], leer_raiz, origen: str) -> Optional[str]:
+    """Un solo candidato en los bytes: ese es. Si no, la etiqueta "CURP" del árbol"""
+    if len(candidatos) == 1:
+        logger.info("✓ CURP extraído: %s", candidatos[0])
+        return candidatos[0]
+    
+    # Ambiguo: búsqueda estructurada (EditText con etiqueta "CURP")
+    curp = curp_de_arbol(leer_raiz())
+    if curp:
+        if curp_valido(curp):
+            logger.info("✓ CURP extraído (etiqueta): %s", curp)
+        else:
+            logger.warning("⚠️  CURP extraído sin verificar (fecha/dígito no cuadran): %s", curp)
+        return curp
+    
+    logger.warning("No se encontró CURP en el XML: %s", origen)
+    return None
+
+
 def extraer_curp_de_xml(xml_path: str) -> Optional[str]:
     """
     Extrae el CURP del XML descargado
     
+    Primero busca en los bytes crudos (curp.curps_en_archivo): si hay
+    exactamente un CURP con fecha y dígito verificador correctos, ese es.
+    Si no hay ninguno o hay varios, parsea el XML y usa la etiqueta "CURP"
+    
     Args:
         xml_path: Ruta al archivo XML
     
@@ -243,43 +343,27 @@ def extraer_curp_de_xml(xml_path: str) -> Optional[str]:
         String con el CURP o None si no se encuentra
     """
     try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-        
-        # Buscar el nodo EditText que tiene el label "CURP"
-        # En la estructura: primero hay un TextView con text="CURP", 
-        # luego un EditText con el valor del CURP
-        
-        for node in root.findall(".//node[@class='android.widget.EditText']"):
-            # Buscar si este EditText tiene un hijo TextView con text="CURP"
-            for child in node.findall(".//node[@class='android.widget.TextView']"):
-                if child.get("text", "").strip() == "CURP":
-                    # El CURP está en el atributo text del EditText padre
-                    curp = node.get("text", "").strip()
-                    if curp and curp != "null" and len(curp) == 18:
-                        logger.info(f"✓ CURP extraído: {curp}")
-                        return curp
-        
-        # Método alternativo: buscar cualquier texto que parezca un CURP
-        # CURP tiene 18 caracteres: 4 letras + 6 dígitos + 6 letras/dígitos + 2 dígitos
-        curp_pattern = r'[A-Z]{4}\d{6}[A-Z0-9]{6}\d{2}'
-        
-        for node in root.findall(".//node"):
-            text = node.get("text", "")
-            match = re.search(curp_pattern, text)
-            if match:
-                curp = match.group(0)
-                logger.info(f"✓ CURP extraído (patrón): {curp}")
-                return curp
-        
-        logger.warning(f"No se encontró CURP en el XML: {xml_path}")
-        return None
-        
+        return _resolver_curp(curps_en_archivo(xml_path),
+                              lambda: ET.parse(xml_path).getroot(), xml_path)
     except Exception as e:
-        logger.error(f"Error al extraer CURP de '{xml_path}': {e}")
+        logger.error("Error al extraer CURP de '%s': %s", xml_path, e)
         return None
 
 
+def extraer_curp_de_bytes(datos: bytes, origen: str = "dump") -> Optional[str]:
+    """
+    Igual que extraer_curp_de_xml, sobre el dump ya leído a memoria
+    
+    A diferencia de extraer_curp_de_xml, un XML corrupto no se toma como
+    "sin CURP": lanza ET.ParseError para que la persona se vuelva a intentar
+    
+    Args:
+        datos: Contenido del XML
+        origen: Para los mensajes del log (nombre de la persona)
+    """
+    return _resolver_curp(buscar_curps(datos), lambda: ET.fromstring(datos), origen)
+
+
 def verificar_xml_tiene_curp(xml_path: str) -> bool:
     """
     Verifica si el XML descargado contiene un CURP válido
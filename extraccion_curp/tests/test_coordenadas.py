@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la calibración de coordenadas (coordenadas.py)
+Prueba: búsqueda por texto y resource-id, cache por dispositivo, respaldo a
+config.py e invalidación
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+import config
+from coordenadas import CoordenadasCalibradas, localizar_controles
+
+XML_PANTALLA = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    '<hierarchy rotation="0">'
+    '<node class="android.view.View" clickable="true" bounds="[100,200][300,260]">'
+    '<node class="android.widget.TextView" text="Iniciar visita" clickable="false" bounds="[120,210][280,250]" />'
+    '</node>'
+    '<node class="android.widget.Button" resource-id="mx.app:id/btn_next" text="" '
+    'clickable="true" bounds="[500,900][700,1000]" />'
+    '</hierarchy>'
+)
+
+SELECTORES = {
+    'BTN_INICIAR_VISITA': {'textos': ['Iniciar Visita']},
+    'BTN_SIGUIENTE': {'resource_id': 'btn_next'},
+    'BTN_FILTRO': {'textos': ['Filtro']},
+}
+
+
+def test_localizar_controles():
+    """El texto en un TextView hijo da el centro del contenedor clickable"""
+    print("="*60)
+    print("TEST: localizar_controles()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "pantalla.xml"
+        ruta.write_text(XML_PANTALLA, encoding='utf-8')
+        encontrados = localizar_controles(str(ruta), SELECTORES)
+
+    print(f"   {encontrados}")
+    assert encontrados == {'BTN_INICIAR_VISITA': "200 230", 'BTN_SIGUIENTE': "600 950"}
+
+
+def test_cache_por_dispositivo():
+    """Calibrado una vez, guardado en disco; lo que no aparece usa config.py"""
+    with tempfile.TemporaryDirectory() as tmp:
+        xml = Path(tmp) / "pantalla.xml"
+        xml.write_text(XML_PANTALLA, encoding='utf-8')
+        cache = str(Path(tmp) / "cache.json")
+
+        calibradas = CoordenadasCalibradas(cache, SELECTORES, dispositivo="SM-T295 800x1280")
+        assert calibradas.calibrar('BTN_SIGUIENTE', str(xml))['origen'] == 'dump'
+        filtro = calibradas.calibrar('BTN_FILTRO', str(xml))
+        assert filtro == {**filtro, 'coordenadas': config.BTN_FILTRO, 'origen': 'config'}
+
+        # Otra ejecución, mismo dispositivo: sin dumps
+        otra = CoordenadasCalibradas(cache, SELECTORES, dispositivo="SM-T295 800x1280")
+        assert otra.obtener('BTN_SIGUIENTE') == "600 950"
+        assert otra.calibraciones == 0
+
+        otra.invalidar(['BTN_SIGUIENTE'])
+        guardado = json.loads(Path(cache).read_text(encoding='utf-8'))
+        assert set(guardado["SM-T295 800x1280"]) == {'BTN_FILTRO'}
+
+        # Otro dispositivo no comparte coordenadas
+        otro = CoordenadasCalibradas(cache, SELECTORES, dispositivo="SM-X200 1200x1920")
+        assert otro.controles == {}
+
+
+if __name__ == '__main__':
+    test_localizar_controles()
+    test_cache_por_dispositivo()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la extracción rápida de CURP (curp.py) y de extraer_curp_de_xml
+Prueba: dígito verificador, fecha de nacimiento, búsqueda en bytes y respaldo
+estructurado cuando hay varios candidatos
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from curp import buscar_curps, curp_valido, curps_en_archivo, fecha_nacimiento
+from utils import extraer_curp_de_xml
+
+CURP_PERSONA = "HEGG560427MVZRRL04"
+CURP_FAMILIAR = "PEGJ850101HYNRRN06"
+CURP_2000 = "GOMA050315HYNMRRA7"        # Nacido en 2005: letra en el carácter 17
+
+XML_DOS_CURPS = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    '<hierarchy rotation="0">'
+    f'<node class="android.widget.TextView" text="{CURP_FAMILIAR}" />'
+    f'<node class="android.widget.EditText" text="{CURP_PERSONA}">'
+    '<node class="android.widget.TextView" text="CURP" /></node>'
+    '</hierarchy>'
+)
+
+
+def test_curp_valido():
+    """Fecha y dígito verificador"""
+    print("="*60)
+    print("TEST: curp_valido()")
+    print("="*60)
+
+    tests = [
+        (CURP_PERSONA, True),
+        (CURP_FAMILIAR, True),
+        (CURP_2000, True),
+        ("HEGG560427MVZRRL05", False),     # dígito verificador incorrecto
+        ("PEGJ850132HYNRRN00", False),     # día 32
+        ("HEGG56042MVZRRL04", False),      # 17 caracteres
+    ]
+    for curp, esperado in tests:
+        resultado = curp_valido(curp)
+        print(f"{'✅' if resultado == esperado else '❌'} {curp} -> {resultado}")
+        assert resultado == esperado
+
+    # Carácter 17: dígito = antes de 2000, letra = desde 2000
+    assert fecha_nacimiento(CURP_PERSONA).year == 1956
+    assert fecha_nacimiento("GOML000229MDFRPRA0").year == 2000
+    assert fecha_nacimiento(CURP_2000).year == 2005
+
+
+def test_buscar_en_bytes():
+    """Solo textos que son un CURP válido completo, sin repetir"""
+    datos = (f'text="{CURP_PERSONA}" text="{CURP_PERSONA}" '
+             f'text="X{CURP_FAMILIAR}" text="HEGG560427MVZRRL05"').encode()
+    assert buscar_curps(datos) == [CURP_PERSONA]
+    assert buscar_curps(b"") == []
+    assert buscar_curps(f'text="{CURP_2000}"'.encode()) == [CURP_2000]
+
+
+def test_respaldo_estructurado():
+    """Con dos CURP válidos en pantalla se usa el EditText con etiqueta CURP"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "persona.xml"
+        ruta.write_text(XML_DOS_CURPS, encoding='utf-8')
+        vacio = Path(tmp) / "vacio.xml"
+        vacio.write_bytes(b"")
+
+        assert curps_en_archivo(str(ruta)) == [CURP_FAMILIAR, CURP_PERSONA]
+        assert curps_en_archivo(str(vacio)) == []
+        assert extraer_curp_de_xml(str(ruta)) == CURP_PERSONA
+
+        # Un solo CURP: camino rápido
+        ruta.write_text(XML_DOS_CURPS.replace(CURP_FAMILIAR, "SIN DATO"), encoding='utf-8')
+        assert extraer_curp_de_xml(str(ruta)) == CURP_PERSONA
+
+
+if __name__ == '__main__':
+    test_curp_valido()
+    test_buscar_en_bytes()
+    test_respaldo_estructurado()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del inyector de entrada (entrada.py)
+Prueba: detección del touchscreen en `getevent -p`, escalado del tap a
+sendevent, la sesión de shell persistente (con sh local en vez de adb) y
+la métrica de los envíos que caen al respaldo con adb
+"""
+
+import shutil
+import sys
+sys.path.append('.')
+
+import entrada
+import metricas
+from entrada import InyectorEntrada, SesionShell, comando_tap_sendevent, parsear_getevent
+
+GETEVENT = """add device 1: /dev/input/event1
+  name:     "gpio-keys"
+  events:
+    KEY (0001): 0072  0073  0074
+  input props:
+    <none>
+add device 2: /dev/input/event3
+  name:     "sec_touchscreen"
+  events:
+    KEY (0001): 014a
+    ABS (0003): 002f  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+                0030  : value 0, min 0, max 255, fuzz 0, flat 0, resolution 0
+                0035  : value 0, min 0, max 1599, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 2559, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 65535, fuzz 0, flat 0, resolution 0
+  input props:
+    INPUT_PROP_DIRECT
+"""
+
+
+def test_parsear_getevent():
+    """Solo el dispositivo con ejes multitouch; rangos y capacidades"""
+    print("="*60)
+    print("TEST: parsear_getevent()")
+    print("="*60)
+
+    touch = parsear_getevent(GETEVENT)
+    print(f"   {touch}")
+    assert touch['ruta'] == "/dev/input/event3"
+    assert touch['x'] == (0, 1599) and touch['y'] == (0, 2559)
+    assert touch['slot'] and touch['btn_touch']
+    assert touch['presion'] == 0 and touch['tamano'] == 255
+    assert parsear_getevent("add device 1: /dev/input/event1\n  name: \"gpio-keys\"\n") is None
+
+
+def test_tap_sendevent():
+    """Coordenadas de pantalla (800x1280) escaladas a los ejes crudos (1600x2560)"""
+    touch = parsear_getevent(GETEVENT)
+    comando = comando_tap_sendevent(touch, 800, 1280, 400, 640, 7)
+    eventos = [e.split()[2:] for e in comando.split(";")]
+    assert ['3', '57', '7'] in eventos                   # TRACKING_ID
+    assert ['3', '53', '800'] in eventos and ['3', '54', '1280'] in eventos
+    assert eventos.index(['1', '330', '1']) < eventos.index(['3', '57', '-1'])
+    assert eventos[-1] == ['0', '0', '0']
+
+
+def test_sesion_persistente():
+    """Comandos en un mismo proceso, con su código de salida"""
+    if shutil.which("sh") is None:
+        print("   (sin sh, se omite)")
+        return
+    sesion = SesionShell(timeout=5, comando=["sh"])
+    try:
+        assert sesion.abrir()
+        assert sesion.ejecutar("echo hola")
+        assert not sesion.ejecutar("false")
+        assert sesion.ejecutar("X=1") and sesion.ejecutar('test "$X" = 1')    # mismo proceso
+    finally:
+        sesion.cerrar()
+    assert not sesion.abierta and not sesion.ejecutar("true")
+
+
+class SesionCaida:
+    """Sesión que no ejecuta nada y no se puede reabrir"""
+    abierta = False
+
+    def abrir(self):
+        return False
+
+    def ejecutar(self, comando):
+        return False
+
+
+def test_respaldo_cuenta_como_adb():
+    """Un tap que la sesión no pudo enviar se mide como adb, no como sendevent"""
+    enviados = []
+    original = entrada.safe_adb_command
+    entrada.safe_adb_command = lambda comando: enviados.append(comando) or True
+    metricas.reiniciar()
+    try:
+        inyector = InyectorEntrada('sendevent')
+        inyector._preparado = True
+        inyector.sesion = SesionCaida()
+        assert inyector.enviar("tap 100 200")
+    finally:
+        entrada.safe_adb_command = original
+    resumen = metricas.resumen()
+    print(f"   {sorted(resumen)}")
+    assert enviados == ["shell input tap 100 200"]
+    assert resumen['input_adb_tap']['veces'] == 1
+    assert resumen['input_sendevent_tap_fallido']['veces'] == 1
+    assert 'input_sendevent_tap' not in resumen
+    metricas.reiniciar()
+
+
+if __name__ == '__main__':
+    test_parsear_getevent()
+    test_tap_sendevent()
+    test_sesion_persistente()
+    test_respaldo_cuenta_como_adb()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la captura de campos de la ficha (ficha.py)
+Prueba: etiqueta por TextView hijo o hint, campos vacíos, claves repetidas y
+la unión de la ficha con la pantalla del CURP
+"""
+
+import sys
+sys.path.append('.')
+
+from ficha import campos_de_xml, normalizar_etiqueta, unir_campos
+
+XML_FICHA = (
+    '<hierarchy>'
+    '<node class="android.widget.EditText" text="27/04/1956">'
+    '<node class="android.widget.TextView" text="Fecha de nacimiento" /></node>'
+    '<node class="android.widget.EditText" text="Mujer" hint="Sexo" />'
+    '<node class="android.widget.EditText" text="Teléfono">'
+    '<node class="android.widget.TextView" text="Teléfono" /></node>'
+    '<node class="android.widget.EditText" text="2281234567">'
+    '<node class="android.widget.TextView" text="Teléfono" /></node>'
+    '<node class="android.widget.EditText" text="2289876543">'
+    '<node class="android.widget.TextView" text="Teléfono" /></node>'
+    '</hierarchy>'
+).encode('utf-8')
+
+XML_CURP = (
+    '<hierarchy>'
+    '<node class="android.widget.EditText" text="HEGG560427MVZRRL04">'
+    '<node class="android.widget.TextView" text="CURP" /></node>'
+    '<node class="android.widget.EditText" text="null">'
+    '<node class="android.widget.TextView" text="Sexo" /></node>'
+    '</hierarchy>'
+).encode('utf-8')
+
+
+def test_campos_de_xml():
+    print("="*60)
+    print("TEST: campos_de_xml()")
+    print("="*60)
+
+    campos = campos_de_xml(XML_FICHA)
+    print(f"   {campos}")
+    assert campos == {
+        'fecha_de_nacimiento': "27/04/1956",
+        'sexo': "Mujer",
+        'telefono': "2281234567",          # El primero solo mostraba la etiqueta
+        'telefono_2': "2289876543",
+    }
+    assert campos_de_xml(b"") == {} and campos_de_xml(b"<hierarchy><node") == {}
+    assert normalizar_etiqueta("Teléfono (celular):") == "telefono_celular"
+
+
+def test_unir_campos():
+    """La pantalla del CURP agrega campos; un valor vacío no borra el de la ficha"""
+    campos = unir_campos(campos_de_xml(XML_FICHA), campos_de_xml(XML_CURP))
+    assert campos['curp'] == "HEGG560427MVZRRL04"
+    assert campos['sexo'] == "Mujer"
+
+
+if __name__ == '__main__':
+    test_campos_de_xml()
+    test_unir_campos()
+    print("✅ TODAS LAS PRUEBAS PASARON")
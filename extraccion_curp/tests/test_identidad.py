@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice de identidad (identidad.py)
+Prueba: clave_canonica, pertenencia O(1) y reporte de colisiones
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from identidad import IndiceIdentidad, clave_canonica
+
+
+def test_clave_canonica():
+    """Variantes de escritura de un mismo nombre dan la misma clave"""
+    print("="*60)
+    print("TEST: clave_canonica()")
+    print("="*60)
+
+    tests = [
+        ("JOSÉ MARÍA LÓPEZ", "JOSE_MARIA_LOPEZ"),
+        ("JOSE  MARIA LOPEZ", "JOSE_MARIA_LOPEZ"),
+        ("JUAN-CARLOS GARCÍA", "JUAN_CARLOS_GARCIA"),
+        ("  PEÑA NIETO ", "PENA_NIETO"),
+    ]
+
+    failed = 0
+    for input_name, expected in tests:
+        result = clave_canonica(input_name)
+        status = "✅" if result == expected else "❌"
+        if result != expected:
+            failed += 1
+        print(f"{status} '{input_name}' -> '{result}'")
+
+    assert failed == 0
+
+
+def test_indice_checkpoint_y_archivos():
+    """El índice une checkpoint y carpeta, y reporta colisiones"""
+    print("="*60)
+    print("TEST: IndiceIdentidad.construir()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp) / "json"
+        carpeta.mkdir()
+        checkpoint = Path(tmp) / "progreso.json"
+        checkpoint.write_text(json.dumps({'procesados': ["JOSÉ PÉREZ", "ANA LUISA RUIZ"]}), encoding='utf-8')
+
+        # Archivo escrito por el bot (nombre canónico)
+        (carpeta / "JOSE_PEREZ.json").write_text(json.dumps({'nombre': "JOSE PEREZ", 'curp': None}), encoding='utf-8')
+        # Archivo escrito por una herramienta antigua (otro sanitizador)
+        (carpeta / "JUANCARLOS_SOTO.json").write_text(json.dumps({'nombre': "JUAN-CARLOS SOTO"}), encoding='utf-8')
+
+        indice = IndiceIdentidad.construir(str(checkpoint), str(carpeta))
+        reporte = indice.reporte_reconciliacion()
+
+        print(f"   Total: {len(indice)}  Colisiones: {len(reporte['colisiones'])}")
+
+        assert len(indice) == 3
+        assert "JOSE PEREZ" in indice and "JOSÉ  PÉREZ" in indice
+        assert indice.tiene_archivo("JOSÉ PÉREZ")
+        assert not indice.tiene_archivo("ANA LUISA RUIZ")
+        assert reporte['solo_checkpoint'] == ["ANA LUISA RUIZ"]
+        assert reporte['solo_archivo'] == ["JUAN-CARLOS SOTO"]
+
+        tipos = sorted(c['tipo'] for c in reporte['colisiones'])
+        assert tipos == ['archivo_no_canonico', 'misma_clave']
+
+        indice.add("MARIO  DIAZ")
+        assert "MARIO DIAZ" in indice and len(indice) == 4
+
+
+def main():
+    """Ejecuta todas las pruebas"""
+    try:
+        test_clave_canonica()
+        test_indice_checkpoint_y_archivos()
+    except AssertionError:
+        print("❌ ALGUNAS PRUEBAS FALLARON")
+        return 1
+
+    print("✅ TODAS LAS PRUEBAS PASARON")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del backend de jerarquía residente (jerarquia.py)
+Prueba: cliente JSON-RPC contra un servidor local que imita al de
+uiautomator2, poda de nodos y que los parsers leen el XML guardado
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+sys.path.append('.')
+
+from jerarquia import ClienteJerarquia, ErrorServidorUI, JerarquiaResidente, podar
+from utils import get_people_with_buttons
+
+XML_LISTA = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    '<hierarchy rotation="0">'
+    '<node class="android.widget.FrameLayout" clickable="false" bounds="[0,0][800,1280]">'
+    '<node class="android.widget.ImageView" clickable="false" bounds="[0,0][80,80]" />'
+    '<node class="android.view.View" clickable="false" bounds="[0,300][800,400]">'
+    '<node class="android.widget.TextView" text="HERNANDEZ GARCIA GUADALUPE" bounds="[20,310][500,350]" />'
+    '<node class="android.view.View" clickable="true" bounds="[600,310][780,370]">'
+    '<node class="android.widget.TextView" text="Visitar" bounds="[620,320][760,360]" />'
+    '</node></node></node></hierarchy>'
+)
+
+
+class ServidorFalso(BaseHTTPRequestHandler):
+    """Imita /jsonrpc/0 del servidor de uiautomator2"""
+
+    def do_POST(self):
+        peticion = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if peticion['method'] == 'ping':
+            respuesta = {'result': 'pong'}
+        elif peticion['method'] == 'dumpWindowHierarchy':
+            respuesta = {'result': XML_LISTA}
+        else:
+            respuesta = {'error': {'code': -32601, 'message': 'Method not found'}}
+        cuerpo = json.dumps({'jsonrpc': '2.0', 'id': peticion['id'], **respuesta}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def servidor_local():
+    servidor = HTTPServer(('127.0.0.1', 0), ServidorFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/jsonrpc/0"
+
+
+def test_cliente_jsonrpc():
+    """ping, jerarquía y errores JSON-RPC"""
+    print("="*60)
+    print("TEST: ClienteJerarquia")
+    print("="*60)
+
+    servidor, url = servidor_local()
+    try:
+        cliente = ClienteJerarquia(url, timeout=5)
+        assert cliente.activo()
+        assert cliente.jerarquia() == XML_LISTA
+        try:
+            cliente.llamar('noExiste')
+            assert False, "debió fallar"
+        except ErrorServidorUI as e:
+            print(f"   error esperado: {e}")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    assert not ClienteJerarquia(url, timeout=1).activo()
+
+
+def test_guardar_para_parsers():
+    """El XML podado se guarda donde lo esperan los parsers y da lo mismo"""
+    servidor, url = servidor_local()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            residente = JerarquiaResidente(ClienteJerarquia(url, timeout=5), podar_nodos=True)
+            residente.disponible = True         # Sin adb forward
+            ruta = Path(tmp) / "screen.xml"
+            assert residente.guardar(str(ruta))
+
+            texto = ruta.read_text(encoding='utf-8')
+            assert "ImageView" not in texto and "FrameLayout" in texto
+            assert get_people_with_buttons(str(ruta)) == [("HERNANDEZ GARCIA GUADALUPE", "690 340")]
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_podar_conserva_ancestros():
+    podado = podar(XML_LISTA).decode('utf-8')
+    assert podado.count('<node') == 5
+
+
+if __name__ == '__main__':
+    test_cliente_jsonrpc()
+    test_guardar_para_parsers()
+    test_podar_conserva_ancestros()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la navegación por estados (navegacion.py)
+Prueba: detección de pantallas, camino más corto y que el Navegador solo
+ejecute las acciones necesarias (con un dispositivo simulado)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from navegacion import Navegador, camino, detectar_pantalla
+
+
+def _xml(*textos):
+    nodos = ''.join(f'<node class="android.widget.TextView" text="{t}" />' for t in textos)
+    return f'<hierarchy>{nodos}</hierarchy>'
+
+
+PANTALLAS = {
+    'lista_sin_visita': _xml("Personas sin visita realizada", "Filtro", "Visitar"),
+    'filtro': _xml("Seleccionar valor", "Sin visita realizada", "Aplicar"),
+    'padron': _xml("Filtro", "Visitar", "Visitar"),
+    'ficha': _xml("HERNANDEZ GARCIA GUADALUPE", "Iniciar visita"),
+    'curp': _xml("CURP", "Siguiente"),
+    'menu': _xml("Inicio", "Padrón"),
+    'desconocida': _xml("Configuración"),
+}
+
+
+class Tableta:
+    """Dispositivo simulado: cada acción mueve a la pantalla que dice el grafo de la app"""
+
+    TRANSICIONES = {
+        ('curp', 'atras'): 'ficha',
+        ('ficha', 'atras'): 'lista_sin_visita',
+        ('menu', 'BTN_VISITAR_MENU'): 'padron',
+        ('padron', 'BTN_FILTRO'): 'filtro',
+        ('filtro', 'BTN_APLICAR_FILTRO'): 'lista_sin_visita',
+    }
+
+    def __init__(self, pantalla):
+        self.pantalla = pantalla
+        self.acciones = []
+
+    def dump(self, ruta):
+        Path(ruta).write_text(PANTALLAS[self.pantalla], encoding='utf-8')
+        return True
+
+    def ejecutar(self, accion):
+        nombre = accion[1] if accion[0] == 'tap' else accion[0]
+        self.acciones.append(nombre)
+        if nombre == 'BTN_INICIO':
+            self.pantalla = 'menu'
+        else:
+            self.pantalla = self.TRANSICIONES.get((self.pantalla, nombre), self.pantalla)
+        return True
+
+
+def test_detectar_pantalla():
+    print("="*60)
+    print("TEST: detectar_pantalla()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "pantalla.xml"
+        for esperada, xml in PANTALLAS.items():
+            ruta.write_text(xml, encoding='utf-8')
+            detectada = detectar_pantalla(str(ruta))
+            print(f"{'✅' if detectada == esperada else '❌'} {esperada} -> {detectada}")
+            assert detectada == esperada
+
+
+def test_camino_mas_corto():
+    def acciones(desde):
+        return sum(len(a) for _, a in camino(desde))
+
+    assert camino('lista_sin_visita') == []
+    assert acciones('ficha') == 1 and acciones('curp') == 2
+    assert acciones('filtro') == 3 and acciones('padron') == 4
+    assert acciones('desconocida') == 6         # La secuencia completa de siempre
+
+
+def test_navegador():
+    """Desde la ficha: un ATRÁS, la lista conserva su posición; desde el padrón: sin Inicio"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = str(Path(tmp) / "screen.xml")
+
+        tableta = Tableta('ficha')
+        navegador = Navegador(ruta, dump=tableta.dump, ejecutar=tableta.ejecutar)
+        assert navegador.ir_a_lista() is False
+        assert tableta.acciones == ['atras']
+
+        tableta = Tableta('padron')
+        navegador = Navegador(ruta, dump=tableta.dump, ejecutar=tableta.ejecutar)
+        assert navegador.ir_a_lista() is True
+        assert tableta.acciones == ['BTN_FILTRO', 'BTN_VALOR_TODOS', 'BTN_TODOS_OPCION',
+                                    'BTN_APLICAR_FILTRO']
+
+        # La app no hace lo esperado: None para que el bot use la secuencia completa
+        tableta = Tableta('padron')
+        tableta.TRANSICIONES = {}
+        navegador = Navegador(ruta, dump=tableta.dump, ejecutar=tableta.ejecutar)
+        assert navegador.ir_a_lista() is None
+
+
+if __name__ == '__main__':
+    test_detectar_pantalla()
+    test_camino_mas_corto()
+    test_navegador()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del padrón y el plan de visitas (padron.py)
+Prueba: barrido hasta el fin de la lista, guardar/cargar, siguiente página
+con pendientes y el tiempo estimado
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from padron import PadronLista, barrer_lista, planificar
+
+# Lista simulada: 4 filas por pantalla, 1 de solape al avanzar
+NOMBRES = [f"PERSONA NUMERO {i:03d} APELLIDO" for i in range(10)]
+
+
+class ListaSimulada:
+    def __init__(self, nombres, filas_por_pantalla=4):
+        self.nombres = nombres
+        self.filas = filas_por_pantalla
+        self.inicio = 0
+        self.scrolls = 0
+
+    def dump(self, ruta):
+        return True
+
+    def leer_filas(self, ruta):
+        visibles = self.nombres[self.inicio:self.inicio + self.filas]
+        return [(nombre, 100 * i, 100 * i + 80) for i, nombre in enumerate(visibles)]
+
+    def desplazar(self, filas):
+        self.scrolls += 1
+        self.inicio = min(self.inicio + self.filas - 1, max(0, len(self.nombres) - self.filas))
+
+
+def _funciones(lista):
+    return lista.dump, lista.leer_filas, lista.desplazar
+
+
+def test_barrer_lista():
+    print("="*60)
+    print("TEST: barrer_lista()")
+    print("="*60)
+
+    lista = ListaSimulada(NOMBRES)
+    padron = barrer_lista(lista.dump, lista.leer_filas, lista.desplazar, paginas_sin_nuevos=2)
+    print(f"   {padron.paginas}")
+    assert list(padron.paginas) == NOMBRES
+    paginas = [padron.paginas[n] for n in NOMBRES]
+    assert paginas == [0, 0, 0, 0, 1, 1, 1, 2, 2, 2]    # La fila de solape se queda en la página 0
+    assert padron.nombres_en(1) == NOMBRES[3:7]         # Lo visible en la página 1 (con el solape)
+    assert lista.scrolls == 4                           # Dos páginas sin nuevos y se detiene
+
+    # Tope de páginas aunque la lista no termine
+    lista = ListaSimulada(NOMBRES)
+    padron = barrer_lista(lista.dump, lista.leer_filas, lista.desplazar, paginas_max=1)
+    assert len(padron) == 7
+
+
+def test_guardar_y_cargar():
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = str(Path(tmp) / "padron.json")
+        assert PadronLista.cargar(ruta) is None
+
+        padron = PadronLista({NOMBRES[0]: 0, NOMBRES[5]: 1})
+        padron.guardar(ruta)
+        cargado = PadronLista.cargar(ruta)
+        assert cargado.paginas == padron.paginas and cargado.timestamp
+
+        Path(ruta).write_text("{roto", encoding='utf-8')
+        assert PadronLista.cargar(ruta) is None
+
+
+def primera_pagina(lista, nombre):
+    """Página en la que el nombre aparece en pantalla en la lista simulada"""
+    lista.inicio = 0
+    for pagina in range(len(lista.nombres)):
+        if nombre in [n for n, _, _ in lista.leer_filas(None)]:
+            return pagina
+        lista.desplazar([])
+
+
+def test_paginas_tras_procesar():
+    """Los procesados salen de la lista: las páginas se recalculan, no son las del barrido"""
+    print("="*60)
+    print("TEST: páginas con procesados fuera de la lista")
+    print("="*60)
+
+    nombres = [f"PERSONA NUMERO {i:03d} APELLIDO" for i in range(20)]
+    padron = barrer_lista(*_funciones(ListaSimulada(nombres)))
+    procesados = set(nombres[:9]) | {nombres[12], nombres[13]}
+    en_espera = {nombres[9], nombres[10], nombres[11], nombres[14]}    # Siguen en la lista
+
+    # La lista "Sin visita" de hoy: sin los procesados
+    lista = ListaSimulada([n for n in nombres if n not in procesados])
+    actuales = padron.paginas_actuales(procesados)
+    for nombre in lista.nombres:
+        assert actuales[nombre] == primera_pagina(lista, nombre), nombre
+    assert padron.paginas[nombres[19]] == 6 and actuales[nombres[19]] == 2
+
+    # La huella del salto coincide con lo que se ve en esa página
+    lista.inicio = 0
+    lista.desplazar([])
+    assert padron.nombres_en(1, procesados) == [n for n, _, _ in lista.leer_filas(None)]
+
+    assert padron.siguiente_pagina(procesados, 0) == 0
+    assert padron.siguiente_pagina(procesados, 0, abandonados=en_espera) == 1
+    assert padron.siguiente_pagina(set(nombres), 0) is None
+
+
+def test_plan():
+    """ETA (personas + páginas + flings) con las páginas actuales"""
+    padron = PadronLista({nombre: i // 3 for i, nombre in enumerate(NOMBRES)})
+    procesados = set(NOMBRES[:7])                       # Quedan 7, 8 y 9: todos en la página 0
+
+    plan = planificar(padron, procesados, objetivo=9, segundos_persona=20,
+                      segundos_pagina=3, segundos_salto=1)
+    print(f"   {plan}")
+    assert plan['pendientes'] == [(NOMBRES[7], 0), (NOMBRES[8], 0), (NOMBRES[9], 0)]
+    assert plan['faltan'] == 2 and plan['alcanzable']
+    assert plan['paginas'] == 1
+    assert plan['eta_segundos'] == 2 * 20 + 1 * 3              # Sin flings: la lista subió
+
+    # Los que esperan siguen ocupando su lugar: el siguiente pendiente queda en la página 1
+    plan = planificar(padron, set(), objetivo=1, abandonados=set(NOMBRES[:4]),
+                      segundos_persona=20, segundos_pagina=3, segundos_salto=1)
+    assert plan['pendientes'][0] == (NOMBRES[4], 1)
+    assert plan['eta_segundos'] == 20 + 3
+
+    plan = planificar(padron, procesados, objetivo=20)
+    assert plan['faltan'] == 13 and not plan['alcanzable']
+
+if __name__ == '__main__':
+    test_barrer_lista()
+    test_guardar_y_cargar()
+    test_paginas_tras_procesar()
+    test_plan()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la sonda de pantalla (pantalla.py) y de metricas.py
+Prueba: respuestas desde el XML, aprendizaje foco -> respuesta, focos que no
+distinguen y dump de control
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+import metricas
+import pantalla
+from pantalla import SondaPantalla, es_lista_sin_visita, es_ya_visitada
+
+XML_LISTA = ('<hierarchy><node class="android.widget.TextView" '
+             'text="Personas sin visita realizada" /></hierarchy>')
+XML_FICHA = ('<hierarchy><node class="android.widget.TextView" '
+             'text="Iniciar visita" /></hierarchy>')
+XML_FORMULARIO = ('<hierarchy><node class="android.widget.TextView" '
+                  'text="Datos de la vivienda" /></hierarchy>')
+
+
+class Tableta:
+    """Reemplaza foco_actual/dump_screen_xml: pantalla actual y su foco"""
+
+    def __init__(self, tmp):
+        self.tmp = Path(tmp)
+        self.xml, self.foco = XML_FICHA, "app/.FichaActivity"
+        self.dumps = 0
+
+    def foco_actual(self):
+        return self.foco
+
+    def dump(self, ruta):
+        self.dumps += 1
+        Path(ruta).write_text(self.xml, encoding='utf-8')
+        return True
+
+    def __enter__(self):
+        self._originales = (pantalla.foco_actual, pantalla.dump_screen_xml)
+        pantalla.foco_actual, pantalla.dump_screen_xml = self.foco_actual, self.dump
+        return self
+
+    def __exit__(self, *exc):
+        pantalla.foco_actual, pantalla.dump_screen_xml = self._originales
+
+
+def test_preguntas_xml():
+    """Mismos textos que usaba bot_padron"""
+    print("="*60)
+    print("TEST: es_lista_sin_visita() / es_ya_visitada()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "pantalla.xml"
+        for xml, lista, visitada in [(XML_LISTA, True, False), (XML_FICHA, False, True),
+                                     (XML_FORMULARIO, False, False)]:
+            ruta.write_text(xml, encoding='utf-8')
+            assert es_lista_sin_visita(str(ruta)) == lista
+            assert es_ya_visitada(str(ruta)) == visitada
+
+
+def test_aprende_foco():
+    """Tras confirmar con dumps, el foco basta; cada N respuestas un dump de control"""
+    with tempfile.TemporaryDirectory() as tmp, Tableta(tmp) as tableta:
+        sonda = SondaPantalla(confirmaciones=2, control_cada=3, activa=True)
+        ruta = str(Path(tmp) / "check.xml")
+
+        def visita(ya_visitada):
+            if ya_visitada:
+                tableta.xml, tableta.foco = XML_FICHA, "app/.FichaActivity"
+            else:
+                tableta.xml, tableta.foco = XML_FORMULARIO, "app/.VisitaActivity"
+            return sonda.responder('ya_visitada', ruta)
+
+        # Aprendizaje: 2 de cada una con dump
+        for valor in (True, False, True, False):
+            assert visita(valor) == valor
+        assert tableta.dumps == 4
+
+        # Ya aprendido: sin dumps hasta el de control
+        for valor in (True, False, True, False, True, False):
+            assert visita(valor) == valor
+        assert tableta.dumps == 4
+        assert visita(True) is True and tableta.dumps == 5     # control
+        print(f"   foco: {sonda.respuestas_foco}, dump: {sonda.respuestas_dump}")
+
+
+def test_foco_que_no_distingue():
+    """Una app de una sola actividad: el foco da las dos respuestas, siempre dump"""
+    with tempfile.TemporaryDirectory() as tmp, Tableta(tmp) as tableta:
+        sonda = SondaPantalla(confirmaciones=1, control_cada=10, activa=True)
+        ruta = str(Path(tmp) / "check.xml")
+        tableta.foco = "app/.MainActivity"
+
+        for xml, esperado in [(XML_LISTA, True), (XML_FICHA, False)] * 3:
+            tableta.xml = xml
+            assert sonda.responder('lista_sin_visita', ruta) == esperado
+        assert tableta.dumps == 6 and sonda.respuestas_foco == 0
+
+
+def test_metricas():
+    metricas.reiniciar()
+    for segundos in (0.5, 1.5):
+        metricas.registrar('dump', segundos)
+    with metricas.medir('sonda_foco'):
+        pass
+    resumen = metricas.resumen()
+    assert resumen['dump'] == {'veces': 2, 'total': 2.0, 'promedio': 1.0, 'maximo': 1.5}
+    assert resumen['sonda_foco']['veces'] == 1
+    metricas.reiniciar()
+
+
+if __name__ == '__main__':
+    test_preguntas_xml()
+    test_aprende_foco()
+    test_foco_que_no_distingue()
+    test_metricas()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del guardado en segundo plano (persistencia.py)
+Prueba: JSON escrito por el hilo, fallas devueltas al bot, checkpoint sin las
+personas que fallaron y el modo sin hilo
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append('.')
+
+from persistencia import PersistidorCurp
+
+CURP = "HEGG560427MVZRRL04"
+XML_CURP = (f'<hierarchy><node class="android.widget.EditText" text="{CURP}">'
+            '<node class="android.widget.TextView" text="CURP" /></node></hierarchy>').encode()
+XML_CORTADO = b'<hierarchy><node class="android.widget.TextView" text="CU'
+
+
+def test_hilo_de_fondo():
+    """Resultados en orden; la falla vuelve y el checkpoint la excluye"""
+    print("="*60)
+    print("TEST: PersistidorCurp (en hilo)")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoints = []
+        persistidor = PersistidorCurp(tmp, checkpoints.append, cola_max=2, en_hilo=True,
+                                      capturar_campos=True)
+        persistidor.iniciar()
+        inicio = time.perf_counter()
+        persistidor.encolar("GARCIA LOPEZ ANA", "GARCIA_LOPEZ_ANA", XML_CURP, inicio)
+        persistidor.encolar("PEREZ RUIZ JUAN", "PEREZ_RUIZ_JUAN", XML_CORTADO, inicio)
+        persistidor.encolar_checkpoint(["GARCIA LOPEZ ANA", "PEREZ RUIZ JUAN"])
+        persistidor.detener()
+
+        resultados = persistidor.resultados()
+        print(f"   {resultados}")
+        assert [r['nombre'] for r in resultados] == ["GARCIA LOPEZ ANA", "PEREZ RUIZ JUAN"]
+        assert resultados[0]['curp'] == CURP and resultados[0]['error'] is None
+        assert resultados[1]['error']
+        assert checkpoints == [["GARCIA LOPEZ ANA"]]
+
+        guardado = json.loads((Path(tmp) / "GARCIA_LOPEZ_ANA.json").read_text(encoding='utf-8'))
+        assert guardado == {"nombre": "GARCIA LOPEZ ANA", "curp": CURP, "campos": {"curp": CURP}}
+        assert not (Path(tmp) / "PEREZ_RUIZ_JUAN.json").exists()
+        assert persistidor.profundidad == 0 and persistidor.retraso == 0.0
+        assert (persistidor.guardados, persistidor.fallidos) == (1, 1)
+
+
+def test_sin_hilo():
+    """en_hilo=False: se guarda dentro de encolar(); un reintento exitoso limpia la falla"""
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoints = []
+        persistidor = PersistidorCurp(tmp, checkpoints.append, en_hilo=False)
+        persistidor.iniciar()
+        persistidor.encolar("PEREZ RUIZ JUAN", "PEREZ_RUIZ_JUAN", XML_CORTADO, time.perf_counter())
+        persistidor.encolar("PEREZ RUIZ JUAN", "PEREZ_RUIZ_JUAN", XML_CURP, time.perf_counter())
+        persistidor.encolar_checkpoint(["PEREZ RUIZ JUAN"])
+
+        assert [bool(r['error']) for r in persistidor.resultados()] == [True, False]
+        assert checkpoints == [["PEREZ RUIZ JUAN"]]
+        assert (Path(tmp) / "PEREZ_RUIZ_JUAN.json").exists()
+
+
+if __name__ == '__main__':
+    test_hilo_de_fondo()
+    test_sin_hilo()
+    print("✅ TODAS LAS PRUEBAS PASARON")
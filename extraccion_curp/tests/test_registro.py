@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del logging asíncrono (registro.py)
+Prueba: eventos solo en el JSONL, formateo diferido y cola llena sin bloquear
+"""
+
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from registro import configurar_logging, detener_logging, evento, registros_descartados
+
+
+def test_eventos_y_log_legible():
+    """El evento va al JSONL; el mensaje normal a ambos"""
+    print("="*60)
+    print("TEST: configurar_logging()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = Path(tmp) / "bot.log"
+        eventos_file = Path(tmp) / "eventos.jsonl"
+        configurar_logging(str(log_file), str(eventos_file), 'INFO')
+        try:
+            logger = logging.getLogger('prueba')
+            logger.info("Procesando %s", "JUAN PEREZ")
+            logger.debug("no debe aparecer %s", "NUNCA")
+            evento('persona', nombre="JUAN PEREZ", resultado='guardado', segundos=1.5)
+        finally:
+            detener_logging()
+
+        legible = log_file.read_text(encoding='utf-8')
+        lineas = [json.loads(l) for l in eventos_file.read_text(encoding='utf-8').splitlines()]
+        print(f"   {len(lineas)} líneas JSONL")
+
+        assert "Procesando JUAN PEREZ" in legible
+        assert "NUNCA" not in legible
+        assert "guardado" not in legible
+        assert lineas[0]['msg'] == "Procesando JUAN PEREZ"
+        assert lineas[1]['evento'] == 'persona' and lineas[1]['segundos'] == 1.5
+
+
+def test_cola_llena_no_bloquea():
+    """Con la cola llena se descartan registros en lugar de esperar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(str(Path(tmp) / "bot.log"), None, 'INFO', cola_max=1)
+        try:
+            logger = logging.getLogger('prueba')
+            for i in range(500):
+                logger.info("mensaje %s", i)
+            descartados = registros_descartados()
+        finally:
+            detener_logging()
+
+        print(f"   descartados: {descartados}")
+        assert 0 < descartados < 500
+
+
+if __name__ == '__main__':
+    test_eventos_y_log_legible()
+    test_cola_llena_no_bloquea()
+    print("✅ TODAS LAS PRUEBAS PASARON")
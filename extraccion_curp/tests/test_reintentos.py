@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los reintentos diferidos (reintentos.py)
+Prueba: nada de reintentos en el pase principal, espera creciente en los
+repasos, abandono al llegar al límite y abandonados leídos del checkpoint
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+
+from reintentos import PlanificadorReintentos
+
+NOMBRE = "PÉREZ RUIZ JUAN"
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_repasos_y_abandono():
+    print("="*60)
+    print("TEST: PlanificadorReintentos")
+    print("="*60)
+
+    reloj = Reloj()
+    reintentos = PlanificadorReintentos(intentos_max=3, espera_base=30, espera_max=300, reloj=reloj)
+    assert reintentos.puede_intentar(NOMBRE)
+    assert reintentos.iniciar_repaso() is None          # Nada que reintentar
+
+    # Pase principal: la persona que falló no se intenta aunque ya pasó la espera
+    assert reintentos.registrar_fallo(NOMBRE, 'siguiente') is False
+    reloj.ahora += 1000
+    assert not reintentos.puede_intentar(NOMBRE)
+
+    # Repaso 1: toca de inmediato
+    assert reintentos.iniciar_repaso() == 0.0
+    assert reintentos.puede_intentar("PEREZ RUIZ JUAN")          # Misma clave canónica
+    assert reintentos.registrar_fallo(NOMBRE, 'dump_curp') is False
+
+    # La espera se duplica: el repaso 2 dice cuánto falta
+    assert not reintentos.puede_intentar(NOMBRE)
+    assert reintentos.iniciar_repaso() == 60.0
+    reloj.ahora += 60
+    assert reintentos.puede_intentar(NOMBRE)
+
+    # Tercera falla: abandonada
+    assert reintentos.registrar_fallo(NOMBRE, 'guardar: XML cortado') is True
+    assert not reintentos.puede_intentar(NOMBRE) and NOMBRE in reintentos
+    assert reintentos.pendientes == 0 and reintentos.iniciar_repaso() is None
+    print(f"   {reintentos.abandonados()}")
+    assert reintentos.abandonados() == [{'nombre': NOMBRE, 'intentos': 3,
+                                         'motivos': ['siguiente', 'dump_curp', 'guardar: XML cortado']}]
+
+
+def test_exito_limpia_la_falla():
+    reintentos = PlanificadorReintentos(intentos_max=3, reloj=Reloj())
+    reintentos.registrar_fallo(NOMBRE, 'visitar')
+    reintentos.registrar_exito(NOMBRE)
+    assert reintentos.puede_intentar(NOMBRE) and reintentos.pendientes == 0
+
+
+def test_abandonados_del_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = Path(tmp) / "progreso.json"
+        reintentos = PlanificadorReintentos()
+        assert reintentos.cargar_abandonados(str(checkpoint)) == 0
+
+        checkpoint.write_text(json.dumps({
+            'procesados': ["GARCIA LOPEZ ANA"],
+            'abandonados': [{'nombre': NOMBRE, 'intentos': 3, 'motivos': ['siguiente']}],
+        }), encoding='utf-8')
+        assert reintentos.cargar_abandonados(str(checkpoint)) == 1
+        assert not reintentos.puede_intentar(NOMBRE)
+        assert reintentos.puede_intentar("GARCIA LOPEZ ANA")
+
+        # Checkpoint de antes (sin la clave) o roto: sin abandonados
+        checkpoint.write_text(json.dumps({'procesados': []}), encoding='utf-8')
+        assert PlanificadorReintentos().cargar_abandonados(str(checkpoint)) == 0
+        checkpoint.write_text("{roto", encoding='utf-8')
+        assert PlanificadorReintentos().cargar_abandonados(str(checkpoint)) == 0
+
+
+if __name__ == '__main__':
+    test_repasos_y_abandono()
+    test_exito_limpia_la_falla()
+    test_abandonados_del_checkpoint()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del scroll calibrado (scroll.py) con geometrías de lista simuladas
+"""
+
+import sys
+sys.path.append('.')
+
+from scroll import CalibradorScroll, PosicionLista
+
+
+def pagina(inicio: int, filas: int = 6, alto: int = 150, y0: int = 300):
+    """Simula una página: personas numeradas desde `inicio`, una fila cada `alto` px"""
+    return [(f"PERSONA NUMERO {i:04d} PRUEBA", y0 + (i - inicio) * alto, y0 + (i - inicio + 1) * alto)
+            for i in range(inicio, inicio + filas)]
+
+
+def test_calibra_hacia_una_pagina():
+    """Con swipe demasiado corto (2 filas) debe alargarse hasta avanzar 5 filas"""
+    print("="*60)
+    print("TEST: CalibradorScroll.medir()")
+    print("="*60)
+
+    calibrador = CalibradorScroll(x=290, y_inicio=1055, y_fin=755, duracion=600, filas_solape=1)
+
+    calibrador.registrar_antes(pagina(0))
+    solape = calibrador.medir(pagina(2))   # la lista avanzó 2 filas (300px) con 300px de swipe
+
+    print(f"   Solape: {solape:.0%}  Swipe nuevo: {calibrador.distancia}px / {calibrador.duracion}ms")
+    assert abs(solape - 4 / 6) < 1e-9
+    assert calibrador.factor == 1.0
+    assert calibrador.distancia == 750              # 5 filas * 150px
+    assert calibrador.duracion == 1500              # misma velocidad de dedo
+    assert calibrador.comando() == "shell input swipe 290 1055 290 305 1500"
+
+
+def test_sin_solape_acorta_swipe():
+    """Si no quedó ninguna fila en común, el swipe se acorta"""
+    calibrador = CalibradorScroll(x=290, y_inicio=1055, y_fin=400, duracion=1100)
+    calibrador.registrar_antes(pagina(0))
+    solape = calibrador.medir(pagina(20))
+
+    assert solape == 0
+    assert calibrador.distancia < 655
+
+
+def test_fin_de_lista_no_recalibra():
+    """Al final de la lista la última fila no cambia: no se toca la calibración"""
+    calibrador = CalibradorScroll(x=290, y_inicio=1055, y_fin=400, duracion=1100)
+    calibrador.registrar_antes(pagina(0))
+    calibrador.medir(pagina(0))
+
+    assert calibrador.factor is None
+    assert calibrador.distancia == 655
+    assert calibrador.medir(pagina(0)) is None      # sin scroll pendiente
+
+
+def test_posicion_huella_y_flings():
+    """La huella no se confunde con la página anterior (solo comparte la fila de solape)"""
+    posicion = PosicionLista()
+    posicion.paginas_por_fling = 2.0
+    for _ in range(7):
+        posicion.avanzar()
+    posicion.actualizar(pagina(35))
+
+    assert posicion.coincide(pagina(35))
+    assert not posicion.coincide(pagina(30))       # página anterior: 1 fila en común
+    assert posicion.flings_necesarios() == 3        # (7 - 1) / 2
+
+    # Se encontró la huella tras 1 paso extra: cada fling avanzó 2 páginas
+    posicion.ajustar_fling(3, 1)
+    assert posicion.paginas_por_fling == 2.0
+
+    posicion.reiniciar()
+    assert posicion.pagina == 0 and posicion.flings_necesarios() == 0
+
+
+if __name__ == '__main__':
+    test_calibra_hacia_una_pagina()
+    test_sin_solape_acorta_swipe()
+    test_fin_de_lista_no_recalibra()
+    test_posicion_huella_y_flings()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de tools/validar_xml.py
+Prueba: revisión rápida (vacío/truncado), validación en paralelo y reutilización
+de resultados de archivos sin cambios
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append('.')
+sys.path.append('../tools')
+
+from validar_xml import validar_xml, validar_carpeta
+
+XML_CON_CURP = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    '<hierarchy rotation="0"><node text="CURP" /><node text="PEGJ850101HYNRRN09" /></hierarchy>'
+)
+
+
+def crear_xmls(carpeta: Path, cantidad_validos: int = 1):
+    for i in range(cantidad_validos):
+        (carpeta / f"PERSONA_{i:03d}.xml").write_text(XML_CON_CURP, encoding='utf-8')
+    (carpeta / "VACIO.xml").write_bytes(b"")
+    (carpeta / "TRUNCADO.xml").write_text(XML_CON_CURP[:-20], encoding='utf-8')
+
+
+def test_revision_rapida():
+    """Vacío y truncado se detectan sin parsear; el válido trae CURP y tiempos"""
+    print("="*60)
+    print("TEST: validar_xml()")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp)
+        crear_xmls(carpeta)
+
+        valido = validar_xml(str(carpeta / "PERSONA_000.xml"))
+        vacio = validar_xml(str(carpeta / "VACIO.xml"))
+        truncado = validar_xml(str(carpeta / "TRUNCADO.xml"))
+
+        print(f"   válido: {valido['curp']} en {valido['tiempo_ms']} ms")
+        print(f"   vacío: {vacio['error']}  truncado: {truncado['error']}")
+
+        assert valido['valido'] and valido['curp'] == "PEGJ850101HYNRRN09"
+        assert valido['tamano'] == len(XML_CON_CURP)
+        assert vacio['error'] == "Archivo vacío"
+        assert "truncado" in truncado['error']
+
+        # Corrupto a la mitad: cabecera, cierre y CURP intactos, pero no es XML válido
+        corrupto = carpeta / "CORRUPTO.xml"
+        corrupto.write_text(XML_CON_CURP.replace('<node text="CURP" />', '<node text="CURP" <'),
+                            encoding='utf-8')
+        resultado = validar_xml(str(corrupto))
+        assert not resultado['valido'] and "corrupto" in resultado['error']
+
+
+def test_reutiliza_sin_cambios():
+    """La segunda pasada reutiliza todo; un archivo modificado se vuelve a validar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp)
+        crear_xmls(carpeta, cantidad_validos=40)
+        archivos = sorted(carpeta.glob("*.xml"))
+
+        primera = validar_carpeta(archivos, procesos=2)
+        assert len(primera) == 42
+        assert not any(r['reutilizado'] for r in primera.values())
+        assert sum(1 for r in primera.values() if r['valido']) == 40
+
+        segunda = validar_carpeta(archivos, anteriores=primera, procesos=1)
+        assert all(r['reutilizado'] for r in segunda.values())
+
+        # Un reporte de otra revisión del validador no se reutiliza
+        viejo = {nombre: dict(r, revision=1) for nombre, r in primera.items()}
+        assert not any(r['reutilizado']
+                       for r in validar_carpeta(archivos, anteriores=viejo, procesos=1).values())
+
+        # Se completa el archivo truncado: cambia tamaño y mtime
+        truncado = carpeta / "TRUNCADO.xml"
+        truncado.write_text(XML_CON_CURP, encoding='utf-8')
+        os.utime(truncado, ns=(0, primera['TRUNCADO.xml']['mtime_ns'] + 10**9))
+
+        tercera = validar_carpeta(archivos, anteriores=segunda, procesos=1)
+        assert not tercera['TRUNCADO.xml']['reutilizado']
+        assert tercera['TRUNCADO.xml']['valido']
+        assert sum(1 for r in tercera.values() if r['reutilizado']) == 41
+
+
+if __name__ == '__main__':
+    test_revision_rapida()
+    test_reutiliza_sin_cambios()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -4,14 +4,14 @@
 Script para convertir los archivos JSON de CURP a un archivo CSV
 
 Lee todos los archivos JSON de la carpeta json/ y los convierte a un CSV
-con dos columnas: nombre, CURP
+con las columnas nombre, CURP y, si el bot capturó campos de la ficha
+(CAPTURA_CAMPOS), una columna por campo
 
 Uso:
     python json_to_csv.py
 """
 
-import os
-import json
+import sys
 import csv
 from pathlib import Path
 
@@ -22,6 +22,11 @@ JSON_FOLDER = PROJECT_DIR / "json"
 CSV_FOLDER = PROJECT_DIR / "csv"
 OUTPUT_CSV = CSV_FOLDER / "curps.csv"
 
+# Usar la misma normalización de nombres que el bot
+sys.path.insert(0, str(PROJECT_DIR / "bot"))
+from identidad import clave_canonica
+from cargador_json import iterar_carpeta
+
 
 def leer_json_files():
     """
@@ -31,38 +36,50 @@ def leer_json_files():
         Lista de diccionarios con {nombre, curp}
     """
     datos = []
+    claves_vistas = set()
+    duplicados = 0
     
     if not JSON_FOLDER.exists():
         print(f"❌ Error: No existe la carpeta {JSON_FOLDER}")
         return datos
     
-    # Obtener todos los archivos JSON
-    json_files = list(JSON_FOLDER.glob("*.json"))
-    
-    if not json_files:
+    # Leer todos los archivos (pool de hilos + snapshot consolidado)
+    total_archivos = 0
+    for archivo, data, error in iterar_carpeta(JSON_FOLDER):
+        total_archivos += 1
+        
+        if error or not isinstance(data, dict):
+            print(f"⚠️  Error al leer {archivo}: {error or 'formato inválido'}")
+            continue
+        
+        nombre = data.get('nombre', '')
+        curp = data.get('curp', '')
+        
+        # Misma persona con otra escritura del nombre (acentos, espacios)
+        if nombre and clave_canonica(nombre) in claves_vistas:
+            duplicados += 1
+            continue
+        
+        # Solo agregar si tiene nombre (CURP puede ser None)
+        if nombre:
+            claves_vistas.add(clave_canonica(nombre))
+            fila = {
+                'nombre': nombre,
+                'CURP': curp if curp else 'SIN CURP'
+            }
+            for campo, valor in (data.get('campos') or {}).items():
+                if campo != 'curp':
+                    fila.setdefault(campo, valor)
+            datos.append(fila)
+    
+    if not total_archivos:
         print(f"⚠️  No se encontraron archivos JSON en {JSON_FOLDER}")
         return datos
     
-    print(f"📂 Encontrados {len(json_files)} archivos JSON")
-    
-    # Leer cada archivo
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                nombre = data.get('nombre', '')
-                curp = data.get('curp', '')
-                
-                # Solo agregar si tiene nombre (CURP puede ser None)
-                if nombre:
-                    datos.append({
-                        'nombre': nombre,
-                        'CURP': curp if curp else 'SIN CURP'
-                    })
-        
-        except Exception as e:
-            print(f"⚠️  Error al leer {json_file.name}: {e}")
+    print(f"📂 Leídos {total_archivos} archivos JSON")
+    
+    if duplicados:
+        print(f"⚠️  {duplicados} archivos duplicados (mismo nombre canónico) omitidos")
     
     return datos
 
@@ -81,8 +98,13 @@ def guardar_csv(datos):
     datos_ordenados = sorted(datos, key=lambda x: x['nombre'])
     
     # Escribir CSV
+    # Columnas de campos en el orden en que aparecen
+    columnas = ['nombre', 'CURP']
+    for d in datos_ordenados:
+        columnas.extend(c for c in d if c not in columnas)
+    
     with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=['nombre', 'CURP'])
+        writer = csv.DictWriter(f, fieldnames=columnas, restval='')
         
         # Escribir encabezados
         writer.writeheader()
@@ -7,58 +7,150 @@ Genera un reporte de:
 - XMLs con CURP detectado
 - XMLs corruptos o vacíos
 - XMLs sin CURP
+
+Los archivos se validan en paralelo (procesos). Antes del parseo completo hay
+una revisión rápida (vacío, truncado, sin </hierarchy>), y los archivos que no
+cambiaron desde el último reporte JSON reutilizan su resultado.
+
+Si el dump trae exactamente un CURP con fecha y dígito verificador correctos
+(búsqueda sobre los bytes crudos), no se construye el árbol XML: solo se
+revisa que esté bien formado con expat, sin guardar nodos; los casos
+ambiguos se parsean completos (--estricto parsea todos).
+
+Uso:
+    python validar_xml.py            # en paralelo, reutilizando resultados
+    python validar_xml.py --todo     # vuelve a validar todos los archivos
+    python validar_xml.py --estricto # parsea el XML completo aunque el CURP sea claro
 """
 
+import json
 import os
-import re
+import sys
+import time
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_DIR = SCRIPT_DIR.parent
+
+# Búsqueda de CURP compartida con el bot (bytes crudos + respaldo estructurado)
+sys.path.insert(0, str(PROJECT_DIR / "bot"))
+from curp import curp_de_arbol, curp_valido, curps_en_archivo
+
+CIERRE_HIERARCHY = b'</hierarchy>'
+BYTES_COLA = 256            # Bytes finales revisados en la validación rápida
+MIN_PARA_PROCESOS = 32      # Con menos archivos no vale la pena crear procesos
+ARCHIVOS_POR_TAREA = 16
+# Sube cuando cambia el criterio de validación: los resultados de un reporte
+# con otra revisión no se reutilizan
+REVISION_VALIDACION = 2
+
+
+def prevalidar_xml(xml_path: str, tamano: int) -> Optional[str]:
+    """
+    Revisión rápida sin parsear: vacío, truncado o sin cierre de </hierarchy>
+    
+    Returns:
+        Mensaje de error, o None si vale la pena parsearlo
+    """
+    if tamano == 0:
+        return "Archivo vacío"
+    
+    with open(xml_path, 'rb') as f:
+        inicio = f.read(BYTES_COLA)
+        f.seek(max(0, tamano - BYTES_COLA))
+        cola = f.read().rstrip()
+    
+    if b'<hierarchy' not in inicio:
+        return "No es un dump de UI (falta <hierarchy>)"
+    if not cola.endswith(CIERRE_HIERARCHY):
+        return "XML truncado (falta </hierarchy>)"
+    return None
+
 
+def bien_formado(xml_path: str) -> Optional[str]:
+    """
+    Revisa la sintaxis XML completa con expat sin construir el árbol
 
-def validar_xml(xml_path: str) -> dict:
+    Returns:
+        Mensaje de error, o None si el XML está bien formado
+    """
+    parser = expat.ParserCreate()
+    try:
+        with open(xml_path, 'rb') as f:
+            parser.ParseFile(f)
+    except expat.ExpatError as e:
+        return f"XML corrupto: {e}"
+    return None
+
+
+def validar_xml(xml_path: str, estricto: bool = False) -> dict:
     """
     Valida un archivo XML individual
     
+    Args:
+        xml_path: Ruta al XML
+        estricto: Parsear el XML completo aunque la búsqueda en bytes sea concluyente
+    
     Returns:
         Dict con: {
             'valido': bool,
             'tiene_curp': bool,
             'curp': str o None,
-            'error': str o None
+            'verificado': bool (fecha y dígito verificador correctos),
+            'metodo': 'bytes' | 'arbol' | None,
+            'error': str o None,
+            'tamano': bytes,
+            'tiempo_ms': tiempo de validación
         }
     """
+    inicio = time.perf_counter()
     result = {
         'valido': False,
         'tiene_curp': False,
         'curp': None,
-        'error': None
+        'verificado': False,
+        'metodo': None,
+        'error': None,
+        'tamano': 0,
+        'tiempo_ms': 0.0
     }
     
     try:
-        # Verificar que el archivo existe y no está vacío
+        # Verificar que el archivo existe
         if not os.path.exists(xml_path):
             result['error'] = "Archivo no existe"
             return result
         
-        if os.path.getsize(xml_path) == 0:
-            result['error'] = "Archivo vacío"
-            return result
+        result['tamano'] = os.path.getsize(xml_path)
         
-        # Intentar parsear el XML
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-        result['valido'] = True
+        # Revisión rápida antes del parseo completo
+        error = prevalidar_xml(xml_path, result['tamano'])
+        if error:
+            result['error'] = error
+            return result
         
-        # Buscar CURP (18 caracteres: 4 letras + 6 dígitos + 6 letras/dígitos + 2 dígitos)
-        curp_pattern = r'[A-Z]{4}\d{6}[A-Z0-9]{6}\d{2}'
+        # Camino rápido: un solo CURP verificado en los bytes crudos
+        candidatos = curps_en_archivo(xml_path)
+        if len(candidatos) == 1 and not estricto:
+            error = bien_formado(xml_path)
+            if error:
+                result['error'] = error
+                return result
+            result.update(valido=True, tiene_curp=True, curp=candidatos[0],
+                          verificado=True, metodo='bytes')
+            return result
         
-        for node in root.findall(".//node"):
-            text = node.get("text", "")
-            match = re.search(curp_pattern, text)
-            if match:
-                result['tiene_curp'] = True
-                result['curp'] = match.group(0)
-                break
+        # Ambiguo (o estricto): parsear y buscar la etiqueta "CURP"
+        root = ET.parse(xml_path).getroot()
+        result['valido'] = True
+        curp = curp_de_arbol(root)
+        if curp:
+            result.update(tiene_curp=True, curp=curp, verificado=curp_valido(curp), metodo='arbol')
         
         return result
         
@@ -68,6 +160,91 @@ def validar_xml(xml_path: str) -> dict:
     except Exception as e:
         result['error'] = f"Error: {e}"
         return result
+    finally:
+        result['tiempo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+
+
+def _validar_con_firma(xml_path: str, estricto: bool = False) -> dict:
+    """validar_xml + firma del archivo (para reutilizar el resultado la próxima vez)"""
+    try:
+        mtime_ns = os.stat(xml_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    resultado = validar_xml(xml_path, estricto)
+    resultado['mtime_ns'] = mtime_ns
+    resultado['revision'] = REVISION_VALIDACION
+    return resultado
+
+
+def cargar_reporte_json(reporte_path: str) -> Dict[str, dict]:
+    """Resultados por archivo del reporte anterior (vacío si no hay)"""
+    try:
+        with open(reporte_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('archivos', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def validar_carpeta(xml_files: List[Path], anteriores: Optional[Dict[str, dict]] = None,
+                    procesos: Optional[int] = None, estricto: bool = False) -> Dict[str, dict]:
+    """
+    Valida todos los archivos, en paralelo si son muchos
+    
+    Args:
+        xml_files: Archivos a validar
+        anteriores: Resultados del reporte anterior por nombre de archivo; se
+            reutilizan si el tamaño y el mtime no cambiaron (y son de esta
+            REVISION_VALIDACION)
+        procesos: Número de procesos (None = núcleos disponibles)
+        estricto: Parsear cada XML completo (ver validar_xml)
+    
+    Returns:
+        Dict nombre -> resultado (con 'reutilizado': bool)
+    """
+    anteriores = anteriores or {}
+    resultados: Dict[str, dict] = {}
+    pendientes: List[str] = []
+    
+    for xml_file in xml_files:
+        previo = anteriores.get(xml_file.name)
+        if previo:
+            try:
+                info = xml_file.stat()
+            except OSError:
+                info = None
+            if (info and previo.get('revision') == REVISION_VALIDACION
+                    and previo.get('tamano') == info.st_size and previo.get('mtime_ns') == info.st_mtime_ns):
+                resultados[xml_file.name] = dict(previo, reutilizado=True)
+                continue
+        pendientes.append(str(xml_file))
+    
+    if len(pendientes) >= MIN_PARA_PROCESOS and procesos != 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            nuevos = list(pool.map(_validar_con_firma, pendientes, [estricto] * len(pendientes),
+                                   chunksize=ARCHIVOS_POR_TAREA))
+    else:
+        nuevos = [_validar_con_firma(ruta, estricto) for ruta in pendientes]
+    
+    for ruta, resultado in zip(pendientes, nuevos):
+        resultado['reutilizado'] = False
+        resultados[Path(ruta).name] = resultado
+    
+    return resultados
+
+
+def guardar_reporte_json(reporte_path: str, xml_folder: str, resultados: Dict[str, dict], resumen: dict):
+    """Reporte para otros programas: resumen + resultado por archivo (tamaño, tiempo de parseo)"""
+    datos = {
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'carpeta': xml_folder,
+        'resumen': resumen,
+        'archivos': {nombre: {k: v for k, v in r.items() if k != 'reutilizado'}
+                     for nombre, r in sorted(resultados.items())}
+    }
+    temporal = reporte_path + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, reporte_path)
 
 
 def main():
@@ -83,7 +260,7 @@ def main():
         return
     
     # Obtener todos los XMLs
-    xml_files = list(Path(xml_folder).glob("*.xml"))
+    xml_files = sorted(Path(xml_folder).glob("*.xml"))
     
     if not xml_files:
         print(f"\n⚠️  No se encontraron archivos XML en {xml_folder}")
@@ -92,20 +269,32 @@ def main():
     print(f"\n📁 Encontrados {len(xml_files)} archivos XML")
     print("\n🔍 Validando...\n")
     
+    reporte_json = "../reporte_validacion.json"
+    estricto = '--estricto' in sys.argv
+    anteriores = {} if '--todo' in sys.argv or estricto else cargar_reporte_json(reporte_json)
+    
+    inicio = time.perf_counter()
+    resultados = validar_carpeta(xml_files, anteriores, estricto=estricto)
+    duracion = time.perf_counter() - inicio
+    
     # Contadores
     total = len(xml_files)
     validos = 0
     con_curp = 0
     sin_curp = 0
     corruptos = 0
+    reutilizados = 0
+    por_bytes = 0
+    sin_verificar = 0
     
     # Listas para reporte detallado
     xmls_sin_curp = []
     xmls_corruptos = []
     
-    # Validar cada XML
     for xml_file in xml_files:
-        resultado = validar_xml(str(xml_file))
+        resultado = resultados[xml_file.name]
+        if resultado['reutilizado']:
+            reutilizados += 1
         
         if not resultado['valido']:
             corruptos += 1
@@ -117,6 +306,10 @@ def main():
             validos += 1
             if resultado['tiene_curp']:
                 con_curp += 1
+                if resultado.get('metodo') == 'bytes':
+                    por_bytes += 1
+                if not resultado.get('verificado'):
+                    sin_verificar += 1
             else:
                 sin_curp += 1
                 xmls_sin_curp.append(xml_file.name)
@@ -129,7 +322,11 @@ def main():
     print(f"  ✅ Válidos:             {validos} ({validos/total*100:.1f}%)")
     print(f"  ❌ Corruptos/Vacíos:    {corruptos} ({corruptos/total*100:.1f}%)")
     print(f"\n  📋 Con CURP detectado:  {con_curp} ({con_curp/total*100:.1f}%)")
+    print(f"     ⚡ Sin parsear XML:   {por_bytes} (un solo CURP verificado en los bytes)")
+    print(f"     ⚠️  Sin verificar:    {sin_verificar} (fecha o dígito verificador no cuadran)")
     print(f"  ⚠️  Sin CURP:           {sin_curp} ({sin_curp/total*100:.1f}%)")
+    print(f"\n  ♻️  Reutilizados:        {reutilizados} (sin cambios desde el último reporte)")
+    print(f"  ⏱️  Validados en {duracion:.2f} s ({total - reutilizados} archivos)")
     
     # Detalles de XMLs sin CURP
     if xmls_sin_curp:
@@ -176,6 +373,19 @@ def main():
                 f.write(f"  - {item['nombre']}: {item['error']}\n")
     
     print(f"📄 Reporte guardado en: {reporte_path}")
+    
+    guardar_reporte_json(reporte_json, xml_folder, resultados, {
+        'total': total,
+        'validos': validos,
+        'corruptos': corruptos,
+        'con_curp': con_curp,
+        'sin_curp': sin_curp,
+        'curp_por_bytes': por_bytes,
+        'curp_sin_verificar': sin_verificar,
+        'reutilizados': reutilizados,
+        'segundos': round(duracion, 3)
+    })
+    print(f"📄 Reporte JSON guardado en: {reporte_json}")
 
 
 if __name__ == '__main__':
@@ -5,8 +5,7 @@ Script para verificar CURPs en archivos JSON
 Encuentra archivos JSON que tengan CURP null, vacío o "SIN CURP"
 """
 
-import os
-import json
+import sys
 from pathlib import Path
 
 # Rutas
@@ -14,47 +13,50 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
 JSON_FOLDER = PROJECT_DIR / "json"
 
+# Cargador compartido (pool de hilos + snapshot consolidado)
+sys.path.insert(0, str(PROJECT_DIR / "bot"))
+from cargador_json import iterar_carpeta
+
 
 def main():
     print("="*60)
     print("VERIFICAR CURPs EN ARCHIVOS JSON")
     print("="*60)
     
-    # Leer archivos JSON
-    json_files = list(JSON_FOLDER.glob("*.json"))
-    print(f"\n📂 Total de archivos JSON: {len(json_files)}")
-    
     sin_curp = []
     con_curp = []
     errores = []
+    total_archivos = 0
     
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                nombre = data.get('nombre', 'DESCONOCIDO')
-                curp = data.get('curp')
-                
-                # Verificar si tiene CURP válido
-                if curp is None or curp == '' or curp == 'SIN CURP':
-                    sin_curp.append({
-                        'archivo': json_file.name,
-                        'nombre': nombre,
-                        'curp': curp
-                    })
-                else:
-                    con_curp.append({
-                        'archivo': json_file.name,
-                        'nombre': nombre,
-                        'curp': curp
-                    })
+    # Leer archivos JSON
+    for archivo, data, error in iterar_carpeta(JSON_FOLDER):
+        total_archivos += 1
         
-        except Exception as e:
+        if error or not isinstance(data, dict):
             errores.append({
-                'archivo': json_file.name,
-                'error': str(e)
+                'archivo': archivo,
+                'error': error or 'formato inválido'
             })
+            continue
+        
+        nombre = data.get('nombre', 'DESCONOCIDO')
+        curp = data.get('curp')
+        
+        # Verificar si tiene CURP válido
+        if curp is None or curp == '' or curp == 'SIN CURP':
+            sin_curp.append({
+                'archivo': archivo,
+                'nombre': nombre,
+                'curp': curp
+            })
+        else:
+            con_curp.append({
+                'archivo': archivo,
+                'nombre': nombre,
+                'curp': curp
+            })
+    
+    print(f"\n📂 Total de archivos JSON: {total_archivos}")
     
     # Mostrar resultados
     print(f"\n✅ Con CURP válido: {len(con_curp)}")
@@ -86,7 +88,7 @@ def main():
     
     print("\n" + "="*60)
     print("RESUMEN:")
-    print(f"  Total: {len(json_files)}")
+    print(f"  Total: {total_archivos}")
     print(f"  Con CURP: {len(con_curp)}")
     print(f"  Sin CURP: {len(sin_curp)}")
     print(f"  Errores: {len(errores)}")
@@ -2,11 +2,11 @@
 # -*- coding: utf-8 -*-
 """
 Script para encontrar personas faltantes
-Compara progreso.json con los archivos JSON existentes
+Compara progreso.json con los archivos JSON existentes usando el índice
+de identidad del bot (misma normalización de nombres)
 """
 
-import os
-import json
+import sys
 from pathlib import Path
 
 # Rutas
@@ -15,20 +15,9 @@ PROJECT_DIR = SCRIPT_DIR.parent
 PROGRESO_FILE = PROJECT_DIR / "progreso.json"
 JSON_FOLDER = PROJECT_DIR / "json"
 
-
-def sanitize_name(nombre):
-    """Sanitiza el nombre igual que el bot"""
-    import unicodedata
-    # Remover acentos
-    nombre_sin_acentos = ''.join(
-        c for c in unicodedata.normalize('NFD', nombre)
-        if unicodedata.category(c) != 'Mn'
-    )
-    # Reemplazar espacios y caracteres especiales
-    nombre_limpio = nombre_sin_acentos.replace(' ', '_').replace('Ñ', 'N').replace('ñ', 'n')
-    # Remover caracteres no alfanuméricos
-    nombre_limpio = ''.join(c for c in nombre_limpio if c.isalnum() or c == '_')
-    return nombre_limpio.upper()
+# Usar la misma normalización de nombres que el bot
+sys.path.insert(0, str(PROJECT_DIR / "bot"))
+from identidad import IndiceIdentidad, clave_canonica
 
 
 def main():
@@ -36,52 +25,51 @@ def main():
     print("BUSCAR PERSONAS FALTANTES")
     print("="*60)
     
-    # Leer progreso.json
-    with open(PROGRESO_FILE, 'r', encoding='utf-8') as f:
-        progreso = json.load(f)
-    
-    personas_procesadas = set(progreso['procesados'])
-    print(f"\n📋 Personas en progreso.json: {len(personas_procesadas)}")
-    
-    # Leer archivos JSON existentes
-    json_files = list(JSON_FOLDER.glob("*.json"))
-    nombres_con_archivo = set()
-    
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                nombre = data.get('nombre', '')
-                if nombre:
-                    nombres_con_archivo.add(nombre)
-        except Exception as e:
-            print(f"⚠️  Error leyendo {json_file.name}: {e}")
+    # Construir el índice único (checkpoint + archivos JSON)
+    indice = IndiceIdentidad.construir(str(PROGRESO_FILE), str(JSON_FOLDER))
+    reporte = indice.reporte_reconciliacion()
     
-    print(f"📂 Archivos JSON encontrados: {len(json_files)}")
-    print(f"📝 Nombres únicos en JSONs: {len(nombres_con_archivo)}")
+    print(f"\n📋 Personas en progreso.json: {reporte['en_checkpoint']}")
+    print(f"📂 Archivos JSON encontrados: {reporte['con_archivo']}")
+    print(f"📝 Personas únicas (nombre canónico): {reporte['total']}")
     
     # Encontrar faltantes
-    faltantes = personas_procesadas - nombres_con_archivo
+    faltantes = reporte['solo_checkpoint']
     
     if faltantes:
         print(f"\n❌ PERSONAS FALTANTES: {len(faltantes)}")
         print("="*60)
-        for nombre in sorted(faltantes):
-            nombre_archivo = sanitize_name(nombre)
+        for nombre in faltantes:
             print(f"  - {nombre}")
-            print(f"    Archivo esperado: {nombre_archivo}.json")
+            print(f"    Archivo esperado: {clave_canonica(nombre)}.json")
     else:
         print(f"\n✅ Todos los archivos están presentes")
     
     # Encontrar extras (archivos que no están en progreso.json)
-    extras = nombres_con_archivo - personas_procesadas
+    extras = reporte['solo_archivo']
     
     if extras:
         print(f"\n⚠️  ARCHIVOS EXTRA (no en progreso.json): {len(extras)}")
         print("="*60)
-        for nombre in sorted(extras):
+        for nombre in extras:
             print(f"  - {nombre}")
     
+    # Reporte de reconciliación: nombres que chocan en la misma clave
+    colisiones = reporte['colisiones']
+    
+    if colisiones:
+        print(f"\n⚠️  COLISIONES DE IDENTIDAD: {len(colisiones)}")
+        print("="*60)
+        for col in colisiones:
+            if col['tipo'] == 'misma_clave':
+                print(f"  - {col['clave']}: {' | '.join(col['nombres'])}")
+            elif col['tipo'] == 'archivo_no_canonico':
+                print(f"  - {col['archivo']} -> debería llamarse {col['esperado']}")
+            elif col['tipo'] == 'archivo_duplicado':
+                print(f"  - {col['clave']}: varios archivos ({', '.join(col['archivos'])})")
+            else:
+                print(f"  - {col['archivo']}: {col['detalle']}")
+    
     print("\n" + "="*60)
 
 
@@ -2,12 +2,28 @@
 # -*- coding: utf-8 -*-
 """
 Script de utilidades para filtrar y analizar los datos extraídos de personas
+Los filtros y la búsqueda por nombre usan índices construidos al cargar
+(ver indices_personas.py)
+
+Uso:
+    python analyze_personas.py                                   # menú interactivo
+    python analyze_personas.py -q "tipo=PAM AND telefono_1!=''" -o pam.csv
+    python analyze_personas.py --lote extractos.txt              # muchos extractos
+
+Sintaxis de consultas: ver consultas_personas.py
 """
 
+import argparse
 import json
 import csv
-from typing import List, Dict
-from collections import Counter
+import sys
+import time
+from typing import List, Dict, Sequence
+
+from indices_personas import IndicePersonas
+from estadisticas_personas import EstadisticasPersonas
+from consultas_personas import Consulta, ErrorConsulta, escribir_resultados, leer_lote
+from lectura_personas import iterar_personas
 
 
 class PersonaAnalyzer:
@@ -16,6 +32,8 @@ class PersonaAnalyzer:
     def __init__(self, json_file: str = 'personas.json'):
         self.json_file = json_file
         self.personas: List[Dict[str, str]] = []
+        self.indice = IndicePersonas([])
+        self.estadisticas = None
         self.load_data()
     
     def load_data(self):
@@ -27,66 +45,74 @@ class PersonaAnalyzer:
         except FileNotFoundError:
             print(f"✗ No se encontró el archivo {self.json_file}")
             print("  Ejecuta primero extract_personas.py")
+            return
         except Exception as e:
             print(f"✗ Error al cargar datos: {e}")
+            return
+        
+        self.indice = IndicePersonas(self.personas)
+        print(f"✓ Índices construidos en {self.indice.segundos_construccion * 1000:.0f} ms "
+              f"({len(self.indice.ngramas)} n-gramas de nombre)")
+    
+    def _seleccionar(self, posiciones: Sequence[int]) -> List[Dict[str, str]]:
+        """Registros en las posiciones dadas (en el orden original)"""
+        personas = self.personas
+        return [personas[i] for i in posiciones]
     
     def filter_by_tipo(self, tipo: str) -> List[Dict[str, str]]:
         """Filtra personas por tipo (PCD, PAM, etc.)"""
-        return [p for p in self.personas if p.get('tipo_persona', '').upper() == tipo.upper()]
+        return self._seleccionar(self.indice.buscar_valor('tipo_persona', tipo))
     
     def filter_by_status_cita(self, status: str) -> List[Dict[str, str]]:
         """Filtra personas por status de cita"""
-        return [p for p in self.personas if p.get('status_cita', '').upper() == status.upper()]
+        return self._seleccionar(self.indice.buscar_valor('status_cita', status))
     
     def filter_con_historial(self) -> List[Dict[str, str]]:
         """Filtra personas con historial clínico completo"""
-        return [p for p in self.personas if p.get('historial_clinico') == 'COMPLETO']
+        return self._seleccionar(self.indice.buscar_valor('historial_clinico', 'COMPLETO', ignorar_mayusculas=False))
     
     def filter_sin_historial(self) -> List[Dict[str, str]]:
         """Filtra personas sin historial clínico"""
-        return [p for p in self.personas if p.get('historial_clinico') == 'SIN HISTORIAL']
+        return self._seleccionar(self.indice.buscar_valor('historial_clinico', 'SIN HISTORIAL', ignorar_mayusculas=False))
     
     def filter_con_visitas(self) -> List[Dict[str, str]]:
         """Filtra personas que tienen al menos una visita"""
-        return [p for p in self.personas if int(p.get('num_visitas', 0)) > 0]
+        return self._seleccionar(self.indice.con_visitas)
     
     def filter_sin_telefono(self) -> List[Dict[str, str]]:
         """Filtra personas sin teléfono registrado"""
-        return [p for p in self.personas 
-                if not p.get('telefono_1') and not p.get('telefono_2')]
+        return self._seleccionar(self.indice.sin_telefono)
     
     def filter_con_dos_telefonos(self) -> List[Dict[str, str]]:
         """Filtra personas con dos teléfonos registrados"""
-        return [p for p in self.personas 
-                if p.get('telefono_1') and p.get('telefono_2')]
+        return self._seleccionar(self.indice.con_dos_telefonos)
     
     def search_by_name(self, query: str) -> List[Dict[str, str]]:
-        """Busca personas por nombre (búsqueda parcial)"""
-        query = query.upper()
-        return [p for p in self.personas if query in p.get('nombre', '').upper()]
+        """Busca personas por nombre (búsqueda parcial, índice de n-gramas)"""
+        return self._seleccionar(self.indice.buscar_nombre(query))
+    
+    def consultar(self, texto: str) -> List[Dict[str, str]]:
+        """Consulta compuesta (ej: "tipo=PAM AND status_cita=PENDIENTE") usando los índices"""
+        return list(Consulta(texto).filtrar(self.personas, self.indice))
     
     def get_estadisticas(self) -> Dict:
-        """Genera estadísticas detalladas"""
-        stats = {
-            'total': len(self.personas),
-            'por_tipo': Counter(p.get('tipo_persona', 'SIN TIPO') or 'SIN TIPO' 
-                               for p in self.personas),
-            'por_status_cita': Counter(p.get('status_cita', 'SIN STATUS') or 'SIN STATUS' 
-                                      for p in self.personas),
-            'por_historial': Counter(p.get('historial_clinico', 'SIN DATOS') or 'SIN DATOS' 
-                                    for p in self.personas),
-            'con_telefono': sum(1 for p in self.personas if p.get('telefono_1')),
-            'sin_telefono': sum(1 for p in self.personas if not p.get('telefono_1')),
-            'con_dos_telefonos': sum(1 for p in self.personas 
-                                    if p.get('telefono_1') and p.get('telefono_2')),
-            'total_visitas': sum(int(p.get('num_visitas', 0)) for p in self.personas),
-            'promedio_visitas': 0
-        }
+        """
+        Genera estadísticas detalladas
         
-        if stats['total'] > 0:
-            stats['promedio_visitas'] = stats['total_visitas'] / stats['total']
+        Usa las estadísticas materializadas junto al archivo (personas_stats.json)
+        si siguen vigentes; si no, las calcula una vez y las guarda
+        """
+        if self.estadisticas is None:
+            # cargar() ya descarta las guardadas si el archivo cambió (huella)
+            self.estadisticas = EstadisticasPersonas.cargar(self.json_file)
+            if self.estadisticas is None:
+                self.estadisticas = EstadisticasPersonas.desde_personas(self.personas)
+                try:
+                    self.estadisticas.guardar(self.json_file)
+                except OSError:
+                    pass
         
-        return stats
+        return self.estadisticas.resumen()
     
     def print_estadisticas(self):
         """Imprime estadísticas detalladas"""
@@ -176,9 +202,9 @@ class PersonaAnalyzer:
             print(f"\n... y {len(personas) - limit} más")
 
 
-def menu_interactivo():
+def menu_interactivo(json_file: str = 'personas.json'):
     """Menú interactivo para filtrar y analizar datos"""
-    analyzer = PersonaAnalyzer()
+    analyzer = PersonaAnalyzer(json_file)
     
     if not analyzer.personas:
         return
@@ -197,6 +223,7 @@ def menu_interactivo():
         print("8.  Ver personas con 2 teléfonos")
         print("9.  Buscar por nombre")
         print("10. Ver todas las personas")
+        print("11. Consulta compuesta (ej: tipo=PAM AND status_cita=PENDIENTE)")
         print("0.  Salir")
         
         opcion = input("\nSelecciona una opción: ").strip()
@@ -269,14 +296,82 @@ def menu_interactivo():
         elif opcion == '10':
             analyzer.print_personas(analyzer.personas, limit=20)
         
+        elif opcion == '11':
+            texto = input("Consulta: ").strip()
+            try:
+                personas = analyzer.consultar(texto)
+            except ErrorConsulta as e:
+                print(f"❌ {e}")
+                personas = None
+            
+            if personas is not None:
+                analyzer.print_personas(personas)
+                if personas and input("\n¿Guardar resultados? (s/n): ").lower() == 's':
+                    filename = input("Nombre de archivo (sin extensión): ").strip() or "personas_consulta"
+                    analyzer.save_filtered(personas, filename)
+        
         else:
             print("❌ Opción no válida")
         
         input("\nPresiona Enter para continuar...")
 
 
-if __name__ == '__main__':
+def ejecutar_lote(json_file: str, ruta_lote: str) -> int:
+    """Carga e indexa una sola vez y escribe todos los extractos del archivo de lote"""
+    try:
+        extractos = [(salida, Consulta(texto)) for salida, texto in leer_lote(ruta_lote)]
+    except (OSError, ErrorConsulta) as e:
+        print(f"✗ {e}")
+        return 1
+    
+    analyzer = PersonaAnalyzer(json_file)
+    if not analyzer.personas:
+        return 1
+    
+    inicio = time.perf_counter()
+    for salida, consulta in extractos:
+        total = escribir_resultados(consulta.filtrar(analyzer.personas, analyzer.indice), salida)
+        print(f"✓ {total:6} registros -> {salida}   ({consulta.texto})")
+    print(f"\n✓ {len(extractos)} extractos en {time.perf_counter() - inicio:.2f} s")
+    return 0
+
+
+def ejecutar_consulta(json_file: str, texto: str, salida: str) -> int:
+    """Una sola consulta: recorre el archivo en streaming, sin cargarlo ni indexarlo"""
+    try:
+        consulta = Consulta(texto)
+        total = escribir_resultados(consulta.filtrar(iterar_personas(json_file)), salida)
+    except ErrorConsulta as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"✗ Error de archivo: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"✓ {total} registros -> {salida}", file=sys.stderr)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Análisis y extractos de personas.json")
+    parser.add_argument('-i', '--entrada', default='personas.json', help="Archivo JSON de personas")
+    parser.add_argument('-q', '--consulta', help="Consulta compuesta, ej: \"tipo=PAM AND telefono_1!=''\"")
+    parser.add_argument('-o', '--salida', default='-',
+                        help="Archivo de salida (.csv, .json, .jsonl); '-' = JSON por línea a stdout")
+    parser.add_argument('--lote', help="Archivo con una línea 'salida consulta' por extracto")
+    args = parser.parse_args()
+    
+    if args.lote:
+        return ejecutar_lote(args.entrada, args.lote)
+    if args.consulta:
+        return ejecutar_consulta(args.entrada, args.consulta, args.salida)
+    
     print("="*80)
     print("ANALIZADOR DE DATOS DE PERSONAS")
     print("="*80)
-    menu_interactivo()
+    menu_interactivo(args.entrada)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la transformación a formato Excel
+Compara el método anterior (registro por registro, con str(persona).upper())
+contra la transformación por columnas, y verifica que la salida sea idéntica
+
+Uso:
+    python benchmark_excel.py [num_registros]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List
+
+from generar_excel import (
+    separar_nombre,
+    calcular_estado_visita,
+    transformar_para_excel
+)
+
+
+def generar_personas(cantidad: int, semilla: int = 42) -> List[Dict[str, str]]:
+    """Genera registros sintéticos con la misma forma que personas.json"""
+    rnd = random.Random(semilla)
+    nombres = ["MARIA", "JOSE", "GUADALUPE", "JUAN", "ANA", "LUIS", "ROSA", "CARLOS"]
+    apellidos = ["LOPEZ", "PEREZ", "CANUL", "PECH", "CHAN", "MAY", "DZUL", "GOMEZ"]
+    historiales = ["SIN HISTORIAL", "COMPLETO", "PARCIAL", "RECHAZADO", ""]
+
+    personas = []
+    for i in range(cantidad):
+        partes = rnd.sample(nombres, rnd.randint(0, 2)) + rnd.sample(apellidos, rnd.randint(1, 2))
+        personas.append({
+            'nombre': " ".join(partes),
+            'inicial': partes[0][0],
+            'status_persona': rnd.choice(["ACTIVO", "INACTIVO"]),
+            'tipo_persona': rnd.choice(["PAM", "PCD", ""]),
+            'status_cita': rnd.choice(["PENDIENTE", "COMPLETADA", "VISITA RECHAZADA"]),
+            'direccion': f"CALLE {i % 90} # {i % 500}, Col. CENTRO, Mun. MERIDA, Edo. YUCATAN,",
+            'telefono_1': rnd.choice(["", "9991234567"]),
+            'telefono_2': "",
+            'historial_clinico': rnd.choice(historiales),
+            'num_visitas': rnd.choice(["0", "1", "2", "x"]),
+            'archivo_origen': f"view{i % 66}.xml"
+        })
+    return personas
+
+
+def transformar_por_registro(personas: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Método anterior: separar_nombre + calcular_estado_visita por cada registro"""
+    personas_excel = []
+    for persona in personas:
+        nombres, paterno, materno = separar_nombre(persona.get('nombre', ''))
+        telefono = persona.get('telefono_1', '').strip()
+        personas_excel.append({
+            'Nombre(s)': nombres,
+            'Paterno': paterno,
+            'Materno': materno,
+            'Domicilio': persona.get('direccion', ''),
+            'Teléfono': telefono if telefono else 'SIN NUMERO',
+            'No': calcular_estado_visita(persona)
+        })
+    return personas_excel
+
+
+def medir(funcion, personas, repeticiones: int = 3):
+    """Mejor tiempo de varias repeticiones"""
+    mejor, resultado = None, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(personas)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("="*80)
+    print(f"BENCHMARK TRANSFORMACIÓN EXCEL ({cantidad:,} registros)")
+    print("="*80)
+
+    personas = generar_personas(cantidad)
+
+    t_registro, por_registro = medir(transformar_por_registro, personas)
+    t_columnas, por_columnas = medir(transformar_para_excel, personas)
+
+    print(f"  Registro por registro : {t_registro:8.3f} s")
+    print(f"  Por columnas          : {t_columnas:8.3f} s")
+    print(f"  Aceleración           : {t_registro / t_columnas:8.2f}x")
+
+    if por_registro == por_columnas:
+        print("\n✓ Salida idéntica")
+    else:
+        print("\n✗ Las salidas NO coinciden")
+        return 1
+
+    print("="*80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lenguaje de consultas compuestas sobre personas
+
+Ejemplos:
+    tipo=PAM AND status_cita=PENDIENTE AND telefono_1!=''
+    (tipo=PCD OR tipo=PAM) AND NOT historial=COMPLETO
+    nombre~LOPEZ AND visitas>=1
+
+Operadores:
+    =  !=       igualdad sin distinguir mayúsculas ('' = campo vacío)
+    ~  !~       contiene / no contiene (sin distinguir mayúsculas)
+    > < >= <=   comparación numérica (valores no numéricos cuentan como 0)
+    AND OR NOT  y paréntesis; AND tiene prioridad sobre OR
+
+La consulta se compila UNA vez en un solo predicado. Si hay índices
+(IndicePersonas), las comparaciones indexables reducen primero los candidatos
+y el predicado completo se aplica en una sola pasada sobre ellos.
+"""
+
+import csv
+import json
+import re
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from indices_personas import IndicePersonas
+from lectura_personas import CAMPOS
+
+# Nombres cortos aceptados en las consultas
+ALIAS = {
+    'tipo': 'tipo_persona',
+    'status': 'status_cita',
+    'cita': 'status_cita',
+    'historial': 'historial_clinico',
+    'visitas': 'num_visitas',
+    'telefono': 'telefono_1',
+    'origen': 'archivo_origen',
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<parentesis>[()])
+      | (?P<operador>!=|!~|>=|<=|=|~|>|<)
+      | '(?P<comilla_simple>[^']*)'
+      | "(?P<comilla_doble>[^"]*)"
+      | (?P<palabra>[^\s()=!<>~'"]+)
+    )""", re.VERBOSE)
+
+_PALABRAS_CLAVE = {'AND', 'OR', 'NOT'}
+
+Predicado = Callable[[Dict[str, str]], bool]
+
+
+class ErrorConsulta(ValueError):
+    """La consulta no se pudo interpretar"""
+
+
+def _entero_seguro(valor) -> int:
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _tokenizar(texto: str) -> List[tuple]:
+    """Lista de (tipo, valor); tipo: '(' ')' 'op' 'clave' 'valor'"""
+    tokens = []
+    pos = 0
+    texto = texto.rstrip()
+    while pos < len(texto):
+        m = _TOKEN.match(texto, pos)
+        if not m or m.end() == pos:
+            raise ErrorConsulta(f"Carácter inesperado en la posición {pos}: {texto[pos:pos + 10]!r}")
+        pos = m.end()
+
+        if m.group('parentesis'):
+            tokens.append((m.group('parentesis'), m.group('parentesis')))
+        elif m.group('operador'):
+            tokens.append(('op', m.group('operador')))
+        elif m.group('comilla_simple') is not None:
+            tokens.append(('valor', m.group('comilla_simple')))
+        elif m.group('comilla_doble') is not None:
+            tokens.append(('valor', m.group('comilla_doble')))
+        elif m.group('palabra').upper() in _PALABRAS_CLAVE:
+            tokens.append(('clave', m.group('palabra').upper()))
+        else:
+            tokens.append(('valor', m.group('palabra')))
+    return tokens
+
+
+class _Nodo:
+    """Nodo compilado: predicado por registro + candidatos desde los índices"""
+
+    def predicado(self) -> Predicado:
+        raise NotImplementedError
+
+    def candidatos(self, indice: IndicePersonas) -> Optional[Sequence[int]]:
+        """Posiciones ordenadas que PUEDEN cumplir (None = no se sabe, todas)"""
+        return None
+
+
+class _Comparacion(_Nodo):
+    def __init__(self, campo: str, operador: str, valor: str):
+        self.campo = campo
+        self.operador = operador
+        self.valor = valor
+
+    def predicado(self) -> Predicado:
+        campo, valor = self.campo, self.valor.upper()
+
+        if self.operador in ('=', '!='):
+            igual = self.operador == '='
+            return lambda p: ((p.get(campo) or '').upper() == valor) == igual
+
+        if self.operador in ('~', '!~'):
+            contiene = self.operador == '~'
+            return lambda p: (valor in (p.get(campo) or '').upper()) == contiene
+
+        numero = _entero_seguro(self.valor)
+        comparar = {
+            '>': lambda x: x > numero,
+            '<': lambda x: x < numero,
+            '>=': lambda x: x >= numero,
+            '<=': lambda x: x <= numero,
+        }[self.operador]
+        return lambda p: comparar(_entero_seguro(p.get(campo, 0)))
+
+    def candidatos(self, indice: IndicePersonas) -> Optional[Sequence[int]]:
+        if self.operador == '=' and self.campo in indice.por_campo:
+            return indice.buscar_valor(self.campo, self.valor)
+        if self.operador == '~' and self.campo == 'nombre':
+            return indice.buscar_nombre(self.valor)
+        if self.operador == '!=' and self.valor == '' and self.campo == 'telefono_1':
+            return indice.con_telefono_1
+        return None
+
+
+class _Y(_Nodo):
+    def __init__(self, hijos: List[_Nodo]):
+        self.hijos = hijos
+
+    def predicado(self) -> Predicado:
+        predicados = [h.predicado() for h in self.hijos]
+        return lambda p: all(pred(p) for pred in predicados)
+
+    def candidatos(self, indice: IndicePersonas) -> Optional[Sequence[int]]:
+        listas = [c for c in (h.candidatos(indice) for h in self.hijos) if c is not None]
+        if not listas:
+            return None
+        listas.sort(key=len)
+        resultado = listas[0]
+        for otra in listas[1:]:
+            conjunto = set(otra)
+            resultado = [i for i in resultado if i in conjunto]
+        return resultado
+
+
+class _O(_Nodo):
+    def __init__(self, hijos: List[_Nodo]):
+        self.hijos = hijos
+
+    def predicado(self) -> Predicado:
+        predicados = [h.predicado() for h in self.hijos]
+        return lambda p: any(pred(p) for pred in predicados)
+
+    def candidatos(self, indice: IndicePersonas) -> Optional[Sequence[int]]:
+        listas = [h.candidatos(indice) for h in self.hijos]
+        if any(c is None for c in listas):
+            return None
+        return sorted(set().union(*listas))
+
+
+class _No(_Nodo):
+    def __init__(self, hijo: _Nodo):
+        self.hijo = hijo
+
+    def predicado(self) -> Predicado:
+        pred = self.hijo.predicado()
+        return lambda p: not pred(p)
+
+
+class _Analizador:
+    """Descenso recursivo: o := y (OR y)* ; y := no (AND no)* ; no := NOT no | ( o ) | comparación"""
+
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _ver(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _tomar(self):
+        token = self._ver()
+        self.pos += 1
+        return token
+
+    def analizar(self) -> _Nodo:
+        if not self.tokens:
+            raise ErrorConsulta("Consulta vacía")
+        nodo = self._o()
+        if self.pos < len(self.tokens):
+            raise ErrorConsulta(f"Sobra texto a partir de {self._ver()[1]!r}")
+        return nodo
+
+    def _o(self) -> _Nodo:
+        hijos = [self._y()]
+        while self._ver() == ('clave', 'OR'):
+            self._tomar()
+            hijos.append(self._y())
+        return hijos[0] if len(hijos) == 1 else _O(hijos)
+
+    def _y(self) -> _Nodo:
+        hijos = [self._no()]
+        while self._ver() == ('clave', 'AND'):
+            self._tomar()
+            hijos.append(self._no())
+        return hijos[0] if len(hijos) == 1 else _Y(hijos)
+
+    def _no(self) -> _Nodo:
+        tipo, valor = self._ver()
+        if (tipo, valor) == ('clave', 'NOT'):
+            self._tomar()
+            return _No(self._no())
+        if tipo == '(':
+            self._tomar()
+            nodo = self._o()
+            if self._tomar()[0] != ')':
+                raise ErrorConsulta("Falta cerrar un paréntesis")
+            return nodo
+        return self._comparacion()
+
+    def _comparacion(self) -> _Nodo:
+        tipo, campo = self._tomar()
+        if tipo != 'valor':
+            raise ErrorConsulta(f"Se esperaba un campo y llegó {campo!r}")
+        campo = ALIAS.get(campo.lower(), campo.lower())
+        if campo not in CAMPOS:
+            raise ErrorConsulta(f"Campo desconocido: {campo!r} (válidos: {', '.join(CAMPOS)})")
+
+        tipo, operador = self._tomar()
+        if tipo != 'op':
+            raise ErrorConsulta(f"Se esperaba un operador después de {campo!r}")
+
+        tipo, valor = self._tomar()
+        if tipo != 'valor':
+            raise ErrorConsulta(f"Se esperaba un valor después de {campo}{operador}")
+        return _Comparacion(campo, operador, valor)
+
+
+class Consulta:
+    """Consulta compilada: se reutiliza en tantas pasadas como haga falta"""
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self._arbol = _Analizador(_tokenizar(texto)).analizar()
+        self.predicado = self._arbol.predicado()
+
+    def filtrar(self, personas: Iterable[Dict[str, str]],
+                indice: Optional[IndicePersonas] = None) -> Iterator[Dict[str, str]]:
+        """
+        Registros que cumplen la consulta, en el orden original (generador)
+
+        Con índice, personas debe ser la lista sobre la que se construyó
+        """
+        predicado = self.predicado
+        candidatos = self._arbol.candidatos(indice) if indice is not None else None
+
+        if candidatos is None:
+            return (p for p in personas if predicado(p))
+        return (personas[i] for i in candidatos if predicado(personas[i]))
+
+    def __repr__(self):
+        return f"Consulta({self.texto!r})"
+
+
+def escribir_resultados(personas: Iterable[Dict[str, str]], ruta: str) -> int:
+    """
+    Escribe los registros conforme llegan (sin juntarlos en una lista)
+
+    Formato según la extensión: .csv, .jsonl (un registro por línea) o JSON;
+    '-' escribe JSON por línea en la salida estándar
+
+    Returns:
+        Número de registros escritos
+    """
+    total = 0
+    if ruta == '-':
+        for persona in personas:
+            sys.stdout.write(json.dumps(persona, ensure_ascii=False) + "\n")
+            total += 1
+        return total
+
+    if ruta.lower().endswith('.csv'):
+        with open(ruta, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=CAMPOS, extrasaction='ignore')
+            writer.writeheader()
+            for persona in personas:
+                writer.writerow(persona)
+                total += 1
+        return total
+
+    with open(ruta, 'w', encoding='utf-8') as f:
+        if ruta.lower().endswith('.jsonl'):
+            for persona in personas:
+                f.write(json.dumps(persona, ensure_ascii=False) + "\n")
+                total += 1
+            return total
+
+        # Arreglo JSON con el mismo formato que json.dump(..., indent=2)
+        for persona in personas:
+            texto = json.dumps(persona, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write(("[\n  " if total == 0 else ",\n  ") + texto)
+            total += 1
+        f.write("\n]" if total else "[]")
+    return total
+
+
+def leer_lote(ruta: str) -> List[tuple]:
+    """
+    Archivo de extractos: una línea por extracto, "salida consulta"
+    (el primer espacio separa el archivo de salida de la consulta; # = comentario)
+
+        pam_pendientes.csv   tipo=PAM AND status_cita=PENDIENTE AND telefono_1!=''
+        sin_telefono.json    telefono_1='' AND telefono_2=''
+    """
+    extractos = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for numero, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if not linea or linea.startswith('#'):
+                continue
+            partes = linea.split(None, 1)
+            if len(partes) != 2:
+                raise ErrorConsulta(f"{ruta}:{numero}: se esperaba 'salida consulta'")
+            extractos.append((partes[0], partes[1]))
+    return extractos
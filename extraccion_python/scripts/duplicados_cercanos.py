@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección de personas casi duplicadas (acentos, espacios dobles, letras
+mal leídas entre dumps) sin comparar todos contra todos
+
+1. Bloqueo: cada persona entra en 3 bloques por clave normalizada
+   (nombre+paterno, nombre+materno, paterno+materno). Un error en UNA palabra
+   deja al menos una clave intacta, así que el par queda en un bloque común.
+   Todos los pares de palabras comparten espacio de claves: un nombre con una
+   palabra de menos ("MARIA GARCIA" / "MARIA GARCIA LOPEZ") también se compara
+2. Bloques grandes (apellidos comunes): vecindario ordenado, solo se comparan
+   las personas a distancia <= VENTANA en el orden alfabético del bloque
+3. Solo los pares candidatos pasan a la comparación difusa: las palabras deben
+   coincidir salvo UNA, y esa debe estar a pocas ediciones (Levenshtein acotado)
+
+Uso:
+    python duplicados_cercanos.py [personas.json] [--umbral 0.88]
+"""
+
+import argparse
+import json
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_DIR = SCRIPT_DIR.parent
+
+# Normalización única de nombres compartida con el bot de extracción de CURP
+sys.path.insert(0, str(PROJECT_DIR.parent / "extraccion_curp" / "bot"))
+from identidad import clave_canonica
+
+UMBRAL_DEFAULT = 0.88       # Puntuación mínima para sugerir unir dos registros
+MAX_BLOQUE = 40             # Bloques más grandes se recorren por vecindario
+VENTANA = 6                 # Vecinos comparados en bloques grandes
+BONO_CONTACTO = 0.05        # Mismo teléfono / misma dirección suben la puntuación
+PUNTUACION_SIN_ESPACIOS = 0.97   # Mismas letras, distinta separación ("DE LA" / "DELA")
+PUNTUACION_FALTA_NOMBRE = 0.8    # Un nombre de más/de menos (solo pasa con bonos de contacto)
+
+CAMPOS_CONTEO = [
+    'status_persona', 'tipo_persona', 'status_cita',
+    'direccion', 'telefono_1', 'telefono_2', 'historial_clinico', 'num_visitas'
+]
+
+
+def claves_bloqueo(palabras: List[str]) -> List[str]:
+    """
+    Claves de bloque: nombre+paterno, nombre+materno, paterno+materno
+    (los 2 últimos son apellidos, como en generar_excel.separar_nombre)
+
+    Los pares van en un solo espacio ("D:"): con 2 palabras el par completo
+    coincide con alguno de los 3 pares del mismo nombre con una palabra más.
+    Con 2 palabras cada una además va sola, para que un error de lectura en
+    la otra no las separe
+    """
+    if len(palabras) < 2:
+        return [f"U:{palabras[0]}"] if palabras else []
+    if len(palabras) == 2:
+        return [f"N:{palabras[0]}", f"P:{palabras[1]}", f"D:{palabras[0]} {palabras[1]}"]
+    nombre, paterno, materno = palabras[0], palabras[-2], palabras[-1]
+    # Sin repetidas (paterno == materno): la persona entraría dos veces al mismo bloque
+    return list(dict.fromkeys([f"D:{nombre} {paterno}", f"D:{nombre} {materno}",
+                               f"D:{paterno} {materno}"]))
+
+
+def pares_candidatos(claves: List[str]) -> Set[Tuple[int, int]]:
+    """Pares (i, j), i < j, que comparten algún bloque"""
+    bloques: Dict[str, List[int]] = {}
+    for i, clave in enumerate(claves):
+        if not clave:
+            continue
+        for bloque in claves_bloqueo(clave.split('_')):
+            bloques.setdefault(bloque, []).append(i)
+
+    pares: Set[Tuple[int, int]] = set()
+    for miembros in bloques.values():
+        if len(miembros) < 2:
+            continue
+        if len(miembros) <= MAX_BLOQUE:
+            pares.update(combinations(miembros, 2))
+            continue
+        # Vecindario ordenado: nombres parecidos quedan cerca al ordenar
+        ordenados = sorted(miembros, key=claves.__getitem__)
+        for pos, i in enumerate(ordenados):
+            for j in ordenados[pos + 1:pos + 1 + VENTANA]:
+                pares.add((i, j) if i < j else (j, i))
+    return pares
+
+
+def campos_llenos(persona: Dict[str, str]) -> int:
+    """Mismo criterio que PersonaExtractor.count_filled_fields"""
+    return sum(1 for campo in CAMPOS_CONTEO if (persona.get(campo) or '').strip())
+
+
+def distancia_acotada(a: str, b: str, maximo: int) -> int:
+    """Levenshtein entre a y b; devuelve maximo + 1 en cuanto se pasa del máximo"""
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior = actual
+    return anterior[-1]
+
+
+def ediciones_permitidas(palabra: str) -> int:
+    """Palabras cortas solo admiten 1 letra distinta ("ANA" / "EVA" no son la misma)"""
+    return 1 if len(palabra) < 6 else 2
+
+
+def similitud_nombres(a: str, b: str) -> Tuple[float, str]:
+    """
+    Similitud 0..1 entre dos claves canónicas (palabras separadas por '_')
+    """
+    return _similitud(a, b, a.replace('_', ''), b.replace('_', ''),
+                      frozenset(a.split('_')), frozenset(b.split('_')))
+
+
+def _similitud(a: str, b: str, sin_a: str, sin_b: str,
+               palabras_a: frozenset, palabras_b: frozenset) -> Tuple[float, str]:
+    """similitud_nombres con las partes ya calculadas (se calculan una vez por registro)"""
+    if a == b:
+        return 1.0, "mismo nombre normalizado"
+    if sin_a == sin_b:
+        return PUNTUACION_SIN_ESPACIOS, "mismas letras, distinta separación"
+
+    solo_a, solo_b = palabras_a - palabras_b, palabras_b - palabras_a
+
+    if len(solo_a) + len(solo_b) == 1:
+        return PUNTUACION_FALTA_NOMBRE, "un nombre de más"
+    if len(solo_a) != 1 or len(solo_b) != 1:
+        return 0.0, ""
+
+    # Una sola palabra distinta: ¿error de lectura?
+    (pa,), (pb,) = solo_a, solo_b
+    maximo = ediciones_permitidas(min(pa, pb, key=len))
+    distancia = distancia_acotada(pa, pb, maximo)
+    if distancia > maximo:
+        return 0.0, ""
+    return 1 - distancia / max(len(sin_a), len(sin_b)), f"{pa}/{pb} a {distancia} letra(s)"
+
+
+def puntuar(similitud: Tuple[float, str], persona_a: Dict[str, str],
+            persona_b: Dict[str, str]) -> Tuple[float, List[str]]:
+    """
+    Puntuación 0..1: similitud del nombre + bono si coinciden teléfono o dirección
+    """
+    puntuacion, motivo = similitud
+    if puntuacion == 0:
+        return 0.0, []
+    motivos = [motivo]
+
+    telefono = persona_a.get('telefono_1')
+    if telefono and telefono == persona_b.get('telefono_1'):
+        puntuacion += BONO_CONTACTO
+        motivos.append("mismo teléfono")
+    direccion = (persona_a.get('direccion') or '').strip()
+    if direccion and direccion == (persona_b.get('direccion') or '').strip():
+        puntuacion += BONO_CONTACTO
+        motivos.append("misma dirección")
+
+    return min(1.0, puntuacion), motivos
+
+
+def detectar_duplicados(personas: List[Dict[str, str]], umbral: float = UMBRAL_DEFAULT) -> Dict:
+    """
+    Busca registros que probablemente son la misma persona
+
+    Returns:
+        Dict con 'sugerencias' (ordenadas por puntuación) y métricas del proceso
+    """
+    inicio = time.perf_counter()
+    claves = [clave_canonica(p.get('nombre') or '') for p in personas]
+    pares = pares_candidatos(claves)
+    t_bloqueo = time.perf_counter() - inicio
+
+    sin_espacios = [c.replace('_', '') for c in claves]
+    palabras = [frozenset(c.split('_')) for c in claves]
+
+    sugerencias = []
+    for i, j in pares:
+        similitud = _similitud(claves[i], claves[j], sin_espacios[i], sin_espacios[j], palabras[i], palabras[j])
+        if similitud[0] + 2 * BONO_CONTACTO < umbral:
+            continue
+        puntuacion, motivos = puntuar(similitud, personas[i], personas[j])
+        if puntuacion < umbral:
+            continue
+
+        # Se sugiere conservar el registro con más información (como en la extracción)
+        conservar, descartar = (i, j) if campos_llenos(personas[i]) >= campos_llenos(personas[j]) else (j, i)
+        sugerencias.append({
+            'puntuacion': round(puntuacion, 3),
+            'conservar': {'indice': conservar, 'nombre': personas[conservar].get('nombre', ''),
+                          'archivo_origen': personas[conservar].get('archivo_origen', '')},
+            'descartar': {'indice': descartar, 'nombre': personas[descartar].get('nombre', ''),
+                          'archivo_origen': personas[descartar].get('archivo_origen', '')},
+            'motivos': motivos
+        })
+
+    sugerencias.sort(key=lambda s: (-s['puntuacion'], s['conservar']['indice'], s['descartar']['indice']))
+    return {
+        'total_registros': len(personas),
+        'pares_comparados': len(pares),
+        'umbral': umbral,
+        'segundos_bloqueo': round(t_bloqueo, 3),
+        'segundos_total': round(time.perf_counter() - inicio, 3),
+        'sugerencias': sugerencias
+    }
+
+
+def grupos_de_sugerencias(sugerencias: List[Dict]) -> Iterator[List[int]]:
+    """Une sugerencias encadenadas (A~B, B~C) en grupos de índices"""
+    padre: Dict[int, int] = {}
+
+    def raiz(x: int) -> int:
+        while padre.setdefault(x, x) != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for s in sugerencias:
+        padre[raiz(s['conservar']['indice'])] = raiz(s['descartar']['indice'])
+
+    grupos: Dict[int, List[int]] = {}
+    for x in padre:
+        grupos.setdefault(raiz(x), []).append(x)
+    for miembros in grupos.values():
+        yield sorted(miembros)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sugerencias de personas casi duplicadas")
+    parser.add_argument('entrada', nargs='?', default='../json/personas.json', help="Archivo JSON de personas")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_DEFAULT, help="Puntuación mínima (0-1)")
+    parser.add_argument('-o', '--salida', default='../json/duplicados_sugeridos.json')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("DETECCIÓN DE DUPLICADOS CERCANOS")
+    print("="*80)
+
+    try:
+        with open(args.entrada, 'r', encoding='utf-8') as f:
+            personas = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"\n✗ No se pudo leer {args.entrada}: {e}")
+        return 1
+
+    resultado = detectar_duplicados(personas, args.umbral)
+    sugerencias = resultado['sugerencias']
+    grupos = list(grupos_de_sugerencias(sugerencias))
+
+    print(f"\n✓ {resultado['total_registros']} registros, {resultado['pares_comparados']} pares candidatos")
+    print(f"  (bloqueo {resultado['segundos_bloqueo']:.2f} s, total {resultado['segundos_total']:.2f} s)")
+    print(f"\n🔎 Sugerencias de unión: {len(sugerencias)} pares en {len(grupos)} grupos")
+
+    for s in sugerencias[:20]:
+        print(f"  {s['puntuacion']:.2f}  {s['conservar']['nombre']!r:40} <- {s['descartar']['nombre']!r}"
+              f"  ({', '.join(s['motivos'])})")
+    if len(sugerencias) > 20:
+        print(f"  ... y {len(sugerencias) - 20} más")
+
+    try:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(dict(resultado, grupos=grupos), f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Sugerencias guardadas en {args.salida}")
+    except OSError as e:
+        print(f"\n✗ Error al guardar sugerencias: {e}")
+        return 1
+
+    print("="*80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
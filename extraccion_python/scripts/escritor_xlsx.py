@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escritor XLSX en streaming (solo escritura, solo biblioteca estándar)
+- Las filas se convierten a XML y se escriben por lotes: memoria constante
+- La primera hoja se escribe directo dentro del zip
+- Las demás hojas se llenan en la MISMA pasada en archivos temporales y se
+  copian al zip al cerrar (zipfile solo permite una entrada abierta a la vez)
+- Textos como "inline strings": no hace falta tabla de cadenas compartidas
+  (con xml:space="preserve" para no perder espacios al inicio o al final)
+
+Uso:
+    with EscritorXLSX('salida.xlsx', ['TODOS', 'VISITADO']) as libro:
+        libro.encabezado(['Nombre', 'Estado'])
+        libro.agregar_filas('TODOS', [['MARIA', 'VISITADO']])
+"""
+
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+# Caracteres que XML 1.0 no permite (Excel marcaría el archivo como dañado)
+_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+# Igual pero sin \x00, que se usa como separador al escapar un lote completo
+_INVALIDOS_LOTE = re.compile('[\x01-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{hojas}'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+# Estilo 1 = encabezado en negritas
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+_INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_FIN_HOJA = '</sheetData></worksheet>'
+
+
+def letra_columna(indice: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def texto_xml(valor) -> str:
+    """Valor de celda escapado para XML"""
+    if valor is None:
+        return ''
+    return escape(_INVALIDOS_XML.sub('', str(valor)))
+
+
+class EscritorXLSX:
+    """
+    Libro XLSX de solo escritura con varias hojas llenadas en una sola pasada
+    """
+
+    def __init__(self, ruta: str, hojas: List[str]):
+        if not hojas:
+            raise ValueError("Se necesita al menos una hoja")
+
+        self.ruta = ruta
+        self.hojas = list(hojas)
+        self.filas: Dict[str, int] = {hoja: 0 for hoja in self.hojas}
+        self._plantillas: Dict[Tuple[int, str], str] = {}
+
+        self._zip = zipfile.ZipFile(ruta, 'w', compression=zipfile.ZIP_DEFLATED)
+
+        # La primera hoja va directo al zip; las demás a temporales en disco
+        self._salidas = {self.hojas[0]: self._zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)}
+        for hoja in self.hojas[1:]:
+            self._salidas[hoja] = tempfile.TemporaryFile()
+
+        for salida in self._salidas.values():
+            salida.write(_INICIO_HOJA.encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+
+    def _plantilla(self, ancho: int, estilo: str = '') -> str:
+        """Plantilla de fila para str.format: {0} = número de fila, {1..n} = celdas"""
+        plantilla = self._plantillas.get((ancho, estilo))
+        if plantilla is None:
+            celdas = ''.join(f'<c r="{letra_columna(i)}{{0}}" t="inlineStr"{estilo}>'
+                             f'<is><t xml:space="preserve">{{{i + 1}}}</t></is></c>'
+                             for i in range(ancho))
+            plantilla = self._plantillas[(ancho, estilo)] = f'<row r="{{0}}">{celdas}</row>'
+        return plantilla
+
+    def agregar_filas(self, hoja: str, filas: Iterable[Sequence], estilo: str = ''):
+        """
+        Agrega un lote de filas a la hoja con UNA escritura
+
+        Los textos del lote se escapan juntos: si ninguno trae caracteres
+        inválidos (lo normal) basta un solo escape sobre el texto unido
+        """
+        filas = list(filas)
+        if not filas:
+            return
+
+        valores = ['' if v is None else str(v) for fila in filas for v in fila]
+        unido = '\x00'.join(valores)
+        if unido.count('\x00') == len(valores) - 1 and not _INVALIDOS_LOTE.search(unido):
+            escapados = escape(unido).split('\x00')
+        else:
+            escapados = [texto_xml(v) for v in valores]
+
+        numero = self.filas[hoja]
+        partes = []
+        pos = 0
+        for fila in filas:
+            ancho = len(fila)
+            numero += 1
+            partes.append(self._plantilla(ancho, estilo).format(numero, *escapados[pos:pos + ancho]))
+            pos += ancho
+        self.filas[hoja] = numero
+        self._salidas[hoja].write(''.join(partes).encode('utf-8'))
+
+    def agregar_fila(self, hoja: str, valores: Sequence):
+        """Agrega una sola fila (para muchas filas usar agregar_filas)"""
+        self.agregar_filas(hoja, [valores])
+
+    def encabezado(self, columnas: Sequence[str], hojas: Optional[List[str]] = None):
+        """Escribe la fila de encabezado (en negritas) en las hojas indicadas (todas por defecto)"""
+        for hoja in (hojas or self.hojas):
+            self.agregar_filas(hoja, [columnas], estilo=' s="1"')
+
+    def cerrar(self):
+        """Cierra las hojas, copia las temporales al zip y escribe el resto del paquete"""
+        if self._zip is None:
+            return
+
+        for salida in self._salidas.values():
+            salida.write(_FIN_HOJA.encode('utf-8'))
+
+        # Hoja 1: ya está dentro del zip
+        self._salidas[self.hojas[0]].close()
+
+        # Hojas 2..n: copia por bloques desde el temporal
+        for numero, hoja in enumerate(self.hojas[1:], start=2):
+            temporal = self._salidas[hoja]
+            temporal.seek(0)
+            with self._zip.open(f'xl/worksheets/sheet{numero}.xml', 'w', force_zip64=True) as destino:
+                shutil.copyfileobj(temporal, destino, 1 << 20)
+            temporal.close()
+
+        self._escribir_paquete()
+        self._zip.close()
+        self._zip = None
+
+    def _escribir_paquete(self):
+        """Partes fijas del XLSX: tipos, relaciones, libro y estilos"""
+        overrides = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(self.hojas) + 1)
+        )
+        hojas = ''.join(
+            f'<sheet name="{texto_xml(nombre[:31])}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, nombre in enumerate(self.hojas, start=1)
+        )
+        relaciones = ''.join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self.hojas) + 1)
+        )
+        id_estilos = len(self.hojas) + 1
+
+        self._zip.writestr('[Content_Types].xml', _CONTENT_TYPES.format(hojas=overrides))
+        self._zip.writestr('_rels/.rels', _RELS)
+        self._zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{hojas}</sheets></workbook>'
+        ))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relaciones}'
+            f'<Relationship Id="rId{id_estilos}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        self._zip.writestr('xl/styles.xml', _STYLES)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estadísticas agregadas de personas, mantenidas por deltas
+- Se actualizan al agregar, reemplazar o quitar un registro (O(1) por cambio)
+- Se guardan junto al archivo de datos (personas_stats.json) con la huella
+  del archivo (tamaño + mtime): si el archivo cambió por fuera, se recalculan
+  en una sola pasada en streaming
+- Consultarlas no recorre los datos
+"""
+
+import json
+import os
+from collections import Counter
+from typing import Dict, Optional
+
+from lectura_personas import iterar_personas
+
+
+def _entero_seguro(valor) -> int:
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+def ruta_estadisticas(ruta_datos: str) -> str:
+    """personas.json -> personas_stats.json (en la misma carpeta)"""
+    base, _ = os.path.splitext(ruta_datos)
+    return f"{base}_stats.json"
+
+
+def huella_archivo(ruta_datos: str) -> Optional[Dict[str, int]]:
+    try:
+        info = os.stat(ruta_datos)
+    except OSError:
+        return None
+    return {'tamano': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+class EstadisticasPersonas:
+    """Contadores materializados sobre el conjunto de personas"""
+
+    def __init__(self):
+        self.total = 0
+        self.por_tipo = Counter()
+        self.por_status_cita = Counter()
+        self.por_historial = Counter()
+        self.por_origen = Counter()
+        self.con_telefono = 0
+        self.con_dos_telefonos = 0
+        self.total_visitas = 0
+
+    # === DELTAS ===
+
+    def _aplicar(self, persona: Dict[str, str], signo: int):
+        self.total += signo
+        self.por_tipo[persona.get('tipo_persona', 'SIN TIPO') or 'SIN TIPO'] += signo
+        self.por_status_cita[persona.get('status_cita', 'SIN STATUS') or 'SIN STATUS'] += signo
+        self.por_historial[persona.get('historial_clinico', 'SIN DATOS') or 'SIN DATOS'] += signo
+        self.por_origen[persona.get('archivo_origen', 'desconocido')] += signo
+        if persona.get('telefono_1'):
+            self.con_telefono += signo
+            if persona.get('telefono_2'):
+                self.con_dos_telefonos += signo
+        self.total_visitas += signo * _entero_seguro(persona.get('num_visitas', 0))
+
+    def agregar(self, persona: Dict[str, str]):
+        self._aplicar(persona, 1)
+
+    def quitar(self, persona: Dict[str, str]):
+        self._aplicar(persona, -1)
+
+    def reemplazar(self, anterior: Dict[str, str], nueva: Dict[str, str]):
+        self._aplicar(anterior, -1)
+        self._aplicar(nueva, 1)
+
+    # === CONSULTA ===
+
+    @property
+    def sin_telefono(self) -> int:
+        return self.total - self.con_telefono
+
+    @property
+    def promedio_visitas(self) -> float:
+        return self.total_visitas / self.total if self.total > 0 else 0
+
+    def resumen(self) -> Dict:
+        """Mismo formato que PersonaAnalyzer.get_estadisticas (contadores sin ceros)"""
+        return {
+            'total': self.total,
+            'por_tipo': +self.por_tipo,
+            'por_status_cita': +self.por_status_cita,
+            'por_historial': +self.por_historial,
+            'con_telefono': self.con_telefono,
+            'sin_telefono': self.sin_telefono,
+            'con_dos_telefonos': self.con_dos_telefonos,
+            'total_visitas': self.total_visitas,
+            'promedio_visitas': self.promedio_visitas
+        }
+
+    # === PERSISTENCIA ===
+
+    @classmethod
+    def desde_personas(cls, personas) -> 'EstadisticasPersonas':
+        """Calcula todo en una pasada (personas puede ser un generador)"""
+        estadisticas = cls()
+        for persona in personas:
+            estadisticas.agregar(persona)
+        return estadisticas
+
+    def guardar(self, ruta_datos: str):
+        """Guarda las estadísticas con la huella ACTUAL del archivo de datos"""
+        datos = {
+            'huella': huella_archivo(ruta_datos),
+            'total': self.total,
+            'por_tipo': dict(+self.por_tipo),
+            'por_status_cita': dict(+self.por_status_cita),
+            'por_historial': dict(+self.por_historial),
+            'por_origen': dict(+self.por_origen),
+            'con_telefono': self.con_telefono,
+            'con_dos_telefonos': self.con_dos_telefonos,
+            'total_visitas': self.total_visitas
+        }
+        ruta = ruta_estadisticas(ruta_datos)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta_datos: str) -> Optional['EstadisticasPersonas']:
+        """Estadísticas guardadas, o None si no existen o el archivo de datos cambió"""
+        huella = huella_archivo(ruta_datos)
+        try:
+            with open(ruta_estadisticas(ruta_datos), 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if huella is None or datos.get('huella') != huella:
+            return None
+
+        estadisticas = cls()
+        estadisticas.total = datos['total']
+        estadisticas.por_tipo = Counter(datos['por_tipo'])
+        estadisticas.por_status_cita = Counter(datos['por_status_cita'])
+        estadisticas.por_historial = Counter(datos['por_historial'])
+        estadisticas.por_origen = Counter(datos['por_origen'])
+        estadisticas.con_telefono = datos['con_telefono']
+        estadisticas.con_dos_telefonos = datos['con_dos_telefonos']
+        estadisticas.total_visitas = datos['total_visitas']
+        return estadisticas
+
+    @classmethod
+    def obtener(cls, ruta_datos: str) -> 'EstadisticasPersonas':
+        """Las guardadas si siguen vigentes; si no, se recalculan (streaming) y se guardan"""
+        estadisticas = cls.cargar(ruta_datos)
+        if estadisticas is None:
+            estadisticas = cls.desde_personas(iterar_personas(ruta_datos))
+            try:
+                estadisticas.guardar(ruta_datos)
+            except OSError:
+                pass
+        return estadisticas
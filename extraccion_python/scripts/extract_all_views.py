@@ -14,12 +14,16 @@ import os
 from typing import List, Dict
 from pathlib import Path
 
+from estadisticas_personas import EstadisticasPersonas
+
 
 class PersonaExtractor:
     """Clase para extraer información de personas del XML de Android UI"""
     
     def __init__(self):
         self.personas: List[Dict[str, str]] = []
+        # Se actualizan con cada alta/reemplazo (no se recorren los datos para el resumen)
+        self.estadisticas = EstadisticasPersonas()
     
     def parse_info_text(self, text: str) -> Dict[str, str]:
         """Parsea el texto de información que contiene status y dirección"""
@@ -275,6 +279,7 @@ class PersonaExtractor:
                             if new_fields > existing_fields:
                                 # El nuevo registro tiene más información, reemplazar
                                 self.personas[duplicate_idx] = persona
+                                self.estadisticas.reemplazar(existing, persona)
                                 duplicados_reemplazados += 1
                             else:
                                 # El registro existente es mejor o igual, ignorar el nuevo
@@ -282,10 +287,12 @@ class PersonaExtractor:
                         else:
                             # No existe, agregar
                             self.personas.append(persona)
+                            self.estadisticas.agregar(persona)
                             nuevas += 1
                     else:
                         # No verificar duplicados, solo agregar si está completo
                         self.personas.append(persona)
+                        self.estadisticas.agregar(persona)
                         nuevas += 1
                 
                 print(f"  ✓ Encontradas {len(personas_file)} personas")
@@ -309,6 +316,8 @@ class PersonaExtractor:
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(self.personas, f, ensure_ascii=False, indent=2)
+            # Las estadísticas quedan ligadas a este archivo (huella tamaño + mtime)
+            self.estadisticas.guardar(output_file)
             print(f"\n✓ Datos guardados en {output_file} ({len(self.personas)} personas)")
         except Exception as e:
             print(f"✗ Error al guardar JSON: {e}")
@@ -344,41 +353,28 @@ class PersonaExtractor:
         print("\n" + "="*80)
         print(f"RESUMEN DE EXTRACCIÓN")
         print("="*80)
-        print(f"Total de personas: {len(self.personas)}")
-        
-        # Contar por archivo origen
-        from collections import Counter
-        archivos = Counter(p.get('archivo_origen', 'desconocido') for p in self.personas)
+        stats = self.estadisticas
+        print(f"Total de personas: {stats.total}")
         
         print(f"\nPor archivo de origen:")
-        for archivo, count in sorted(archivos.items()):
+        for archivo, count in sorted((+stats.por_origen).items()):
             print(f"  - {archivo:20} : {count:3} personas")
         
-        # Contar por tipo
-        tipos = Counter(p.get('tipo_persona', 'SIN TIPO') or 'SIN TIPO' for p in self.personas)
-        
         print(f"\nPor tipo de persona:")
-        for tipo, count in sorted(tipos.items()):
+        for tipo, count in sorted((+stats.por_tipo).items()):
             print(f"  - {tipo:15} : {count:3} personas")
         
-        # Contar por status de cita
-        status_citas = Counter(p.get('status_cita', 'SIN STATUS') or 'SIN STATUS' for p in self.personas)
-        
         print(f"\nPor status de cita:")
-        for status, count in sorted(status_citas.items()):
+        for status, count in sorted((+stats.por_status_cita).items()):
             print(f"  - {status:15} : {count:3} personas")
         
         # Historial clínico
-        con_historial = sum(1 for p in self.personas if p.get('historial_clinico') == 'COMPLETO')
-        sin_historial = sum(1 for p in self.personas if p.get('historial_clinico') == 'SIN HISTORIAL')
-        
         print(f"\nHistorial clínico:")
-        print(f"  - Con historial completo: {con_historial}")
-        print(f"  - Sin historial: {sin_historial}")
+        print(f"  - Con historial completo: {stats.por_historial['COMPLETO']}")
+        print(f"  - Sin historial: {stats.por_historial['SIN HISTORIAL']}")
         
         # Total de visitas
-        total_visitas = sum(int(p.get('num_visitas', 0)) for p in self.personas)
-        print(f"\nTotal de visitas registradas: {total_visitas}")
+        print(f"\nTotal de visitas registradas: {stats.total_visitas}")
         
         print("\n" + "="*80)
 
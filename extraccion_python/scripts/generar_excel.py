@@ -4,11 +4,20 @@
 Script para transformar personas.json al formato Excel
 Separa nombres en: Nombre(s), Paterno, Materno
 Calcula el estado de visita: VISITADO, RECHAZO, NO
+Genera JSON, CSV y XLSX (una hoja por estado) en una sola pasada
 """
 
 import json
 import csv
-from typing import Dict, List, Tuple
+import os
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+from escritor_xlsx import EscritorXLSX
+from lectura_personas import iterar_personas
+
+TAMANO_LOTE = 5000          # Registros transformados a la vez
 
 
 def separar_nombre(nombre_completo: str) -> Tuple[str, str, str]:
@@ -72,37 +81,166 @@ def calcular_estado_visita(persona: Dict[str, str]) -> str:
     return "NO"
 
 
+COLUMNAS_EXCEL = ['Nombre(s)', 'Paterno', 'Materno', 'Domicilio', 'Teléfono', 'No']
+HOJAS_EXCEL = ['TODOS', 'VISITADO', 'RECHAZO', 'NO']
+
+
+def banderas_rechazo(personas: List[Dict[str, str]]) -> List[bool]:
+    """
+    Bandera "RECHAZ" en cualquier campo de cada registro (equivale a buscar en
+    str(persona).upper()), calculada en lote:
+    - Los valores de todos los registros se unen en un solo texto y se pasa a
+      mayúsculas UNA vez, luego se vuelve a partir por registro
+    - Las llaves se revisan una sola vez para todo el archivo
+    """
+    llaves_rechazo = {llave for llave in set().union(*personas) if 'RECHAZ' in str(llave).upper()}
+
+    try:
+        textos = ['\x1f'.join(p.values()) for p in personas]
+        mayusculas = '\x1e'.join(textos).upper().split('\x1e')
+    except TypeError:
+        # Algún valor no es texto (None, número): se usa el repr como antes
+        mayusculas = None
+
+    if mayusculas is None or len(mayusculas) != len(personas):
+        mayusculas = [str(p).upper() for p in personas]
+
+    banderas = ['RECHAZ' in texto for texto in mayusculas]
+    if llaves_rechazo:
+        banderas = [b or not llaves_rechazo.isdisjoint(p) for b, p in zip(banderas, personas)]
+    return banderas
+
+
+def transformar_columnas(personas: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    """
+    Transforma los datos al formato Excel por COLUMNAS (una pasada por columna)
+    
+    Misma salida que aplicar separar_nombre + calcular_estado_visita registro por
+    registro, pero las banderas (rechazo, número de visitas) se calculan una vez
+    y el estado se clasifica sobre ellas.
+    
+    Returns:
+        Dict columna -> lista de valores (en el orden de COLUMNAS_EXCEL)
+    """
+    # Separar nombres: los 2 últimos son apellidos (con 3+ partes), el resto es nombre
+    partes = [p.get('nombre', '').split() for p in personas]
+    nombres = [" ".join(x[:-2]) if len(x) >= 3 else (x[0] if x else "") for x in partes]
+    paternos = [x[-2] if len(x) >= 3 else (x[1] if len(x) == 2 else "") for x in partes]
+    maternos = [x[-1] if len(x) >= 3 else "" for x in partes]
+    del partes
+    
+    # Banderas precalculadas
+    rechazos = banderas_rechazo(personas)
+    # num_visitas tiene pocos valores distintos: se convierte cada uno una sola vez
+    crudos = [p.get('num_visitas', '0') for p in personas]
+    convertidos = {valor: _entero_seguro(valor) for valor in set(crudos)}
+    visitas = [convertidos[valor] for valor in crudos]
+    
+    # Estado: RECHAZO tiene prioridad, luego VISITADO (>= 1 visita), luego NO
+    estados = ["RECHAZO" if rechazo else ("VISITADO" if n >= 1 else "NO")
+               for rechazo, n in zip(rechazos, visitas)]
+    
+    return {
+        'Nombre(s)': nombres,
+        'Paterno': paternos,
+        'Materno': maternos,
+        'Domicilio': [p.get('direccion', '') for p in personas],
+        'Teléfono': [p.get('telefono_1', '').strip() or 'SIN NUMERO' for p in personas],
+        'No': estados
+    }
+
+
+def _entero_seguro(valor) -> int:
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+def filas_excel(columnas: Dict[str, List[str]]) -> List[Dict[str, str]]:
+    """Convierte las columnas en filas (dicts con las llaves de COLUMNAS_EXCEL)"""
+    return [
+        {'Nombre(s)': n, 'Paterno': p, 'Materno': m, 'Domicilio': d, 'Teléfono': t, 'No': e}
+        for n, p, m, d, t, e in zip(*(columnas[c] for c in COLUMNAS_EXCEL))
+    ]
+
+
 def transformar_para_excel(personas: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """
     Transforma los datos al formato Excel
     """
-    personas_excel = []
+    return filas_excel(transformar_columnas(personas))
+
+
+class EscritorJSONLista:
+    """
+    Escribe un arreglo JSON por lotes de filas, con el mismo formato que
+    json.dump(filas, ensure_ascii=False, indent=2)
     
-    for persona in personas:
-        # Separar nombre
-        nombres, paterno, materno = separar_nombre(persona.get('nombre', ''))
-        
-        # Calcular estado de visita
-        estado_visita = calcular_estado_visita(persona)
-        
-        # Obtener teléfono o asignar "SIN NUMERO"
-        telefono = persona.get('telefono_1', '').strip()
-        if not telefono:
-            telefono = 'SIN NUMERO'
+    Las llaves son fijas (COLUMNAS_EXCEL), así que solo se codifican los
+    valores (con el codificador en C); el resto del texto es una plantilla.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.total = 0
+        campos = ",\n".join(f"    {json.dumps(c, ensure_ascii=False)}: {{}}" for c in COLUMNAS_EXCEL)
+        self._plantilla = "  {{\n" + campos + "\n  }}"
+
+    def agregar_columnas(self, columnas: Dict[str, List[str]]):
+        codificar = json.JSONEncoder(ensure_ascii=False).encode
+        valores = [[codificar(v) for v in columnas[c]] for c in COLUMNAS_EXCEL]
+        filas = [self._plantilla.format(*fila) for fila in zip(*valores)]
+        if not filas:
+            return
+        self.f.write(("[\n" if self.total == 0 else ",\n") + ",\n".join(filas))
+        self.total += len(filas)
+
+    def cerrar(self):
+        self.f.write("\n]" if self.total else "[]")
+
+
+def exportar(personas: Iterable[Dict[str, str]], ruta_json: str, ruta_csv: str, ruta_xlsx: str,
+             tamano_lote: int = TAMANO_LOTE) -> Counter:
+    """
+    Transforma y escribe JSON, CSV y XLSX en UNA sola pasada, por lotes
+    
+    Las personas pueden venir de un generador (streaming): en memoria solo vive
+    un lote a la vez. El XLSX tiene una hoja TODOS y una hoja por estado.
+    
+    Returns:
+        Counter con el número de personas por estado
+    """
+    estados = Counter()
+    
+    with open(ruta_json, 'w', encoding='utf-8') as f_json, \
+            open(ruta_csv, 'w', newline='', encoding='utf-8-sig') as f_csv, \
+            EscritorXLSX(ruta_xlsx, HOJAS_EXCEL) as libro:
+        salida_json = EscritorJSONLista(f_json)
+        salida_csv = csv.writer(f_csv)
+        salida_csv.writerow(COLUMNAS_EXCEL)
+        libro.encabezado(COLUMNAS_EXCEL)
         
-        # Crear registro para Excel
-        persona_excel = {
-            'Nombre(s)': nombres,
-            'Paterno': paterno,
-            'Materno': materno,
-            'Domicilio': persona.get('direccion', ''),
-            'Teléfono': telefono,
-            'No': estado_visita
-        }
+        personas = iter(personas)
+        while True:
+            lote = list(islice(personas, tamano_lote))
+            if not lote:
+                break
+            
+            columnas = transformar_columnas(lote)
+            filas = list(zip(*(columnas[c] for c in COLUMNAS_EXCEL)))
+            
+            salida_csv.writerows(filas)
+            salida_json.agregar_columnas(columnas)
+            libro.agregar_filas('TODOS', filas)
+            for estado in ('VISITADO', 'RECHAZO', 'NO'):
+                libro.agregar_filas(estado, [fila for fila in filas if fila[-1] == estado])
+            
+            estados.update(columnas['No'])
         
-        personas_excel.append(persona_excel)
+        salida_json.cerrar()
     
-    return personas_excel
+    return estados
 
 
 def main():
@@ -112,61 +250,48 @@ def main():
     print("Transforma personas.json al formato de la tabla Excel")
     print("="*80)
     
-    # Cargar datos originales
-    try:
-        with open('../json/personas.json', 'r', encoding='utf-8') as f:
-            personas = json.load(f)
-        print(f"\n✓ Cargadas {len(personas)} personas desde json/personas.json")
-    except FileNotFoundError:
+    if not os.path.exists('../json/personas.json'):
         print("\n✗ No se encontró json/personas.json")
         print("  Ejecuta primero extract_all_views.py")
         return
-    except Exception as e:
-        print(f"\n✗ Error al cargar personas.json: {e}")
-        return
     
-    # Transformar datos
+    # Leer (en streaming), transformar y guardar en una sola pasada
     print("\n🔄 Transformando datos al formato Excel...")
-    personas_excel = transformar_para_excel(personas)
-    
-    # Guardar JSON
+    os.makedirs('../excel', exist_ok=True)
     try:
-        with open('../json/personas_excel.json', 'w', encoding='utf-8') as f:
-            json.dump(personas_excel, f, ensure_ascii=False, indent=2)
-        print(f"✓ Guardado json/personas_excel.json ({len(personas_excel)} registros)")
+        estados = exportar(iterar_personas('../json/personas.json'),
+                           '../json/personas_excel.json',
+                           '../csv/personas_excel.csv',
+                           '../excel/personas_excel.xlsx')
     except Exception as e:
-        print(f"✗ Error al guardar JSON: {e}")
+        print(f"\n✗ Error al generar los archivos: {e}")
+        return
     
-    # Guardar CSV
-    try:
-        fieldnames = ['Nombre(s)', 'Paterno', 'Materno', 'Domicilio', 'Teléfono', 'No']
-        
-        with open('../csv/personas_excel.csv', 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(personas_excel)
-        
-        print(f"✓ Guardado csv/personas_excel.csv ({len(personas_excel)} registros)")
-    except Exception as e:
-        print(f"✗ Error al guardar CSV: {e}")
+    total = sum(estados.values())
+    print(f"✓ Procesadas {total} personas desde json/personas.json")
+    print(f"✓ Guardado json/personas_excel.json ({total} registros)")
+    print(f"✓ Guardado csv/personas_excel.csv ({total} registros)")
+    print(f"✓ Guardado excel/personas_excel.xlsx ({total} registros, hojas: {', '.join(HOJAS_EXCEL)})")
     
     # Mostrar estadísticas
     print("\n" + "="*80)
     print("ESTADÍSTICAS")
     print("="*80)
     
-    visitados = sum(1 for p in personas_excel if p['No'] == 'VISITADO')
-    rechazos = sum(1 for p in personas_excel if p['No'] == 'RECHAZO')
-    no_visitados = sum(1 for p in personas_excel if p['No'] == 'NO')
+    visitados = estados['VISITADO']
+    rechazos = estados['RECHAZO']
+    no_visitados = estados['NO']
     
-    print(f"Total de personas: {len(personas_excel)}")
-    print(f"  - VISITADO: {visitados} ({visitados/len(personas_excel)*100:.1f}%)")
-    print(f"  - RECHAZO: {rechazos} ({rechazos/len(personas_excel)*100:.1f}%)")
-    print(f"  - NO: {no_visitados} ({no_visitados/len(personas_excel)*100:.1f}%)")
+    print(f"Total de personas: {total}")
+    if total:
+        print(f"  - VISITADO: {visitados} ({visitados/total*100:.1f}%)")
+        print(f"  - RECHAZO: {rechazos} ({rechazos/total*100:.1f}%)")
+        print(f"  - NO: {no_visitados} ({no_visitados/total*100:.1f}%)")
     
     print("\n✓ Archivos generados:")
     print("  - json/personas_excel.json")
-    print("  - csv/personas_excel.csv (listo para abrir en Excel)")
+    print("  - csv/personas_excel.csv")
+    print("  - excel/personas_excel.xlsx (hoja TODOS + una hoja por estado)")
     print("\n" + "="*80)
 
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índices en memoria sobre la lista de personas
+- Índice invertido por valor de tipo_persona, status_cita e historial_clinico
+- Listas precalculadas de presencia de teléfono y de visitas
+- Índice de n-gramas (1 a 3 caracteres) sobre los nombres en mayúsculas para
+  búsqueda parcial: consultas de hasta 3 caracteres se responden directo del
+  índice; las más largas intersectan sus trigramas y verifican la subcadena
+
+Todas las consultas devuelven POSICIONES en la lista original, ordenadas (tuplas
+compartidas, no copias), para que los resultados salgan en el mismo orden que
+un recorrido lineal.
+"""
+
+import time
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+
+CAMPOS_INDEXADOS = ['tipo_persona', 'status_cita', 'historial_clinico']
+
+
+def trigramas(texto: str) -> set:
+    """Conjunto de subcadenas de 3 caracteres"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def ngramas(texto: str) -> set:
+    """Conjunto de subcadenas de 1, 2 y 3 caracteres"""
+    return {texto[i:i + n] for n in (1, 2, 3) for i in range(len(texto) - n + 1)}
+
+
+def _entero_seguro(valor) -> int:
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+class IndicePersonas:
+    """Índices construidos una sola vez al cargar los datos"""
+
+    def __init__(self, personas: List[Dict[str, str]]):
+        inicio = time.perf_counter()
+
+        self.total = len(personas)
+
+        # campo -> valor exacto -> posiciones
+        self.por_campo: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        for campo in CAMPOS_INDEXADOS:
+            indice = defaultdict(list)
+            for i, p in enumerate(personas):
+                indice[p.get(campo, '')].append(i)
+            self.por_campo[campo] = {valor: tuple(pos) for valor, pos in indice.items()}
+
+        # Presencia de teléfonos y visitas
+        con_telefono_1, sin_telefono, con_dos_telefonos, con_visitas = [], [], [], []
+        for i, p in enumerate(personas):
+            tel1, tel2 = p.get('telefono_1'), p.get('telefono_2')
+            if tel1:
+                con_telefono_1.append(i)
+            if tel1 and tel2:
+                con_dos_telefonos.append(i)
+            elif not tel1 and not tel2:
+                sin_telefono.append(i)
+            if _entero_seguro(p.get('num_visitas', 0)) > 0:
+                con_visitas.append(i)
+        self.con_telefono_1 = tuple(con_telefono_1)
+        self.sin_telefono = tuple(sin_telefono)
+        self.con_dos_telefonos = tuple(con_dos_telefonos)
+        self.con_visitas = tuple(con_visitas)
+
+        # Nombres en mayúsculas (una sola vez) + n-gramas
+        self.nombres: List[str] = [p.get('nombre', '').upper() for p in personas]
+        ngramas_nombre = defaultdict(list)
+        for i, nombre in enumerate(self.nombres):
+            for ngrama in ngramas(nombre):
+                ngramas_nombre[ngrama].append(i)
+        self.ngramas: Dict[str, Tuple[int, ...]] = {g: tuple(pos) for g, pos in ngramas_nombre.items()}
+
+        self.segundos_construccion = time.perf_counter() - inicio
+
+    def buscar_valor(self, campo: str, valor: str, ignorar_mayusculas: bool = True) -> Sequence[int]:
+        """Posiciones cuyo campo es igual a valor"""
+        indice = self.por_campo[campo]
+        if not ignorar_mayusculas:
+            return indice.get(valor, ())
+
+        valor = valor.upper()
+        listas = [posiciones for clave, posiciones in indice.items() if (clave or '').upper() == valor]
+        if len(listas) == 1:
+            return listas[0]
+        return tuple(sorted(i for posiciones in listas for i in posiciones))
+
+    def buscar_nombre(self, consulta: str) -> Sequence[int]:
+        """Posiciones cuyo nombre contiene la consulta (sin distinguir mayúsculas)"""
+        consulta = consulta.upper()
+        if not consulta:
+            return range(self.total)
+
+        # Hasta 3 caracteres el n-grama ES la respuesta
+        if len(consulta) <= 3:
+            return self.ngramas.get(consulta, ())
+
+        # Candidatos: la lista más corta entre los trigramas de la consulta
+        # (ya viene ordenada); tener el trigrama no garantiza la subcadena completa
+        candidatos = None
+        for trigrama in trigramas(consulta):
+            posiciones = self.ngramas.get(trigrama)
+            if not posiciones:
+                return ()
+            if candidatos is None or len(posiciones) < len(candidatos):
+                candidatos = posiciones
+
+        nombres = self.nombres
+        return [i for i in candidatos if consulta in nombres[i]]
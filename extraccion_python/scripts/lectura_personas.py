@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lectura de personas.json compartida por los scripts
+- CAMPOS: los campos de cada persona, en el orden de la extracción
+- iterar_personas(): registros uno por uno, en streaming
+"""
+
+import json
+import re
+from typing import Dict, Iterator
+
+CAMPOS = [
+    'nombre', 'inicial', 'status_persona', 'tipo_persona',
+    'status_cita', 'direccion', 'telefono_1', 'telefono_2',
+    'historial_clinico', 'num_visitas', 'archivo_origen'
+]
+
+_ESPACIOS = re.compile(r'[\s,]*')
+
+
+def iterar_personas(filename: str = 'personas.json', tamano_bloque: int = 1 << 20) -> Iterator[Dict]:
+    """
+    Lee el arreglo JSON de personas registro por registro, sin cargar todo el archivo
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8') as f:
+        buffer = f.read(tamano_bloque).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{filename} no contiene un arreglo JSON")
+        pos = 1
+        fin_archivo = False
+
+        while True:
+            pos = _ESPACIOS.match(buffer, pos).end()
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            try:
+                persona, fin = decoder.raw_decode(buffer, pos)
+                # Un valor pegado al final del bloque podría estar incompleto
+                if fin < len(buffer) or fin_archivo:
+                    yield persona
+                    pos = fin
+                    continue
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    raise
+
+            bloque = f.read(tamano_bloque)
+            fin_archivo = not bloque
+            buffer = buffer[pos:] + bloque
+            pos = 0
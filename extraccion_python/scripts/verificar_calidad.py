@@ -2,12 +2,21 @@
 # -*- coding: utf-8 -*-
 """
 Script de verificación de calidad de datos
-Analiza personas.json y genera un reporte de calidad
+Analiza personas.json y genera un reporte de calidad (texto + reporte_calidad.json)
+
+Cada verificación es una regla acumuladora: el archivo se recorre UNA sola vez
+en streaming, y con muchos registros los lotes se evalúan en paralelo (procesos)
 """
 
 import json
+import os
 from collections import Counter
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from lectura_personas import CAMPOS, iterar_personas
+
+TAMANO_LOTE = 5000          # Registros por lote evaluado en un proceso
 
 
 def load_personas(filename: str = 'personas.json') -> List[Dict]:
@@ -16,75 +25,130 @@ def load_personas(filename: str = 'personas.json') -> List[Dict]:
         return json.load(f)
 
 
-def verificar_duplicados(personas: List[Dict]) -> Dict:
+# === REGLAS (acumuladores) ===
+# Cada regla recibe los registros de UNA pasada (agregar), puede combinarse con
+# otra instancia evaluada sobre otro lote (combinar) y entrega su resultado al final
+
+class ReglaDuplicados:
     """Verifica si hay nombres duplicados"""
-    nombres = [p['nombre'] for p in personas]
-    contador = Counter(nombres)
-    duplicados = {nombre: count for nombre, count in contador.items() if count > 1}
-    
-    return {
-        'total_nombres': len(nombres),
-        'nombres_unicos': len(set(nombres)),
-        'duplicados_encontrados': len(duplicados),
-        'duplicados': duplicados
-    }
 
+    def __init__(self):
+        self.contador = Counter()
+        self.total = 0
 
-def verificar_completitud(personas: List[Dict]) -> Dict:
+    def agregar(self, indice: int, persona: Dict):
+        self.contador[persona['nombre']] += 1
+        self.total += 1
+
+    def combinar(self, otra: 'ReglaDuplicados'):
+        self.contador.update(otra.contador)
+        self.total += otra.total
+
+    def resultado(self) -> Dict:
+        duplicados = {nombre: count for nombre, count in self.contador.items() if count > 1}
+        return {
+            'total_nombres': self.total,
+            'nombres_unicos': len(self.contador),
+            'duplicados_encontrados': len(duplicados),
+            'duplicados': duplicados
+        }
+
+
+class ReglaCompletitud:
     """Verifica la completitud de los campos"""
-    campos = [
-        'nombre', 'inicial', 'status_persona', 'tipo_persona',
-        'status_cita', 'direccion', 'telefono_1', 'telefono_2',
-        'historial_clinico', 'num_visitas', 'archivo_origen'
-    ]
-    
-    completitud = {}
-    
-    for campo in campos:
-        con_datos = sum(1 for p in personas if p.get(campo, '').strip())
-        completitud[campo] = {
-            'con_datos': con_datos,
-            'sin_datos': len(personas) - con_datos,
-            'porcentaje': (con_datos / len(personas) * 100) if personas else 0
+
+    def __init__(self):
+        self.con_datos = {campo: 0 for campo in CAMPOS}
+        self.total = 0
+
+    def agregar(self, indice: int, persona: Dict):
+        for campo in CAMPOS:
+            if persona.get(campo, '').strip():
+                self.con_datos[campo] += 1
+        self.total += 1
+
+    def combinar(self, otra: 'ReglaCompletitud'):
+        for campo in CAMPOS:
+            self.con_datos[campo] += otra.con_datos[campo]
+        self.total += otra.total
+
+    def resultado(self) -> Dict:
+        return {
+            campo: {
+                'con_datos': con_datos,
+                'sin_datos': self.total - con_datos,
+                'porcentaje': (con_datos / self.total * 100) if self.total else 0
+            }
+            for campo, con_datos in self.con_datos.items()
         }
-    
-    return completitud
 
 
-def verificar_telefonos(personas: List[Dict]) -> Dict:
+class ReglaTelefonos:
     """Analiza los teléfonos"""
-    con_tel1 = sum(1 for p in personas if p.get('telefono_1', '').strip())
-    con_tel2 = sum(1 for p in personas if p.get('telefono_2', '').strip())
-    con_ambos = sum(1 for p in personas if p.get('telefono_1', '').strip() and p.get('telefono_2', '').strip())
-    sin_telefonos = sum(1 for p in personas if not p.get('telefono_1', '').strip() and not p.get('telefono_2', '').strip())
-    
-    return {
-        'con_telefono_1': con_tel1,
-        'con_telefono_2': con_tel2,
-        'con_ambos_telefonos': con_ambos,
-        'sin_telefonos': sin_telefonos,
-        'al_menos_uno': con_tel1
-    }
 
+    def __init__(self):
+        self.con_tel1 = 0
+        self.con_tel2 = 0
+        self.con_ambos = 0
+        self.sin_telefonos = 0
 
-def verificar_archivos_origen(personas: List[Dict]) -> Dict:
+    def agregar(self, indice: int, persona: Dict):
+        tel1 = bool(persona.get('telefono_1', '').strip())
+        tel2 = bool(persona.get('telefono_2', '').strip())
+        self.con_tel1 += tel1
+        self.con_tel2 += tel2
+        self.con_ambos += tel1 and tel2
+        self.sin_telefonos += not tel1 and not tel2
+
+    def combinar(self, otra: 'ReglaTelefonos'):
+        self.con_tel1 += otra.con_tel1
+        self.con_tel2 += otra.con_tel2
+        self.con_ambos += otra.con_ambos
+        self.sin_telefonos += otra.sin_telefonos
+
+    def resultado(self) -> Dict:
+        return {
+            'con_telefono_1': self.con_tel1,
+            'con_telefono_2': self.con_tel2,
+            'con_ambos_telefonos': self.con_ambos,
+            'sin_telefonos': self.sin_telefonos,
+            'al_menos_uno': self.con_tel1
+        }
+
+
+class ReglaArchivosOrigen:
     """Analiza la distribución por archivo de origen"""
-    archivos = Counter(p.get('archivo_origen', 'desconocido') for p in personas)
-    
-    return {
-        'total_archivos': len(archivos),
-        'distribucion': dict(archivos.most_common()),
-        'promedio_por_archivo': len(personas) / len(archivos) if archivos else 0,
-        'archivo_con_mas': archivos.most_common(1)[0] if archivos else None,
-        'archivo_con_menos': archivos.most_common()[-1] if archivos else None
-    }
 
+    def __init__(self):
+        self.archivos = Counter()
+        self.total = 0
 
-def buscar_inconsistencias(personas: List[Dict]) -> List[Dict]:
+    def agregar(self, indice: int, persona: Dict):
+        self.archivos[persona.get('archivo_origen', 'desconocido')] += 1
+        self.total += 1
+
+    def combinar(self, otra: 'ReglaArchivosOrigen'):
+        self.archivos.update(otra.archivos)
+        self.total += otra.total
+
+    def resultado(self) -> Dict:
+        archivos = self.archivos
+        return {
+            'total_archivos': len(archivos),
+            'distribucion': dict(archivos.most_common()),
+            'promedio_por_archivo': self.total / len(archivos) if archivos else 0,
+            'archivo_con_mas': archivos.most_common(1)[0] if archivos else None,
+            'archivo_con_menos': archivos.most_common()[-1] if archivos else None
+        }
+
+
+class ReglaInconsistencias:
     """Busca posibles inconsistencias en los datos"""
-    inconsistencias = []
-    
-    for i, persona in enumerate(personas):
+
+    def __init__(self):
+        self.inconsistencias: List[Dict] = []
+
+    def agregar(self, indice: int, persona: Dict):
         problemas = []
         
         # Verificar si tiene nombre pero no tipo
@@ -110,27 +174,176 @@ def buscar_inconsistencias(personas: List[Dict]) -> List[Dict]:
             problemas.append(f'Teléfono 2 con longitud inválida: {len(tel2)} dígitos')
         
         if problemas:
-            inconsistencias.append({
-                'indice': i,
+            self.inconsistencias.append({
+                'indice': indice,
                 'nombre': persona.get('nombre'),
                 'archivo': persona.get('archivo_origen'),
                 'problemas': problemas
             })
+
+    def combinar(self, otra: 'ReglaInconsistencias'):
+        self.inconsistencias.extend(otra.inconsistencias)
+
+    def resultado(self) -> List[Dict]:
+        return self.inconsistencias
+
+
+def nuevas_reglas() -> Dict:
+    """Un juego completo de reglas vacías (el orden es el del reporte)"""
+    return {
+        'duplicados': ReglaDuplicados(),
+        'completitud': ReglaCompletitud(),
+        'telefonos': ReglaTelefonos(),
+        'archivos': ReglaArchivosOrigen(),
+        'inconsistencias': ReglaInconsistencias()
+    }
+
+
+def evaluar_lote(inicio: int, personas: List[Dict]) -> Dict:
+    """Evalúa todas las reglas sobre un lote (se ejecuta en un proceso del pool)"""
+    reglas = nuevas_reglas()
+    for indice, persona in enumerate(personas, inicio):
+        for regla in reglas.values():
+            regla.agregar(indice, persona)
+    return reglas
+
+
+def _lotes(personas, tamano: int):
+    lote, inicio = [], 0
+    for persona in personas:
+        lote.append(persona)
+        if len(lote) == tamano:
+            yield inicio, lote
+            inicio += tamano
+            lote = []
+    if lote:
+        yield inicio, lote
+
+
+def evaluar(personas, procesos: Optional[int] = None, tamano_lote: int = TAMANO_LOTE) -> Dict:
+    """
+    Evalúa todas las reglas en UNA pasada sobre los registros (lista o generador)
+
+    Si hay más de un lote, los lotes se evalúan en paralelo en un pool de
+    procesos y se combinan en orden, así el resultado es idéntico al secuencial.
+
+    Returns:
+        Dict nombre_regla -> resultado
+    """
+    lotes = _lotes(personas, tamano_lote)
+    primero = next(lotes, None)
+    total = evaluar_lote(0, []) if primero is None else evaluar_lote(*primero)
+
+    segundo = next(lotes, None)
+    if segundo is not None:
+        procesos = procesos or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            pendientes = [pool.submit(evaluar_lote, *segundo)]
+            for lote in lotes:
+                pendientes.append(pool.submit(evaluar_lote, *lote))
+                # Acotar los lotes en vuelo (memoria constante)
+                if len(pendientes) >= procesos * 2:
+                    _combinar(total, pendientes.pop(0).result())
+            for futuro in pendientes:
+                _combinar(total, futuro.result())
+
+    return {nombre: regla.resultado() for nombre, regla in total.items()}
+
+
+def _combinar(total: Dict, parcial: Dict):
+    for nombre, regla in total.items():
+        regla.combinar(parcial[nombre])
+
+
+def _evaluar_regla(regla, personas: List[Dict]):
+    for indice, persona in enumerate(personas):
+        regla.agregar(indice, persona)
+    return regla.resultado()
+
+
+def verificar_duplicados(personas: List[Dict]) -> Dict:
+    """Verifica si hay nombres duplicados"""
+    return _evaluar_regla(ReglaDuplicados(), personas)
+
+
+def verificar_completitud(personas: List[Dict]) -> Dict:
+    """Verifica la completitud de los campos"""
+    return _evaluar_regla(ReglaCompletitud(), personas)
+
+
+def verificar_telefonos(personas: List[Dict]) -> Dict:
+    """Analiza los teléfonos"""
+    return _evaluar_regla(ReglaTelefonos(), personas)
+
+
+def verificar_archivos_origen(personas: List[Dict]) -> Dict:
+    """Analiza la distribución por archivo de origen"""
+    return _evaluar_regla(ReglaArchivosOrigen(), personas)
+
+
+def buscar_inconsistencias(personas: List[Dict]) -> List[Dict]:
+    """Busca posibles inconsistencias en los datos"""
+    return _evaluar_regla(ReglaInconsistencias(), personas)
+
+
+def calcular_puntuacion(resultados: Dict) -> Dict:
+    """Puntuación de calidad (0-100) con el detalle de cada penalización"""
+    total = resultados['duplicados']['total_nombres']
+    penalizaciones = []
+    
+    if resultados['duplicados']['duplicados_encontrados'] > 0:
+        penalizaciones.append((20, "Duplicados encontrados (-20 puntos)"))
+    
+    if resultados['telefonos']['sin_telefonos'] > total * 0.1:
+        penalizaciones.append((10, "Más del 10% sin teléfonos (-10 puntos)"))
+    
+    inconsistencias = resultados['inconsistencias']
+    if inconsistencias:
+        puntos = min(len(inconsistencias), 30)
+        penalizaciones.append((puntos, f"{len(inconsistencias)} inconsistencias encontradas (-{puntos} puntos)"))
+    
+    score = 100 - sum(puntos for puntos, _ in penalizaciones)
+    
+    if score >= 90:
+        calificacion = "Excelente calidad de datos"
+    elif score >= 70:
+        calificacion = "Buena calidad de datos"
+    elif score >= 50:
+        calificacion = "Calidad aceptable, revisar inconsistencias"
+    else:
+        calificacion = "Calidad baja, se requiere revisión"
     
-    return inconsistencias
+    return {
+        'score': score,
+        'penalizaciones': [mensaje for _, mensaje in penalizaciones],
+        'calificacion': calificacion
+    }
+
+
+def guardar_reporte_json(resultados: Dict, puntuacion: Dict, output_file: str):
+    """Versión del reporte para otros programas"""
+    reporte = dict(resultados)
+    reporte['total_registros'] = resultados['duplicados']['total_nombres']
+    reporte['puntuacion'] = puntuacion
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
 
 
-def generar_reporte():
-    """Genera un reporte completo de calidad de datos"""
+def generar_reporte(filename: str = 'personas.json', reporte_json: Optional[str] = None):
+    """
+    Genera un reporte completo de calidad de datos
+    Todas las verificaciones se calculan en UNA pasada streaming sobre el archivo
+    """
     print("="*80)
     print("REPORTE DE CALIDAD DE DATOS - personas.json")
     print("="*80)
     
-    # Cargar datos
+    # Evaluar todas las reglas leyendo el archivo registro por registro
     try:
-        personas = load_personas()
+        resultados = evaluar(iterar_personas(filename))
+        total = resultados['duplicados']['total_nombres']
         print(f"\n✓ Archivo cargado exitosamente")
-        print(f"  Total de registros: {len(personas)}")
+        print(f"  Total de registros: {total}")
     except FileNotFoundError:
         print("\n✗ No se encontró el archivo personas.json")
         print("  Ejecuta primero extract_all_views.py")
@@ -139,12 +352,16 @@ def generar_reporte():
         print(f"\n✗ Error al cargar el archivo: {e}")
         return
     
+    if not total:
+        print("\n✗ El archivo no contiene registros")
+        return
+    
     # Verificar duplicados
     print("\n" + "="*80)
     print("1. VERIFICACIÓN DE DUPLICADOS")
     print("="*80)
     
-    duplicados = verificar_duplicados(personas)
+    duplicados = resultados['duplicados']
     print(f"  Total de nombres: {duplicados['total_nombres']}")
     print(f"  Nombres únicos: {duplicados['nombres_unicos']}")
     
@@ -160,7 +377,7 @@ def generar_reporte():
     print("2. COMPLETITUD DE CAMPOS")
     print("="*80)
     
-    completitud = verificar_completitud(personas)
+    completitud = resultados['completitud']
     
     print(f"\n{'Campo':<20} {'Con Datos':<12} {'Sin Datos':<12} {'%':<8}")
     print("-"*80)
@@ -173,19 +390,19 @@ def generar_reporte():
     print("3. ANÁLISIS DE TELÉFONOS")
     print("="*80)
     
-    telefonos = verificar_telefonos(personas)
-    print(f"  Con teléfono 1: {telefonos['con_telefono_1']} ({telefonos['con_telefono_1']/len(personas)*100:.1f}%)")
-    print(f"  Con teléfono 2: {telefonos['con_telefono_2']} ({telefonos['con_telefono_2']/len(personas)*100:.1f}%)")
-    print(f"  Con ambos teléfonos: {telefonos['con_ambos_telefonos']} ({telefonos['con_ambos_telefonos']/len(personas)*100:.1f}%)")
-    print(f"  Sin teléfonos: {telefonos['sin_telefonos']} ({telefonos['sin_telefonos']/len(personas)*100:.1f}%)")
-    print(f"  Al menos un teléfono: {telefonos['al_menos_uno']} ({telefonos['al_menos_uno']/len(personas)*100:.1f}%)")
+    telefonos = resultados['telefonos']
+    print(f"  Con teléfono 1: {telefonos['con_telefono_1']} ({telefonos['con_telefono_1']/total*100:.1f}%)")
+    print(f"  Con teléfono 2: {telefonos['con_telefono_2']} ({telefonos['con_telefono_2']/total*100:.1f}%)")
+    print(f"  Con ambos teléfonos: {telefonos['con_ambos_telefonos']} ({telefonos['con_ambos_telefonos']/total*100:.1f}%)")
+    print(f"  Sin teléfonos: {telefonos['sin_telefonos']} ({telefonos['sin_telefonos']/total*100:.1f}%)")
+    print(f"  Al menos un teléfono: {telefonos['al_menos_uno']} ({telefonos['al_menos_uno']/total*100:.1f}%)")
     
     # Verificar archivos origen
     print("\n" + "="*80)
     print("4. DISTRIBUCIÓN POR ARCHIVO DE ORIGEN")
     print("="*80)
     
-    archivos = verificar_archivos_origen(personas)
+    archivos = resultados['archivos']
     print(f"  Total de archivos procesados: {archivos['total_archivos']}")
     print(f"  Promedio de personas por archivo: {archivos['promedio_por_archivo']:.1f}")
     
@@ -199,7 +416,7 @@ def generar_reporte():
     print("5. BÚSQUEDA DE INCONSISTENCIAS")
     print("="*80)
     
-    inconsistencias = buscar_inconsistencias(personas)
+    inconsistencias = resultados['inconsistencias']
     
     if inconsistencias:
         print(f"\n  ⚠ Se encontraron {len(inconsistencias)} registros con posibles inconsistencias:")
@@ -219,30 +436,31 @@ def generar_reporte():
     print("RESUMEN DE CALIDAD")
     print("="*80)
     
-    score = 100
+    puntuacion = calcular_puntuacion(resultados)
     
-    if duplicados['duplicados_encontrados'] > 0:
-        score -= 20
-        print("  ⚠ Duplicados encontrados (-20 puntos)")
+    for mensaje in puntuacion['penalizaciones']:
+        print(f"  ⚠ {mensaje}")
     
-    if telefonos['sin_telefonos'] > len(personas) * 0.1:
-        score -= 10
-        print("  ⚠ Más del 10% sin teléfonos (-10 puntos)")
-    
-    if inconsistencias:
-        score -= min(len(inconsistencias), 30)
-        print(f"  ⚠ {len(inconsistencias)} inconsistencias encontradas (-{min(len(inconsistencias), 30)} puntos)")
-    
-    print(f"\n  📊 Puntuación de calidad: {score}/100")
+    print(f"\n  📊 Puntuación de calidad: {puntuacion['score']}/100")
     
+    score = puntuacion['score']
     if score >= 90:
-        print("  ✅ Excelente calidad de datos")
+        print(f"  ✅ {puntuacion['calificacion']}")
     elif score >= 70:
-        print("  ✓ Buena calidad de datos")
+        print(f"  ✓ {puntuacion['calificacion']}")
     elif score >= 50:
-        print("  ⚠ Calidad aceptable, revisar inconsistencias")
+        print(f"  ⚠ {puntuacion['calificacion']}")
     else:
-        print("  ✗ Calidad baja, se requiere revisión")
+        print(f"  ✗ {puntuacion['calificacion']}")
+    
+    # Versión JSON del reporte (junto al archivo analizado)
+    if reporte_json is None:
+        reporte_json = os.path.join(os.path.dirname(filename), 'reporte_calidad.json')
+    try:
+        guardar_reporte_json(resultados, puntuacion, reporte_json)
+        print(f"\n  📄 Reporte JSON guardado en: {reporte_json}")
+    except Exception as e:
+        print(f"\n  ✗ Error al guardar reporte JSON: {e}")
     
     print("\n" + "="*80)
 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del lenguaje de consultas (consultas_personas.py)
+Prueba: tokenizador, precedencia de AND/OR/NOT, comillas, mensajes de error
+y que los candidatos de los índices den lo mismo que recorrer toda la lista
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from consultas_personas import Consulta, ErrorConsulta, _tokenizar
+from indices_personas import IndicePersonas
+
+
+def _persona(nombre, tipo, status, historial='', telefono='', visitas='0'):
+    return {'nombre': nombre, 'tipo_persona': tipo, 'status_cita': status,
+            'historial_clinico': historial, 'telefono_1': telefono, 'telefono_2': '',
+            'num_visitas': visitas, 'archivo_origen': 'pam.txt'}
+
+
+PERSONAS = [
+    _persona("LOPEZ PEREZ ANA", "PAM", "PENDIENTE", "COMPLETO", "9991234567", "2"),
+    _persona("GARCIA LOPEZ JUAN", "PCD", "PENDIENTE", "", "", "0"),
+    _persona("RUIZ CANUL MARIA", "PAM", "REALIZADA", "INCOMPLETO", "9997654321", "1"),
+    _persona("CANUL LOPEZ ROSA", "pam", "Pendiente", "", "", "3"),
+    _persona("PECH MAY JOSE", "PCD", "REALIZADA", "COMPLETO", "9990000000", "0"),
+    _persona("MAY LOPEZ O'HARA", "OTRO", "PENDIENTE", "", "9991111111", "x"),
+]
+
+
+def _nombres(texto, indice=None):
+    return [p['nombre'] for p in Consulta(texto).filtrar(PERSONAS, indice)]
+
+
+def test_tokenizar():
+    print("="*60)
+    print("TEST: _tokenizar()")
+    print("="*60)
+
+    tokens = _tokenizar("(tipo=PAM or nombre~'DE LA') AND not visitas>=1")
+    print(f"   {tokens}")
+    assert tokens == [('(', '('), ('valor', 'tipo'), ('op', '='), ('valor', 'PAM'),
+                      ('clave', 'OR'), ('valor', 'nombre'), ('op', '~'), ('valor', 'DE LA'),
+                      (')', ')'), ('clave', 'AND'), ('clave', 'NOT'),
+                      ('valor', 'visitas'), ('op', '>='), ('valor', '1')]
+    # Operadores de dos caracteres antes que los de uno; comillas vacías = valor vacío
+    assert _tokenizar("telefono_1!=''") == [('valor', 'telefono_1'), ('op', '!='), ('valor', '')]
+    assert _tokenizar('nombre!~"O\'HARA"') == [('valor', 'nombre'), ('op', '!~'), ('valor', "O'HARA")]
+    try:
+        _tokenizar("nombre='sin cerrar")
+        assert False, "comilla sin cerrar"
+    except ErrorConsulta as e:
+        assert "posición 7" in str(e)
+
+
+def test_precedencia():
+    """AND antes que OR; NOT aplica al término siguiente; los paréntesis mandan"""
+    # a OR (b AND c)
+    assert _nombres("tipo=OTRO OR tipo=PCD AND status=REALIZADA") == [
+        "PECH MAY JOSE", "MAY LOPEZ O'HARA"]
+    assert _nombres("(tipo=OTRO OR tipo=PCD) AND status=REALIZADA") == ["PECH MAY JOSE"]
+    assert _nombres("NOT tipo=PAM AND status=PENDIENTE") == ["GARCIA LOPEZ JUAN", "MAY LOPEZ O'HARA"]
+    assert _nombres("NOT (tipo=PAM AND status=PENDIENTE)") == [
+        "GARCIA LOPEZ JUAN", "RUIZ CANUL MARIA", "PECH MAY JOSE", "MAY LOPEZ O'HARA"]
+    assert _nombres("NOT NOT tipo=PCD") == ["GARCIA LOPEZ JUAN", "PECH MAY JOSE"]
+
+
+def test_operadores():
+    """Igualdad y contiene sin distinguir mayúsculas, vacío con '', numéricos con no números = 0"""
+    assert _nombres("tipo=pam AND status=PENDIENTE") == ["LOPEZ PEREZ ANA", "CANUL LOPEZ ROSA"]
+    assert _nombres("historial=''") == ["GARCIA LOPEZ JUAN", "CANUL LOPEZ ROSA", "MAY LOPEZ O'HARA"]
+    assert _nombres("telefono!='' AND nombre!~lopez") == ["RUIZ CANUL MARIA", "PECH MAY JOSE"]
+    assert _nombres("nombre~\"o'hara\"") == ["MAY LOPEZ O'HARA"]
+    assert _nombres("visitas>=2") == ["LOPEZ PEREZ ANA", "CANUL LOPEZ ROSA"]
+    assert _nombres("visitas<1") == ["GARCIA LOPEZ JUAN", "PECH MAY JOSE", "MAY LOPEZ O'HARA"]
+
+
+def test_errores():
+    casos = {
+        "": "Consulta vacía",
+        "tipo=PAM AND": "Se esperaba un campo",
+        "color=ROJO": "Campo desconocido: 'color'",
+        "tipo PAM": "Se esperaba un operador después de 'tipo_persona'",
+        "tipo=": "Se esperaba un valor después de tipo_persona=",
+        "(tipo=PAM": "Falta cerrar un paréntesis",
+        "tipo=PAM)": "Sobra texto a partir de ')'",
+        "tipo=PAM status=PENDIENTE": "Sobra texto a partir de 'status'",
+    }
+    for texto, mensaje in casos.items():
+        try:
+            Consulta(texto)
+            assert False, f"{texto!r} debió fallar"
+        except ErrorConsulta as e:
+            print(f"   {texto!r}: {e}")
+            assert mensaje in str(e), (texto, str(e))
+
+
+def test_indices_igual_que_recorrido():
+    """Con índice (candidatos de _Y/_O) el resultado y su orden no cambian"""
+    indice = IndicePersonas(PERSONAS)
+    consultas = [
+        "tipo=PAM",
+        "tipo=PAM AND status=PENDIENTE AND telefono_1!=''",
+        "nombre~LOPEZ AND status=pendiente",
+        "nombre~LO AND NOT tipo=PAM",
+        "tipo=PCD OR nombre~CANUL",
+        "tipo=PCD OR visitas>=2",                        # Un hijo sin índice: recorrido completo
+        "(tipo=PAM OR tipo=OTRO) AND nombre~MAY",
+        "(tipo=PAM OR historial=COMPLETO) AND (status=REALIZADA OR nombre~PEREZ)",
+        "nombre~ZZZZ",
+    ]
+    for texto in consultas:
+        consulta = Consulta(texto)
+        completo = [p['nombre'] for p in consulta.filtrar(PERSONAS)]
+        con_indice = [p['nombre'] for p in consulta.filtrar(PERSONAS, indice)]
+        print(f"   {texto}: {len(completo)}")
+        assert con_indice == completo, texto
+
+    # Los candidatos sí reducen: AND intersecta, OR une, y un OR con un hijo no indexable no sabe
+    arbol = Consulta("tipo=PAM AND status=PENDIENTE")._arbol
+    assert list(arbol.candidatos(indice)) == [0, 3]
+    assert list(Consulta("tipo=PCD OR nombre~CANUL")._arbol.candidatos(indice)) == [1, 2, 3, 4]
+    assert Consulta("tipo=PCD OR visitas>=2")._arbol.candidatos(indice) is None
+
+
+if __name__ == '__main__':
+    test_tokenizar()
+    test_precedencia()
+    test_operadores()
+    test_errores()
+    test_indices_igual_que_recorrido()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la detección de casi duplicados (duplicados_cercanos.py)
+Prueba: claves de bloqueo (también con una palabra de menos), Levenshtein
+acotado, sugerencias y grupos encadenados
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from duplicados_cercanos import (
+    PUNTUACION_FALTA_NOMBRE, claves_bloqueo, detectar_duplicados, distancia_acotada,
+    grupos_de_sugerencias, pares_candidatos
+)
+
+
+def test_claves_bloqueo():
+    print("="*60)
+    print("TEST: claves_bloqueo()")
+    print("="*60)
+
+    dos = claves_bloqueo(["MARIA", "GARCIA"])
+    tres = claves_bloqueo(["MARIA", "GARCIA", "LOPEZ"])
+    print(f"   {dos} / {tres}")
+    assert tres == ["D:MARIA GARCIA", "D:MARIA LOPEZ", "D:GARCIA LOPEZ"]
+    # Con una palabra de menos (cualquiera) comparten un bloque
+    assert set(dos) & set(tres)
+    assert set(claves_bloqueo(["MARIA", "LOPEZ"])) & set(tres)
+    assert set(claves_bloqueo(["GARCIA", "LOPEZ"])) & set(tres)
+    # Varios nombres: los 2 últimos son apellidos
+    assert set(claves_bloqueo(["MARIA", "GUADALUPE", "GARCIA", "LOPEZ"])) == set(tres)
+    # Paterno igual a materno: sin claves repetidas
+    assert claves_bloqueo(["ANA", "MAY", "MAY"]) == ["D:ANA MAY", "D:MAY MAY"]
+    assert claves_bloqueo(["MARIA"]) == ["U:MARIA"] and claves_bloqueo([]) == []
+
+
+def test_pares_candidatos():
+    claves = ["MARIA_GARCIA", "MARIA_GARCIA_LOPEZ", "MARIA_GARSIA", "PEDRO_PECH_MAY", "", "PEDRO_PECH"]
+    pares = pares_candidatos(claves)
+    print(f"   {sorted(pares)}")
+    assert (0, 1) in pares          # Una palabra de menos
+    assert (0, 2) in pares          # Error de lectura en el apellido (mismo nombre)
+    assert (3, 5) in pares
+    assert (0, 3) not in pares and not any(4 in par for par in pares)
+    assert all(i < j for i, j in pares)
+
+
+def test_distancia_acotada():
+    assert distancia_acotada("GARCIA", "GARCIA", 2) == 0
+    assert distancia_acotada("GARCIA", "GARSIA", 2) == 1
+    assert distancia_acotada("LOPEZ", "LPOEZ", 2) == 2
+    assert distancia_acotada("KITTEN", "SITTING", 3) == 3
+    # Pasado el máximo siempre devuelve maximo + 1 (por longitud o a media tabla)
+    assert distancia_acotada("KITTEN", "SITTING", 2) == 3
+    assert distancia_acotada("ANA", "ANASTASIA", 2) == 3
+    assert distancia_acotada("ABCDEF", "UVWXYZ", 1) == 2
+    assert distancia_acotada("", "AB", 2) == 2
+
+
+def test_sugerencias_y_grupos():
+    contacto = {'telefono_1': "9991234567", 'direccion': "CALLE 60 #500"}
+    personas = [
+        dict(contacto, nombre="MARÍA GARCÍA LÓPEZ", tipo_persona="PAM", status_cita="PENDIENTE"),
+        dict(contacto, nombre="MARIA GARCIA"),
+        {'nombre': "MARIA GARSIA LOPEZ", 'tipo_persona': "PAM"},
+        {'nombre': "MARIA  GARCIA LOPEZ"},
+        {'nombre': "PEDRO PECH MAY"},
+        {'nombre': "ANA MAY PECH"},
+        {'nombre': "EVA MAY PECH"},
+    ]
+    resultado = detectar_duplicados(personas)
+    pares = {(s['conservar']['indice'], s['descartar']['indice']): s for s in resultado['sugerencias']}
+    for s in resultado['sugerencias']:
+        print(f"   {s['puntuacion']}  {s['conservar']['nombre']} <- {s['descartar']['nombre']}  {s['motivos']}")
+
+    assert pares[(0, 3)]['puntuacion'] == 1.0               # Mismo nombre normalizado
+    assert (0, 2) in pares                                  # Conserva el de más campos
+    # Una palabra de menos: solo pasa con teléfono y dirección iguales
+    assert pares[(0, 1)]['puntuacion'] == round(PUNTUACION_FALTA_NOMBRE + 0.1, 3)
+    assert pares[(0, 1)]['motivos'] == ["un nombre de más", "mismo teléfono", "misma dirección"]
+    # "ANA" / "EVA": palabras cortas solo admiten una letra distinta
+    assert not any({i, j} & {4, 5, 6} for i, j in pares)
+
+    puntuaciones = [s['puntuacion'] for s in resultado['sugerencias']]
+    assert puntuaciones == sorted(puntuaciones, reverse=True)
+    assert list(grupos_de_sugerencias(resultado['sugerencias'])) == [[0, 1, 2, 3]]
+
+
+def test_grupos_encadenados():
+    def sugerencia(a, b):
+        return {'conservar': {'indice': a}, 'descartar': {'indice': b}}
+
+    grupos = list(grupos_de_sugerencias([sugerencia(1, 2), sugerencia(7, 8), sugerencia(3, 2),
+                                         sugerencia(8, 9)]))
+    assert sorted(grupos) == [[1, 2, 3], [7, 8, 9]]
+    assert list(grupos_de_sugerencias([])) == []
+
+
+if __name__ == '__main__':
+    test_claves_bloqueo()
+    test_pares_candidatos()
+    test_distancia_acotada()
+    test_sugerencias_y_grupos()
+    test_grupos_encadenados()
+    print("✅ TODAS LAS PRUEBAS PASARON")
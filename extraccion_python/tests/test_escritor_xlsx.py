@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del escritor XLSX (escritor_xlsx.py) y de la exportación (generar_excel.py)
+Prueba: el libro se abre con zipfile + ElementTree, con sus hojas en orden,
+las celdas de cada hoja, el escape de texto y los espacios conservados
+"""
+
+import json
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from escritor_xlsx import EscritorXLSX, letra_columna
+from generar_excel import COLUMNAS_EXCEL, HOJAS_EXCEL, exportar
+from lectura_personas import iterar_personas
+
+NS = {'m': "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+XML_ESPACIO = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def leer_libro(ruta):
+    """{hoja: [[celdas de la fila]]} leyendo el XLSX como lo haría Excel"""
+    with zipfile.ZipFile(ruta) as libro:
+        assert libro.testzip() is None
+        nombres = set(libro.namelist())
+        for parte in ('[Content_Types].xml', '_rels/.rels', 'xl/workbook.xml',
+                      'xl/_rels/workbook.xml.rels', 'xl/styles.xml'):
+            assert parte in nombres, parte
+            ET.fromstring(libro.read(parte))
+
+        hojas = ET.fromstring(libro.read('xl/workbook.xml')).findall('m:sheets/m:sheet', NS)
+        contenido = {}
+        for numero, hoja in enumerate(hojas, start=1):
+            raiz = ET.fromstring(libro.read(f'xl/worksheets/sheet{numero}.xml'))
+            filas = []
+            for n, fila in enumerate(raiz.findall('m:sheetData/m:row', NS), start=1):
+                assert fila.get('r') == str(n)
+                celdas = fila.findall('m:c', NS)
+                for columna, celda in enumerate(celdas):
+                    assert celda.get('r') == f"{letra_columna(columna)}{n}"
+                    assert celda.get('t') == 'inlineStr'
+                    assert celda.find('m:is/m:t', NS).get(XML_ESPACIO) == 'preserve'
+                filas.append([celda.find('m:is/m:t', NS).text or '' for celda in celdas])
+            contenido[hoja.get('name')] = filas
+        return contenido
+
+
+def test_hojas_y_escape():
+    print("="*60)
+    print("TEST: EscritorXLSX")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "libro.xlsx"
+        with EscritorXLSX(str(ruta), ['TODOS', 'A & B']) as libro:
+            libro.encabezado(['Nombre', 'Nota'])
+            libro.agregar_filas('TODOS', [
+                ['MARIA <LOPEZ>', 'R&D "uno"'],
+                ['  con espacios  ', None],
+                ['control\x01\x0b', 5],
+            ])
+            libro.agregar_fila('A & B', ['JOSE', "O'HARA"])
+
+        contenido = leer_libro(ruta)
+        print(f"   {contenido}")
+        assert list(contenido) == ['TODOS', 'A & B']
+        assert contenido['TODOS'] == [
+            ['Nombre', 'Nota'],
+            ['MARIA <LOPEZ>', 'R&D "uno"'],
+            ['  con espacios  ', ''],          # Los espacios se conservan
+            ['control', '5'],                  # Caracteres inválidos en XML se quitan
+        ]
+        assert contenido['A & B'] == [['Nombre', 'Nota'], ['JOSE', "O'HARA"]]
+
+        with zipfile.ZipFile(ruta) as libro:
+            encabezado = ET.fromstring(libro.read('xl/worksheets/sheet1.xml')).find('m:sheetData/m:row', NS)
+            assert {c.get('s') for c in encabezado.findall('m:c', NS)} == {'1'}     # Negritas
+
+
+def test_letra_columna():
+    assert [letra_columna(i) for i in (0, 25, 26, 51, 701, 702)] == ['A', 'Z', 'AA', 'AZ', 'ZZ', 'AAA']
+
+
+def test_exportar():
+    """Una hoja TODOS y una por estado, con las mismas filas que el CSV"""
+    personas = [
+        {'nombre': "MARIA GUADALUPE LOPEZ PEREZ", 'direccion': "CALLE 60 #500 & 62",
+         'telefono_1': "9991234567", 'historial_clinico': "", 'num_visitas': "2"},
+        {'nombre': "JUAN CANUL", 'direccion': "", 'telefono_1': " ",
+         'historial_clinico': "VISITA RECHAZADA", 'num_visitas': "1"},
+        {'nombre': "ROSA MAY PECH", 'direccion': "<sin dato>", 'telefono_1': "",
+         'historial_clinico': "", 'num_visitas': "0"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "personas.json").write_text(json.dumps(personas, ensure_ascii=False), encoding='utf-8')
+        estados = exportar(iterar_personas(str(tmp / "personas.json")), str(tmp / "salida.json"),
+                           str(tmp / "salida.csv"), str(tmp / "salida.xlsx"), tamano_lote=2)
+        assert estados == {'VISITADO': 1, 'RECHAZO': 1, 'NO': 1}
+
+        contenido = leer_libro(tmp / "salida.xlsx")
+        assert list(contenido) == HOJAS_EXCEL
+        filas = [
+            ["MARIA GUADALUPE", "LOPEZ", "PEREZ", "CALLE 60 #500 & 62", "9991234567", "VISITADO"],
+            ["JUAN", "CANUL", "", "", "SIN NUMERO", "RECHAZO"],
+            ["ROSA", "MAY", "PECH", "<sin dato>", "SIN NUMERO", "NO"],
+        ]
+        assert contenido['TODOS'] == [COLUMNAS_EXCEL] + filas
+        for estado in ('VISITADO', 'RECHAZO', 'NO'):
+            assert contenido[estado] == [COLUMNAS_EXCEL] + [f for f in filas if f[-1] == estado]
+        assert json.loads((tmp / "salida.json").read_text(encoding='utf-8'))[0]['Domicilio'] == filas[0][3]
+
+
+if __name__ == '__main__':
+    test_hojas_y_escape()
+    test_letra_columna()
+    test_exportar()
+    print("✅ TODAS LAS PRUEBAS PASARON")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las estadísticas por deltas (estadisticas_personas.py)
+Prueba: agregar/quitar/reemplazar dejan lo mismo que recalcular con el
+recorrido completo de antes, y cargar() descarta las guardadas si el
+archivo de datos cambió
+"""
+
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from estadisticas_personas import EstadisticasPersonas, ruta_estadisticas
+
+
+def estadisticas_recorrido(personas):
+    """PersonaAnalyzer.get_estadisticas de antes: recorre toda la lista en cada llamada"""
+    stats = {
+        'total': len(personas),
+        'por_tipo': Counter(p.get('tipo_persona', 'SIN TIPO') or 'SIN TIPO' for p in personas),
+        'por_status_cita': Counter(p.get('status_cita', 'SIN STATUS') or 'SIN STATUS' for p in personas),
+        'por_historial': Counter(p.get('historial_clinico', 'SIN DATOS') or 'SIN DATOS' for p in personas),
+        'con_telefono': sum(1 for p in personas if p.get('telefono_1')),
+        'sin_telefono': sum(1 for p in personas if not p.get('telefono_1')),
+        'con_dos_telefonos': sum(1 for p in personas if p.get('telefono_1') and p.get('telefono_2')),
+        'total_visitas': sum(int(p.get('num_visitas', 0)) for p in personas),
+        'promedio_visitas': 0
+    }
+    if stats['total'] > 0:
+        stats['promedio_visitas'] = stats['total_visitas'] / stats['total']
+    return stats
+
+
+def _persona(nombre, tipo, status, historial, tel1='', tel2='', visitas='0'):
+    return {'nombre': nombre, 'tipo_persona': tipo, 'status_cita': status,
+            'historial_clinico': historial, 'telefono_1': tel1, 'telefono_2': tel2,
+            'num_visitas': visitas, 'archivo_origen': 'view1.xml'}
+
+
+PERSONAS = [
+    _persona("LOPEZ PEREZ ANA", "PAM", "PENDIENTE", "COMPLETO", "9991234567", "9997654321", "2"),
+    _persona("GARCIA LOPEZ JUAN", "PCD", "", "", visitas="0"),
+    _persona("RUIZ CANUL MARIA", "PAM", "REALIZADA", "SIN HISTORIAL", "9990000000", visitas="1"),
+    _persona("CANUL LOPEZ ROSA", "", "PENDIENTE", "COMPLETO", visitas="3"),
+]
+
+
+def test_deltas_igual_que_recorrido():
+    print("="*60)
+    print("TEST: agregar / quitar / reemplazar")
+    print("="*60)
+
+    personas = list(PERSONAS)
+    estadisticas = EstadisticasPersonas.desde_personas(personas)
+    assert estadisticas.resumen() == estadisticas_recorrido(personas)
+
+    nueva = _persona("PECH MAY JOSE", "PCD", "PENDIENTE", "", "9991111111", visitas="4")
+    personas.append(nueva)
+    estadisticas.agregar(nueva)
+    assert estadisticas.resumen() == estadisticas_recorrido(personas)
+
+    # Reemplazo: cambia tipo, teléfonos y visitas de la misma persona
+    actualizada = dict(personas[1], tipo_persona="PAM", telefono_1="9992222222",
+                       telefono_2="9993333333", num_visitas="1")
+    estadisticas.reemplazar(personas[1], actualizada)
+    personas[1] = actualizada
+    assert estadisticas.resumen() == estadisticas_recorrido(personas)
+
+    # Quitar hasta vaciar: los contadores en cero no aparecen en el resumen
+    while personas:
+        estadisticas.quitar(personas.pop(0))
+        resumen = estadisticas.resumen()
+        assert resumen == estadisticas_recorrido(personas), resumen
+    print(f"   {resumen}")
+    assert resumen['por_tipo'] == Counter() and resumen['promedio_visitas'] == 0
+
+
+def test_cargar_con_huella():
+    """Guardadas con la huella del archivo: se reutilizan solo si el archivo no cambió"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "personas.json"
+        ruta.write_text(json.dumps(PERSONAS, ensure_ascii=False), encoding='utf-8')
+
+        assert EstadisticasPersonas.cargar(str(ruta)) is None          # Aún no hay
+        estadisticas = EstadisticasPersonas.obtener(str(ruta))
+        assert os.path.exists(ruta_estadisticas(str(ruta)))
+        cargadas = EstadisticasPersonas.cargar(str(ruta))
+        assert cargadas is not None
+        assert cargadas.resumen() == estadisticas.resumen() == estadisticas_recorrido(PERSONAS)
+
+        # El archivo cambió por fuera: la huella ya no coincide
+        otras = PERSONAS[:2]
+        ruta.write_text(json.dumps(otras, ensure_ascii=False), encoding='utf-8')
+        assert EstadisticasPersonas.cargar(str(ruta)) is None
+        assert EstadisticasPersonas.obtener(str(ruta)).resumen() == estadisticas_recorrido(otras)
+
+        # Mismo tamaño, otro mtime: también se descartan
+        info = ruta.stat()
+        os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+        assert EstadisticasPersonas.cargar(str(ruta)) is None
+
+        # Archivo de estadísticas dañado
+        Path(ruta_estadisticas(str(ruta))).write_text("{roto", encoding='utf-8')
+        assert EstadisticasPersonas.cargar(str(ruta)) is None
+
+
+if __name__ == '__main__':
+    test_deltas_igual_que_recorrido()
+    test_cargar_con_huella()
+    print("✅ TODAS LAS PRUEBAS PASARON")